@@ -1,32 +1,105 @@
-from flask import Flask, request, jsonify, session, send_from_directory
+from flask import Flask, Response, g, request, jsonify, session, send_from_directory
 import os
-import asyncio
-import threading
-import traceback
 import functools
+import math
+import threading
 import time
-from p2p_trading.agents.trader_agent import TraderAgent
-from p2p_trading.agents.market_agent import MarketAgent
-from p2p_trading.utils.db_helper import get_open_orders, DatabaseManager
 from p2p_trading.utils.user_manager import UserManager
 from p2p_trading.utils.model_interface import ModelInterface
-from p2p_trading.utils.config import TRADER_AGENT_JID, MARKET_AGENT_JID, PASSWORD
+from p2p_trading.utils.model_executor import ModelExecutor, AsyncModelInterface, ModelBusy
+from p2p_trading.utils.model_registry import ModelUnavailable
+from p2p_trading.utils.demand_response import validate_fleet_request
+from p2p_trading.utils.rate_limiter import AdmissionController
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.market_service import create_local_service, RemoteMarketService
+from p2p_trading.utils.metrics import REGISTRY, ENGINE_METRICS, HTTP_REQUESTS, HTTP_REQUEST_LATENCY, AGENT_MAILBOX_DEPTH
+from p2p_trading.utils.config import (
+    MAX_BATCH_ORDERS, MAX_DR_HOUSEHOLDS, MAX_SCORING_USERS, ENGINE_ADDRESS, ENGINE_AUTHKEY, API_PORT,
+    RATE_LIMIT_USER_RPS, RATE_LIMIT_USER_BURST, RATE_LIMIT_GLOBAL_RPS, RATE_LIMIT_GLOBAL_BURST,
+    MAX_INFLIGHT_PER_USER, MAX_INFLIGHT_GLOBAL, API_WORKERS, MODEL_WORKERS, MODEL_QUEUE_SIZE, MODEL_CALL_TIMEOUT,
+    PREDICTION_WORKERS, PREDICTION_CALL_TIMEOUT, DR_WORKERS, DR_SECONDS_PER_HOUSEHOLD,
+    MODEL_SWAP_TIMEOUT, MODEL_ARTIFACT_DIR
+)
+
+logger = get_logger("api")
+server_logger = get_logger("server")
 
 app = Flask(__name__)
 app.secret_key = "p2p-trading-secret-key"  # Used for session management
 
-# Initialize event loop for agents
-event_loop = asyncio.new_event_loop()
-
-# Initialize agents
-trader_agent = None
-market_agent = None
+# Initialize the market service: either the agents run in this process, or this process is a
+# stateless API worker and a separate matching engine (engine_server.py) owns the order book
+if ENGINE_ADDRESS:
+    market_service = RemoteMarketService(ENGINE_ADDRESS, ENGINE_AUTHKEY)
+else:
+    market_service = create_local_service()
 
 # Initialize user manager
 user_manager = UserManager()
 
-# Initialize model interface
-model_interface = ModelInterface()
+# Initialize model interface; model calls run on their own bounded pool with a deadline so a
+# slow model cannot tie up the request threads serving login and orders. Predictions get a pool
+# large enough to fill a micro-batch, and the LSTM is loaded in the background before traffic arrives
+model_interface = AsyncModelInterface(
+    ModelInterface(market_service), ModelExecutor(MODEL_WORKERS, MODEL_QUEUE_SIZE), MODEL_CALL_TIMEOUT,
+    ModelExecutor(PREDICTION_WORKERS, MODEL_QUEUE_SIZE), PREDICTION_CALL_TIMEOUT,
+    ModelExecutor(DR_WORKERS, MODEL_QUEUE_SIZE), DR_SECONDS_PER_HOUSEHOLD, MODEL_SWAP_TIMEOUT)
+threading.Thread(target=model_interface.warm_up, name="model-warmup", daemon=True).start()
+
+# Initialize admission control for the order endpoints; the counters are per process, so each of
+# the API_WORKERS workers enforces its share of the deployment-wide limits
+admission = AdmissionController(
+    user_rate=RATE_LIMIT_USER_RPS / API_WORKERS,
+    user_burst=max(1.0, RATE_LIMIT_USER_BURST / API_WORKERS),
+    global_rate=RATE_LIMIT_GLOBAL_RPS / API_WORKERS,
+    global_burst=max(1.0, RATE_LIMIT_GLOBAL_BURST / API_WORKERS),
+    max_inflight_per_user=max(1, math.ceil(MAX_INFLIGHT_PER_USER / API_WORKERS)),
+    max_inflight_global=max(1, math.ceil(MAX_INFLIGHT_GLOBAL / API_WORKERS))
+)
+
+# Expose admission counters and agent mailbox depth through the metrics registry
+REGISTRY.counter(
+    "p2p_admission_accepted_total", "Order requests admitted by admission control",
+    callback=lambda: admission.stats()["accepted"])
+REGISTRY.counter(
+    "p2p_admission_rejected_total", "Order requests rejected by admission control, by reason", ("reason",),
+    callback=lambda: {(reason,): count for reason, count in admission.stats()["rejected"].items()})
+
+REGISTRY.counter(
+    "p2p_prediction_cache_hits_total", "Prediction requests answered from the cache",
+    callback=lambda: model_interface.prediction_cache.hits)
+REGISTRY.counter(
+    "p2p_prediction_cache_misses_total", "Prediction requests that had to run the model",
+    callback=lambda: model_interface.prediction_cache.misses)
+REGISTRY.gauge(
+    "p2p_prediction_cache_entries", "Predictions currently cached",
+    callback=lambda: len(model_interface.prediction_cache.entries))
+
+REGISTRY.counter(
+    "p2p_model_calls_total", "Model calls by outcome (completed, failed, timeout, rejected)", ("outcome",),
+    callback=lambda: {(outcome,): count for outcome, count in model_interface.executor.stats()["outcomes"].items()})
+REGISTRY.counter(
+    "p2p_prediction_calls_total", "Prediction calls by outcome (completed, failed, timeout, rejected)", ("outcome",),
+    callback=lambda: {(outcome,): count
+                      for outcome, count in model_interface.prediction_executor.stats()["outcomes"].items()})
+
+AGENT_MAILBOX_DEPTH.set_callback(
+    lambda: {(name,): depth for name, depth in market_service.mailbox_depths().items()})
+
+# Request latency instrumentation
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    started = getattr(g, "request_started", None)
+    if started is not None:
+        # Label by route template so IDs in the path do not create new series
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint, method=request.method)
+        HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
 
 # Login required decorator
 def login_required(f):
@@ -37,39 +110,59 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# SPADE agent initialization
-async def start_agents():
-    global trader_agent, market_agent
-    try:
-        print("[Server] Starting market agent...")
-        market_agent = MarketAgent(MARKET_AGENT_JID, PASSWORD)
-        await market_agent.start()
-        print(f"[Server] Market agent started: {market_agent.jid}, alive: {market_agent.is_alive()}")
-        
-        print("[Server] Starting trader agent...")
-        trader_agent = TraderAgent(TRADER_AGENT_JID, PASSWORD)
-        await trader_agent.start()
-        print(f"[Server] Trader agent started: {trader_agent.jid}, alive: {trader_agent.is_alive()}")
-        
-        print("[Server] Both agents are now running")
-    except Exception as e:
-        print(f"[Server] Error starting agents: {e}")
-        print(traceback.format_exc())
+def validate_order(order):
+    """Return an error message for an invalid order, or None if the order is valid"""
+    if not isinstance(order, dict):
+        return "Order must be an object"
+    missing = [k for k in ("type", "amount", "price") if k not in order]
+    if missing:
+        return f"Missing fields: {', '.join(missing)}"
+    if order["type"] not in ("buy", "sell"):
+        return "Order type must be 'buy' or 'sell'"
+    for field in ("amount", "price"):
+        value = order[field]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            return f"Order {field} must be a positive number"
+    return None
 
-def run_agents():
-    try:
-        print("[Server] Setting up agent thread")
-        asyncio.set_event_loop(event_loop)
-        event_loop.run_until_complete(start_agents())
-        print("[Server] Agents started, now running event loop forever")
-        event_loop.run_forever()
-    except Exception as e:
-        print(f"[Server] Error in agent thread: {e}")
-        print(traceback.format_exc())
+def validate_price_request(market_data):
+    """Return an error message for invalid optional pricing inputs, or None if they are valid"""
+    if not isinstance(market_data, dict):
+        return None  # no amount or target: the defaults are used
+    amount = market_data.get("amount")
+    if amount is not None and (isinstance(amount, bool) or not isinstance(amount, (int, float)) or amount <= 0):
+        return "Amount must be a positive number"
+    target = market_data.get("target_fill_probability")
+    if target is not None and (isinstance(target, bool) or not isinstance(target, (int, float)) or not 0 < target <= 1):
+        return "Target fill probability must be a number in (0, 1]"
+    return None
+
+# Admission control decorator (apply below login_required)
+def admission_controlled(f):
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        username = session["username"]
+        # Batches are charged one token per order
+        cost = 1
+        if request.method == "POST":
+            data = request.get_json(silent=True)
+            orders = data.get("orders") if isinstance(data, dict) else data
+            if isinstance(orders, list) and orders:
+                cost = min(len(orders), MAX_BATCH_ORDERS)
+
+        admitted, reason, retry_after = admission.try_admit(username, cost)
+        if not admitted:
+            response = jsonify({"error": "Too many requests", "reason": reason})
+            response.headers["Retry-After"] = str(max(1, math.ceil(min(retry_after, 60))))
+            return response, 429
+        try:
+            return f(*args, **kwargs)
+        finally:
+            admission.release(username)
+    return decorated_function
 
-# Initialize and start the agent thread
-agent_thread = threading.Thread(target=run_agents, daemon=True)
-agent_thread.start()
+# Start the agent thread (no-op for API workers in split mode)
+market_service.start()
 
 # User authentication endpoints
 @app.route("/login", methods=["POST"])
@@ -87,8 +180,7 @@ def login():
         else:
             return jsonify({"error": result}), 401
     except Exception as e:
-        print(f"[API] Login error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Login error")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/logout", methods=["POST"])
@@ -106,35 +198,85 @@ def current_user():
 # API: submit order
 @app.route("/submit_order", methods=["POST"])
 @login_required
+@admission_controlled
 def submit_order():
     try:
-        print("[API] Received order submission request")
         data = request.json
-        print(f"[API] Order data: {data}")
+        logger.debug("Order submission: %s", data)
         
         required = ["type", "amount", "price"]
         if not all(k in data for k in required):
-            print(f"[API] Missing required fields in order")
+            logger.debug("Missing required fields in order")
             return jsonify({"error": "Missing fields"}), 400
 
         # Add the current user to the order
         data["user"] = session["username"]
         
         # Ensure the order is valid
-        if trader_agent is None or not trader_agent.is_alive():
-            print(f"[API] Trader agent not ready")
+        if not market_service.is_ready():
+            logger.warning("Trader agent not ready")
             return jsonify({"error": "Trading system not ready"}), 503
 
         # Create a new order
-        print(f"[API] Submitting order to trader agent")
-        future = asyncio.run_coroutine_threadsafe(trader_agent.submit_order(data), event_loop)
-        future.result(timeout=5)  # Wait for the order to be processed
+        market_service.submit_order(data)
         
-        print(f"[API] Order submitted successfully")
+        logger.debug("Order submitted successfully")
         return jsonify({"message": "Order submitted"}), 200
     except Exception as e:
-        print(f"[API] Error submitting order: {e}")
-        print(traceback.format_exc())
+        logger.exception("Error submitting order")
+        return jsonify({"error": str(e)}), 500
+
+# API: submit a batch of orders
+@app.route("/submit_orders", methods=["POST"])
+@login_required
+@admission_controlled
+def submit_orders():
+    try:
+        data = request.json
+        orders = data.get("orders") if isinstance(data, dict) else data
+
+        if not isinstance(orders, list) or not orders:
+            return jsonify({"error": "Expected a non-empty array of orders"}), 400
+        if len(orders) > MAX_BATCH_ORDERS:
+            return jsonify({"error": f"At most {MAX_BATCH_ORDERS} orders per batch"}), 413
+
+        # Validate every order in one pass; invalid orders are rejected individually
+        results = []
+        batch = []
+        for index, order in enumerate(orders):
+            error = validate_order(order)
+            if error:
+                results.append({"index": index, "id": None, "status": "rejected", "error": error})
+                continue
+            order = dict(order)
+            order["user"] = session["username"]
+            batch.append(order)
+            results.append({"index": index, "id": None, "status": "submitted"})
+
+        if batch:
+            if not market_service.is_ready():
+                logger.warning("Trader agent not ready")
+                return jsonify({"error": "Trading system not ready"}), 503
+
+            # Forward the valid orders to the market as a single message
+            logger.debug("Submitting batch of %d orders to trader agent", len(batch))
+            order_ids = market_service.submit_orders(batch)
+
+            submitted = [r for r in results if r["status"] == "submitted"]
+            for result, order_id in zip(submitted, order_ids or []):
+                result["id"] = order_id
+                if order_id is not None:
+                    result["status"] = "accepted"
+
+        accepted = sum(1 for r in results if r["status"] != "rejected")
+        logger.info("Batch processed", extra={"submitted": accepted, "rejected": len(results) - accepted})
+        return jsonify({
+            "submitted": accepted,
+            "rejected": len(results) - accepted,
+            "orders": results
+        }), 200
+    except Exception as e:
+        logger.exception("Error submitting order batch")
         return jsonify({"error": str(e)}), 500
 
 # API: get orders
@@ -142,16 +284,14 @@ def submit_order():
 @login_required
 def get_orders():
     try:
-        print("[API] Received request for open orders")
-        orders = get_open_orders()
+        orders = market_service.get_open_orders()
         
         # For demo purposes, show all orders
         # In a real system, you might want to filter or tag orders differently
-        print(f"[API] Returning {len(orders)} open orders")
+        logger.debug("Returning %d open orders", len(orders))
         return jsonify(orders), 200
     except Exception as e:
-        print(f"[API] Error getting orders: {e}")
-        print(traceback.format_exc())
+        logger.exception("Error getting orders")
         return jsonify({"error": str(e)}), 500
 
 # API: get user's orders only
@@ -159,50 +299,42 @@ def get_orders():
 @login_required
 def get_my_orders():
     try:
-        print(f"[API] Received request for {session['username']}'s orders")
-        db = DatabaseManager()
-        all_orders = db.get_all_orders()
+        all_orders = market_service.get_all_orders()
         
         # Filter orders to only show the current user's orders
         user_orders = [o for o in all_orders if o.get("user") == session["username"]]
         
-        print(f"[API] Found {len(user_orders)} orders for {session['username']}")
+        logger.debug("Found %d orders for %s", len(user_orders), session["username"])
         return jsonify(user_orders), 200
     except Exception as e:
-        print(f"[API] Error getting user orders: {e}")
-        print(traceback.format_exc())
+        logger.exception("Error getting user orders")
         return jsonify({"error": str(e)}), 500
 
 # API: delete order
 @app.route("/delete_order/<int:order_id>", methods=["DELETE"])
 @login_required
+@admission_controlled
 def delete_order(order_id):
     try:
-        print(f"[API] Received request to delete order: {order_id}")
-        db = DatabaseManager()
-        
-        # Get the order
-        orders = db.get_all_orders()
-        order = next((o for o in orders if o.get('id') == order_id), None)
+        logger.debug("Received request to delete order: %s", order_id)
+
+        # Ownership check and deletion run on the market's writer thread
+        result = market_service.delete_order(order_id, session["username"])
         
         # Check if order exists
-        if not order:
+        if result == "not_found":
             return jsonify({"error": "Order not found"}), 404
             
         # Check if the order belongs to the current user
-        if order["user"] != session["username"]:
+        if result == "forbidden":
             return jsonify({"error": "You can only delete your own orders"}), 403
         
-        # Delete the order
-        result = db.delete_order(order_id)
-        
-        if result:
+        if result == "deleted":
             return jsonify({"message": f"Order {order_id} deleted successfully"}), 200
         else:
             return jsonify({"error": "Order not found or could not be deleted"}), 404
     except Exception as e:
-        print(f"[API] Error deleting order: {e}")
-        print(traceback.format_exc())
+        logger.exception("Error deleting order")
         return jsonify({"error": str(e)}), 500
 
 # API: get trade history
@@ -210,19 +342,22 @@ def delete_order(order_id):
 @login_required
 def get_trade_history():
     try:
-        print("[API] Received request for trade history")
-        db = DatabaseManager()
-        matched_orders = db.get_matched_orders()
+        matched_orders = market_service.get_matched_orders()
         
         # For demo purposes, show all matched orders
         # In a real system, you might want to filter by user or provide more context
-        print(f"[API] Found {len(matched_orders)} matched orders")
+        logger.debug("Found %d matched orders", len(matched_orders))
         return jsonify(matched_orders), 200
     except Exception as e:
-        print(f"[API] Error getting trade history: {e}")
-        print(traceback.format_exc())
+        logger.exception("Error getting trade history")
         return jsonify({"error": str(e)}), 500
 
+# API: admission control counters (this worker's share of the limits)
+@app.route("/admission_stats", methods=["GET"])
+@login_required
+def get_admission_stats():
+    return jsonify({"api_workers": API_WORKERS, **admission.stats()}), 200
+
 # Model Interface API endpoints
 
 # API: predict energy production
@@ -239,8 +374,7 @@ def predict_production():
         )
         return jsonify(result), 200
     except Exception as e:
-        print(f"[API] Prediction error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Prediction error")
         return jsonify({"error": str(e)}), 500
 
 # API: predict energy consumption
@@ -257,8 +391,26 @@ def predict_consumption():
         )
         return jsonify(result), 200
     except Exception as e:
-        print(f"[API] Prediction error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Prediction error")
+        return jsonify({"error": str(e)}), 500
+
+# API: ingest new measurements for a user profile or location
+@app.route("/api/profile_data", methods=["POST"])
+@login_required
+def ingest_profile_data():
+    try:
+        data = request.json
+        if "profile" not in data or "samples" not in data:
+            return jsonify({"error": "Missing required fields"}), 400
+
+        rows = model_interface.ingest_profile_data(data["profile"], data["samples"])
+        return jsonify({"profile": data["profile"], "window_rows": rows}), 200
+    except ModelUnavailable as e:
+        return jsonify({"error": f"Prediction model unavailable: {e}"}), 503
+    except ModelBusy as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logger.exception("Profile data ingest error")
         return jsonify({"error": str(e)}), 500
 
 # API: get optimal price
@@ -269,14 +421,18 @@ def get_optimal_price():
         data = request.json
         if "order_type" not in data or "market_data" not in data:
             return jsonify({"error": "Missing required fields"}), 400
+        if data["order_type"] not in ("buy", "sell"):
+            return jsonify({"error": "Order type must be 'buy' or 'sell'"}), 400
+        error = validate_price_request(data["market_data"])
+        if error:
+            return jsonify({"error": error}), 400
             
         result = model_interface.get_optimal_price(
             data["order_type"], data["market_data"]
         )
         return jsonify(result), 200
     except Exception as e:
-        print(f"[API] Optimal price error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Optimal price error")
         return jsonify({"error": str(e)}), 500
 
 # API: get appliance priorities
@@ -293,8 +449,41 @@ def get_appliance_priority():
         )
         return jsonify(result), 200
     except Exception as e:
-        print(f"[API] Appliance priority error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Appliance priority error")
+        return jsonify({"error": str(e)}), 500
+
+# API: rank the same appliances for many users
+@app.route("/api/appliance_priority/batch", methods=["POST"])
+@login_required
+def get_appliance_priorities():
+    try:
+        data = request.json
+        if "user_ids" not in data or "appliances" not in data:
+            return jsonify({"error": "Missing required fields"}), 400
+        if not isinstance(data["user_ids"], list) or len(data["user_ids"]) > MAX_SCORING_USERS:
+            return jsonify({"error": f"user_ids must be a list of at most {MAX_SCORING_USERS} users"}), 400
+
+        result = model_interface.get_appliance_priorities(data["user_ids"], data["appliances"])
+        return jsonify(result), 200
+    except Exception as e:
+        logger.exception("Appliance priority batch error")
+        return jsonify({"error": str(e)}), 500
+
+# API: add sub-metering readings to a user's usage aggregates
+@app.route("/api/appliance_usage", methods=["POST"])
+@login_required
+def ingest_appliance_usage():
+    try:
+        data = request.json
+        if "user_id" not in data or "hours" not in data or "sub_metering" not in data:
+            return jsonify({"error": "Missing required fields"}), 400
+
+        readings = model_interface.ingest_appliance_usage(data["user_id"], data["hours"], data["sub_metering"])
+        return jsonify({"user_id": data["user_id"], "readings": readings}), 200
+    except ModelBusy as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logger.exception("Appliance usage ingest error")
         return jsonify({"error": str(e)}), 500
 
 # API: get demand response action
@@ -311,8 +500,29 @@ def get_demand_response_action():
         )
         return jsonify(result), 200
     except Exception as e:
-        print(f"[API] Demand response error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Demand response error")
+        return jsonify({"error": str(e)}), 500
+
+# API: plan demand response across many households
+@app.route("/api/demand_response/batch", methods=["POST"])
+@login_required
+def plan_demand_response():
+    try:
+        data = request.json
+        if "grid_status" not in data or "households" not in data:
+            return jsonify({"error": "Missing required fields"}), 400
+        if not isinstance(data["households"], list) or len(data["households"]) > MAX_DR_HOUSEHOLDS:
+            return jsonify({"error": f"households must be a list of at most {MAX_DR_HOUSEHOLDS} profiles"}), 400
+        error = validate_fleet_request(data["grid_status"], data["households"])
+        if error:
+            return jsonify({"error": error}), 400
+
+        result = model_interface.plan_demand_response(data["grid_status"], data["households"])
+        if result.get("degraded"):
+            return jsonify(result), 503
+        return jsonify(result), 200
+    except Exception as e:
+        logger.exception("Demand response batch error")
         return jsonify({"error": str(e)}), 500
 
 # API: get model status
@@ -322,23 +532,52 @@ def get_model_status():
     try:
         return jsonify({
             "models_available": model_interface.models_available,
+            "prediction_cache": model_interface.prediction_cache.stats(),
+            "executor": model_interface.executor.stats(),
+            "prediction_executor": model_interface.prediction_executor.stats(),
+            "dr_executor": model_interface.dr_executor.stats(),
+            "models": model_interface.model_status(),
             "message": "These interfaces are reserved for future integration with mathematical models"
         }), 200
+    except ModelBusy as e:
+        return jsonify({"error": str(e)}), 503
     except Exception as e:
-        print(f"[API] Model status error: {e}")
-        print(traceback.format_exc())
+        logger.exception("Model status error")
+        return jsonify({"error": str(e)}), 500
+
+# API: hot-swap a model checkpoint
+@app.route("/api/model_swap", methods=["POST"])
+@login_required
+def swap_model():
+    try:
+        data = request.json
+        if "model" not in data or "path" not in data:
+            return jsonify({"error": "Missing required fields"}), 400
+        # Only checkpoints inside the artifact directory may be loaded
+        artifact_dir = os.path.realpath(MODEL_ARTIFACT_DIR)
+        path = os.path.realpath(os.path.join(artifact_dir, data["path"]))
+        if os.path.commonpath([artifact_dir, path]) != artifact_dir or not os.path.isfile(path):
+            return jsonify({"error": "Unknown model artifact"}), 400
+
+        status = model_interface.swap_model(data["model"], path)
+        logger.info("Model swapped", extra={"model": data["model"], "path": path, "user": session["username"]})
+        return jsonify({"model": data["model"], "status": status}), 200
+    except ModelUnavailable as e:
+        return jsonify({"error": str(e)}), 400
+    except ModelBusy as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        logger.exception("Model swap error")
         return jsonify({"error": str(e)}), 500
 
 @app.route("/")
 def index():
     try:
-        print("[API] Serving frontend index.html")
         frontend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
-        print(f"[API] Frontend path: {frontend_path}")
+        logger.debug("Serving frontend index.html from %s", frontend_path)
         return send_from_directory(frontend_path, 'index.html')
     except Exception as e:
-        print(f"[API] Error serving frontend: {e}")
-        print(traceback.format_exc())
+        logger.exception("Error serving frontend")
         return f"Error: {str(e)}", 500
 
 @app.route('/<path:filename>')
@@ -346,14 +585,21 @@ def serve_static_files(filename):
     frontend_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
     return send_from_directory(frontend_path, filename)
 
+# Prometheus metrics endpoint
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    if ENGINE_ADDRESS:
+        # Matching and store metrics live in the engine process
+        body = REGISTRY.render(exclude=ENGINE_METRICS) + market_service.engine_metrics()
+    else:
+        body = REGISTRY.render()
+    return Response(body, mimetype="text/plain; version=0.0.4")
+
 # Health check endpoint
 @app.route("/health", methods=["GET"])
 def health_check():
     try:
-        agent_status = {
-            "trader_agent": "running" if trader_agent and trader_agent.is_alive() else "not running",
-            "market_agent": "running" if market_agent and market_agent.is_alive() else "not running"
-        }
+        agent_status = market_service.agent_status()
         return jsonify({
             "status": "ok",
             "agents": agent_status,
@@ -369,11 +615,10 @@ def health_check():
 if __name__ == "__main__":
     try:
         # Wait for agents to initialize
-        print("[Server] Waiting for agents to initialize...")
+        server_logger.info("Waiting for agents to initialize")
         time.sleep(2)
         
-        print("[Server] Starting Flask server...")
-        app.run(port=5000, debug=False, use_reloader=False)
-    except Exception as e:
-        print(f"[Server] Server startup error: {e}")
-        print(traceback.format_exc())
\ No newline at end of file
+        server_logger.info("Starting Flask server")
+        app.run(port=API_PORT, debug=False, use_reloader=False, threaded=True)
+    except Exception:
+        server_logger.exception("Server startup error")
\ No newline at end of file
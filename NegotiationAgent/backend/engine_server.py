@@ -0,0 +1,25 @@
+import signal
+import sys
+from p2p_trading.utils.market_service import create_local_service, serve_engine
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.config import ENGINE_ADDRESS, ENGINE_AUTHKEY
+
+# Matching engine for the split deployment: this process owns the agents and the order book,
+# and any number of stateless API workers connect to it, e.g.
+#   P2P_ENGINE_ADDRESS=/tmp/p2p-engine.sock python engine_server.py
+#   P2P_ENGINE_ADDRESS=/tmp/p2p-engine.sock P2P_API_WORKERS=4 gunicorn -w 4 -b 127.0.0.1:5000 api_server:app
+
+logger = get_logger("engine")
+
+def main():
+    address = ENGINE_ADDRESS or "/tmp/p2p-engine.sock"
+    service = create_local_service()
+    service.start()
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        serve_engine(service, address, ENGINE_AUTHKEY)
+    except (KeyboardInterrupt, SystemExit):
+        logger.info("Matching engine shutting down")
+
+if __name__ == "__main__":
+    main()
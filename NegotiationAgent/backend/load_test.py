@@ -0,0 +1,317 @@
+"""
+Asyncio load generator for the NegotiationAgent HTTP API.
+
+Logs in N synthetic users and drives a mixed submit/list/delete/history workload against
+a running api_server.py, then reports throughput, error rate and latency percentiles per
+endpoint. No XMPP server is needed when the target runs in loopback mode:
+
+    P2P_AGENT_MODE=loopback RATE_LIMIT_USER_RPS=1000 RATE_LIMIT_USER_BURST=1000 \
+    RATE_LIMIT_GLOBAL_RPS=100000 RATE_LIMIT_GLOBAL_BURST=100000 python api_server.py
+    python load_test.py --users 50 --duration 30 --create-users
+
+or let the harness start such a server itself in a scratch data directory:
+
+    python load_test.py --spawn-server --users 50 --duration 30
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Relative weights of the workload mix
+WORKLOAD = {
+    "submit_order": 35,
+    "submit_orders": 5,
+    "orders": 25,
+    "my_orders": 10,
+    "delete_order": 10,
+    "trade_history": 15,
+}
+
+
+class HttpSession:
+    """Minimal HTTP/1.1 client with keep-alive and cookie handling, built on asyncio streams"""
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.cookies = {}
+        self.reader = None
+        self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, payload=None):
+        """Send one request and return (status, parsed JSON body or None)"""
+        for attempt in range(2):
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                return await self._exchange(method, path, payload)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # The server closed an idle keep-alive connection; retry once on a fresh one
+                await self.close()
+                if attempt:
+                    raise
+
+    async def _exchange(self, method, path, payload):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        headers = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            f"Content-Length: {len(body)}",
+        ]
+        if payload is not None:
+            headers.append("Content-Type: application/json")
+        if self.cookies:
+            headers.append("Cookie: " + "; ".join(f"{k}={v}" for k, v in self.cookies.items()))
+        self.writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readuntil(b"\r\n")
+        version, status = status_line.decode().split(" ", 2)[:2]
+        response_headers = {}
+        while True:
+            line = await self.reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, value = line.decode().split(":", 1)
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                cookie_name, cookie_value = value.split(";", 1)[0].split("=", 1)
+                self.cookies[cookie_name] = cookie_value
+            response_headers[name] = value
+
+        if response_headers.get("transfer-encoding") == "chunked":
+            data = b""
+            while True:
+                size = int((await self.reader.readuntil(b"\r\n")).strip(), 16)
+                if size == 0:
+                    await self.reader.readuntil(b"\r\n")
+                    break
+                data += await self.reader.readexactly(size)
+                await self.reader.readexactly(2)
+        elif "content-length" in response_headers:
+            data = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            data = await self.reader.read()
+
+        if version == "HTTP/1.0" or response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        try:
+            parsed = json.loads(data) if data else None
+        except ValueError:
+            parsed = None
+        return int(status), parsed
+
+
+class Stats:
+    """Latency samples and outcome counts per endpoint"""
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = {}
+        self.failures = {}
+
+    def record(self, endpoint, latency, status):
+        self.latencies.setdefault(endpoint, []).append(latency)
+        counts = self.statuses.setdefault(endpoint, {})
+        counts[status] = counts.get(status, 0) + 1
+
+    def record_failure(self, endpoint, latency):
+        self.latencies.setdefault(endpoint, []).append(latency)
+        self.failures[endpoint] = self.failures.get(endpoint, 0) + 1
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    rank = math.ceil(p / 100 * len(sorted_values))
+    return sorted_values[min(len(sorted_values), max(1, rank)) - 1]
+
+
+def random_order():
+    return {
+        "type": random.choice(["buy", "sell"]),
+        "amount": round(random.uniform(0.5, 10.0), 1),
+        "price": round(random.uniform(0.9, 1.3), 2),
+    }
+
+
+async def run_user(index, args, stats, deadline):
+    session = HttpSession(args.host, args.port)
+    username = f"{args.user_prefix}{index}"
+    try:
+        status, _ = await session.request("POST", "/login", {"username": username, "password": args.password})
+        if status != 200:
+            stats.record_failure("login", 0.0)
+            return
+        own_open_ids = []
+        endpoints = list(WORKLOAD)
+        weights = [WORKLOAD[e] for e in endpoints]
+
+        while time.monotonic() < deadline:
+            endpoint = random.choices(endpoints, weights)[0]
+            if endpoint == "delete_order" and not own_open_ids:
+                endpoint = "my_orders"  # learn some order IDs first
+
+            if endpoint == "submit_order":
+                method, path, payload = "POST", "/submit_order", random_order()
+            elif endpoint == "submit_orders":
+                method, path, payload = "POST", "/submit_orders", [random_order() for _ in range(args.batch_size)]
+            elif endpoint == "delete_order":
+                method, path, payload = "DELETE", f"/delete_order/{own_open_ids.pop()}", None
+            else:
+                method, path, payload = "GET", f"/{endpoint}", None
+
+            started = time.perf_counter()
+            try:
+                status, body = await session.request(method, path, payload)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                stats.record_failure(endpoint, time.perf_counter() - started)
+                await session.close()
+                continue
+            stats.record(endpoint, time.perf_counter() - started, status)
+
+            if endpoint == "my_orders" and status == 200 and isinstance(body, list):
+                own_open_ids = [o["id"] for o in body if o.get("status") == "open"][-20:]
+            if args.think_time:
+                await asyncio.sleep(random.expovariate(1 / args.think_time))
+    finally:
+        await session.close()
+
+
+def ensure_users(users_file, args):
+    """Add the synthetic accounts to the users file if they are missing"""
+    users = []
+    if os.path.exists(users_file):
+        with open(users_file) as f:
+            users = json.load(f)
+    existing = {u["username"] for u in users}
+    added = 0
+    for index in range(args.users):
+        username = f"{args.user_prefix}{index}"
+        if username not in existing:
+            users.append({"username": username, "password": args.password})
+            added += 1
+    if added:
+        os.makedirs(os.path.dirname(users_file) or ".", exist_ok=True)
+        with open(users_file, "w") as f:
+            json.dump(users, f, indent=2)
+    return added
+
+
+def spawn_server(args):
+    """Start api_server.py in loopback mode inside a scratch working directory"""
+    workdir = tempfile.mkdtemp(prefix="p2p-loadtest-")
+    ensure_users(os.path.join(workdir, "data", "users.json"), args)
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ)
+    env.update({
+        "P2P_AGENT_MODE": "loopback",
+        "API_PORT": str(args.port),
+        "PYTHONPATH": backend_dir + os.pathsep + env.get("PYTHONPATH", ""),
+        "LOG_LEVEL": env.get("LOG_LEVEL", "WARNING"),
+        # Admission control would otherwise dominate the measurement
+        "RATE_LIMIT_USER_RPS": env.get("RATE_LIMIT_USER_RPS", "100000"),
+        "RATE_LIMIT_USER_BURST": env.get("RATE_LIMIT_USER_BURST", "100000"),
+        "RATE_LIMIT_GLOBAL_RPS": env.get("RATE_LIMIT_GLOBAL_RPS", "100000"),
+        "RATE_LIMIT_GLOBAL_BURST": env.get("RATE_LIMIT_GLOBAL_BURST", "100000"),
+        "MAX_INFLIGHT_PER_USER": env.get("MAX_INFLIGHT_PER_USER", "1000"),
+        "MAX_INFLIGHT_GLOBAL": env.get("MAX_INFLIGHT_GLOBAL", "100000"),
+    })
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(backend_dir, "api_server.py")], cwd=workdir, env=env)
+    return process, workdir
+
+
+async def wait_for_server(args, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        session = HttpSession(args.host, args.port)
+        try:
+            status, body = await session.request("GET", "/health")
+            trader_status = (body or {}).get("agents", {}).get("trader_agent")
+            if status == 200 and trader_status in ("running", "loopback"):
+                return True
+        except OSError:
+            pass
+        finally:
+            await session.close()
+        await asyncio.sleep(0.25)
+    return False
+
+
+def report(stats, elapsed):
+    total = sum(len(v) for v in stats.latencies.values())
+    print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n")
+    header = f"{'endpoint':<15}{'count':>8}{'req/s':>9}{'errors':>8}{'429':>6}{'err%':>7}" \
+             f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header)
+    print("-" * len(header))
+    for endpoint in sorted(stats.latencies):
+        values = sorted(stats.latencies[endpoint])
+        statuses = stats.statuses.get(endpoint, {})
+        throttled = statuses.get(429, 0)
+        errors = stats.failures.get(endpoint, 0) + sum(
+            n for s, n in statuses.items() if s >= 400 and s != 429)
+        print(f"{endpoint:<15}{len(values):>8}{len(values) / elapsed:>9.1f}{errors:>8}{throttled:>6}"
+              f"{100 * errors / len(values):>6.1f}%"
+              f"{percentile(values, 50) * 1000:>9.1f}{percentile(values, 90) * 1000:>9.1f}"
+              f"{percentile(values, 99) * 1000:>9.1f}{values[-1] * 1000:>9.1f}")
+
+
+async def main(args):
+    process = workdir = None
+    if args.spawn_server:
+        process, workdir = spawn_server(args)
+    elif args.create_users:
+        added = ensure_users(args.users_file, args)
+        print(f"Added {added} synthetic users to {args.users_file}")
+
+    try:
+        if not await wait_for_server(args):
+            print("Server did not become ready", file=sys.stderr)
+            return 1
+        stats = Stats()
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(run_user(i, args, stats, deadline) for i in range(args.users)))
+        report(stats, time.monotonic() - started)
+        return 0
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the P2P trading API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=20, help="number of concurrent synthetic users")
+    parser.add_argument("--duration", type=float, default=30, help="test duration in seconds")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between requests (s)")
+    parser.add_argument("--batch-size", type=int, default=10, help="orders per /submit_orders call")
+    parser.add_argument("--user-prefix", default="loadtest_user")
+    parser.add_argument("--password", default="loadtest-password")
+    parser.add_argument("--create-users", action="store_true", help="add the synthetic users to --users-file")
+    parser.add_argument("--users-file", default="data/users.json")
+    parser.add_argument("--spawn-server", action="store_true",
+                        help="start api_server.py in loopback mode in a scratch directory")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -1,32 +1,45 @@
 from spade import agent, behaviour, message
 import json
 from p2p_trading.utils.db_helper import DatabaseManager
+from p2p_trading.utils.logger import get_logger
+
+logger = get_logger("market")
 
 class MarketAgent(agent.Agent):
     class OrderMatchingBehaviour(behaviour.CyclicBehaviour):
         async def run(self):
-            print("[Market] Waiting for messages...")
             try:
                 msg = await self.receive(timeout=10)  # wait for incoming messages
                 if msg:
-                    print(f"[Market] Received message from: {msg.sender}")
-                    print(f"[Market] Message content: {msg.body}")
+                    logger.debug("Received message from %s", msg.sender)
+                    logger.debug("Message content: %s", msg.body)
                     try:
                         order = json.loads(msg.body)
-                        print(f"[Market] Parsed order: {order}")
                         db = DatabaseManager()
-                        db.store_order(order)
-                        print(f"[Market] Order stored, checking for matches...")
-                        db.match_orders()
+                        if isinstance(order, list):
+                            # Batch submission: store all orders at once, then run a single matching pass
+                            logger.debug("Parsed batch of %d orders", len(order))
+                            order_ids = db.store_orders(order)
+                            db.match_orders()
+                            if msg.get_metadata("performative") == "request":
+                                reply = msg.make_reply()
+                                reply.set_metadata("performative", "inform")
+                                reply.body = json.dumps({"ids": order_ids})
+                                await self.send(reply)
+                                logger.debug("Acknowledged batch with IDs: %s", order_ids)
+                        else:
+                            logger.debug("Parsed order: %s", order)
+                            db.store_order(order)
+                            db.match_orders()
                     except json.JSONDecodeError as e:
-                        print(f"[Market] JSON parsing error: {e}")
-                        print(f"[Market] Raw message body: {msg.body}")
-                    except Exception as e:
-                        print(f"[Market] General error processing order: {e}")
+                        logger.error("JSON parsing error: %s", e)
+                        logger.debug("Raw message body: %s", msg.body)
+                    except Exception:
+                        logger.exception("General error processing order")
                 else:
-                    print("[Market] No messages received in this cycle")
-            except Exception as e:
-                print(f"[Market] Error in receive cycle: {e}")
+                    logger.debug("No messages received in this cycle")
+            except Exception:
+                logger.exception("Error in receive cycle")
 
 
     # class MessageListener(behaviour.CyclicBehaviour):
@@ -54,11 +67,10 @@ class MarketAgent(agent.Agent):
     #             print(f"[Market] MessageListener error in receive cycle: {e}")
 
     async def setup(self):
-        print(f"[Market] Market Agent {self.jid} starting...")
-        print(f"[Market] Agent is alive: {self.is_alive()}")
+        logger.info("Market Agent %s starting", self.jid)
         
         # two behaviours: order matching and message listener
         self.add_behaviour(self.OrderMatchingBehaviour())
         #self.add_behaviour(self.MessageListener())
         
-        print(f"[Market] Market Agent setup complete")
\ No newline at end of file
+        logger.info("Market Agent setup complete")
\ No newline at end of file
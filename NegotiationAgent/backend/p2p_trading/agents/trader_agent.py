@@ -1,6 +1,13 @@
 from spade import agent, behaviour, message
+from spade.template import Template
+import asyncio
 import json
 import time
+import uuid
+from p2p_trading.utils.config import MARKET_AGENT_JID, BATCH_ACK_TIMEOUT
+from p2p_trading.utils.logger import get_logger
+
+logger = get_logger("trader")
 
 class TraderAgent(agent.Agent):
     class SendOrderBehaviour(behaviour.OneShotBehaviour):
@@ -10,29 +17,65 @@ class TraderAgent(agent.Agent):
 
         async def run(self):
             try:
-                print(f"[Trader] Preparing to send order: {self.order}")
+                logger.debug("Preparing to send order: %s", self.order)
                 msg = message.Message(to="market@localhost")
                 msg.set_metadata("performative", "inform")
                 msg.body = json.dumps(self.order)
                 msg.thread = str(time.time())  # Use current time as thread ID for tracking
                 
-                print(f"[Trader] Message details:")
-                print(f"  - To: {msg.to}")
-                print(f"  - Type: {msg.get_metadata('performative')}")
-                print(f"  - Body: {msg.body}")
+                logger.debug("Message details: to=%s type=%s body=%s", msg.to, msg.get_metadata("performative"), msg.body)
                 
                 await self.send(msg)
-                print(f"[Trader] Message sent successfully")
-            except Exception as e:
-                print(f"[Trader] Error sending message: {e}")
+                logger.debug("Message sent successfully")
+            except Exception:
+                logger.exception("Error sending message")
+
+    class SendOrderBatchBehaviour(behaviour.OneShotBehaviour):
+        def __init__(self, orders, thread, ack):
+            super().__init__()
+            self.orders = orders
+            self.thread = thread
+            self.ack = ack
+
+        async def run(self):
+            order_ids = None
+            try:
+                logger.debug("Preparing to send batch of %d orders", len(self.orders))
+                msg = message.Message(to=MARKET_AGENT_JID)
+                msg.set_metadata("performative", "request")  # the market replies with the assigned IDs
+                msg.body = json.dumps(self.orders)
+                msg.thread = self.thread
+
+                await self.send(msg)
+
+                reply = await self.receive(timeout=BATCH_ACK_TIMEOUT)
+                if reply:
+                    order_ids = json.loads(reply.body).get("ids")
+                    logger.debug("Batch acknowledged with IDs: %s", order_ids)
+                else:
+                    logger.warning("No acknowledgement received for batch %s", self.thread)
+            except Exception:
+                logger.exception("Error sending batch")
+            finally:
+                if not self.ack.done():
+                    self.ack.set_result(order_ids)
 
     async def setup(self):
-        print(f"[Trader] Agent {self.jid} started")
-        print(f"[Trader] Agent is alive: {self.is_alive()}")
+        logger.info("Agent %s started", self.jid)
 
     async def submit_order(self, order):
-        print(f"[Trader] Received order submission request: {order}")
+        logger.debug("Received order submission request: %s", order)
         order["status"] = "open"
-        print(f"[Trader] Adding 'open' status to order")
         self.add_behaviour(self.SendOrderBehaviour(order))
-        print(f"[Trader] SendOrderBehaviour added to agent")
\ No newline at end of file
+
+    async def submit_orders(self, orders):
+        """Send a batch of orders to the market in one message and return the assigned IDs (or None)"""
+        logger.debug("Received batch submission request: %d orders", len(orders))
+        for order in orders:
+            order["status"] = "open"
+        thread = str(uuid.uuid4())
+        ack = asyncio.get_running_loop().create_future()
+        template = Template()
+        template.thread = thread
+        self.add_behaviour(self.SendOrderBatchBehaviour(orders, thread, ack), template)
+        return await ack
\ No newline at end of file
@@ -0,0 +1,119 @@
+import threading
+import numpy as np
+from p2p_trading.utils.logger import get_logger
+
+logger = get_logger("behavioral")
+
+# Circuits of the household dataset: Sub_metering_1 kitchen, Sub_metering_2 laundry room
+# (washing machine, drier, refrigerator, light), Sub_metering_3 water heater and air conditioner
+METERS = ("Sub_metering_1", "Sub_metering_2", "Sub_metering_3")
+APPLIANCE_METERS = {
+    "dishwasher": 0, "oven": 0, "microwave": 0, "kitchen": 0,
+    "washing_machine": 1, "dryer": 1, "tumble_drier": 1, "refrigerator": 1, "fridge": 1, "lighting": 1,
+    "water_heater": 2, "air_conditioner": 2, "hvac": 2,
+}
+# How easily the appliance's use can be shifted or skipped (1 = fully flexible)
+APPLIANCE_FLEXIBILITY = {
+    "refrigerator": 0.05, "fridge": 0.05, "lighting": 0.3, "oven": 0.2, "microwave": 0.3, "kitchen": 0.3,
+    "dishwasher": 0.8, "washing_machine": 0.8, "dryer": 0.85, "tumble_drier": 0.85,
+    "water_heater": 0.6, "air_conditioner": 0.5, "hvac": 0.5, "entertainment": 0.7,
+}
+DEFAULT_FLEXIBILITY = 0.5
+SCORE_WEIGHTS = (0.4, 0.2, 0.4)  # usage share, time-of-use regularity, inflexibility
+
+
+def appliance_name(appliance):
+    name = appliance.get("name", "") if isinstance(appliance, dict) else str(appliance)
+    return name.strip().lower().replace(" ", "_")
+
+
+class ApplianceScorer:
+    """
+    Appliance priority from per-user sub-metering aggregates.
+
+    Each user is one row of compact float32 arrays: energy per meter and hour of day
+    ([users, 3, 24]) and the number of readings per hour ([users, 24]). A score combines the
+    meter's share of the user's usage, how concentrated that usage is in time (1 minus the
+    normalized entropy of its hour-of-day profile) and the appliance's inflexibility; rank 1
+    is the appliance to keep running first.
+    """
+    def __init__(self, initial_capacity=1024):
+        self.index = {}  # user id -> row
+        self.energy = np.zeros((initial_capacity, len(METERS), 24), dtype=np.float32)
+        self.readings = np.zeros((initial_capacity, 24), dtype=np.float32)
+        self.lock = threading.Lock()
+
+    def _row(self, user_id):
+        row = self.index.get(user_id)
+        if row is None:
+            row = self.index[user_id] = len(self.index)
+            if row >= len(self.energy):
+                self.energy = np.concatenate([self.energy, np.zeros_like(self.energy)])
+                self.readings = np.concatenate([self.readings, np.zeros_like(self.readings)])
+        return row
+
+    def ingest(self, user_id, hours, sub_metering):
+        """
+        Add sub-metering readings to a user's aggregates.
+
+        Args:
+            user_id (str): User identifier
+            hours (list): Hour of day (0-23) of each reading
+            sub_metering (list): [Sub_metering_1, Sub_metering_2, Sub_metering_3] per reading (Wh)
+
+        Returns:
+            int: Total readings aggregated for the user
+        """
+        hours = np.asarray(hours, dtype=np.int64) % 24
+        values = np.asarray(sub_metering, dtype=np.float32).reshape(-1, len(METERS))
+        with self.lock:
+            row = self._row(user_id)
+            for meter in range(len(METERS)):
+                self.energy[row, meter] += np.bincount(hours, weights=values[:, meter], minlength=24)
+            self.readings[row] += np.bincount(hours, minlength=24)
+            total = int(self.readings[row].sum())
+        logger.debug("Aggregated %d readings for user %s (%d total)", len(hours), user_id, total)
+        return total
+
+    def _features(self, rows):
+        """Usage share and regularity per meter for the given rows (-1 = unknown user), each [len(rows), 3]"""
+        energy = self.energy[np.maximum(rows, 0)].astype(np.float64)
+        energy[rows < 0] = 0.0
+        per_meter = energy.sum(axis=2)
+        totals = per_meter.sum(axis=1, keepdims=True)
+        # Users without data get an even split and no regularity signal
+        share = np.divide(per_meter, totals, out=np.full_like(per_meter, 1 / len(METERS)), where=totals > 0)
+
+        profile = np.divide(energy, per_meter[:, :, None], out=np.zeros_like(energy), where=per_meter[:, :, None] > 0)
+        entropy = -np.sum(profile * np.log(profile, out=np.zeros_like(profile), where=profile > 0), axis=2)
+        regularity = np.where(per_meter > 0, 1 - entropy / np.log(24), 0.0)
+        return share, regularity
+
+    def score(self, user_ids, appliances):
+        """
+        Score and rank appliances for many users in one vectorized pass.
+
+        Returns:
+            tuple: (scores [len(user_ids), len(appliances)], ranks of the same shape, 1 = highest)
+        """
+        names = [appliance_name(a) for a in appliances]
+        meters = np.array([APPLIANCE_METERS.get(n, -1) for n in names], dtype=np.int64)
+        inflexibility = 1 - np.array([APPLIANCE_FLEXIBILITY.get(n, DEFAULT_FLEXIBILITY) for n in names])
+
+        with self.lock:
+            rows = np.array([self.index.get(u, -1) for u in user_ids], dtype=np.int64)
+            share, regularity = self._features(rows)
+
+        known = meters >= 0
+        meter_share = np.where(known, share[:, np.where(known, meters, 0)], 1 / len(METERS))
+        meter_regularity = np.where(known, regularity[:, np.where(known, meters, 0)], 0.0)
+        w_share, w_regularity, w_inflexibility = SCORE_WEIGHTS
+        scores = w_share * meter_share + w_regularity * meter_regularity + w_inflexibility * inflexibility
+
+        order = np.argsort(-scores, axis=1, kind="stable")
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.arange(1, len(names) + 1)[None, :].repeat(len(rows), axis=0), axis=1)
+        return scores, ranks
+
+    def stats(self):
+        return {"users": len(self.index), "capacity": len(self.energy)}
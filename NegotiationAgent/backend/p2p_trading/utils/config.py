@@ -1,5 +1,96 @@
+import os
+
 # XMPP 
 XMPP_SERVER = "localhost"
 MARKET_AGENT_JID = "market@localhost"
 TRADER_AGENT_JID = "trader@localhost"
-PASSWORD = "password"
\ No newline at end of file
+PASSWORD = "password"
+
+# Bulk order submission
+MAX_BATCH_ORDERS = 100  # maximum number of orders accepted by /submit_orders
+BATCH_ACK_TIMEOUT = 5  # seconds to wait for the market to acknowledge a batch
+
+# Admission control for the order endpoints (overridable through environment variables)
+RATE_LIMIT_USER_RPS = float(os.getenv("RATE_LIMIT_USER_RPS", 5))  # sustained requests per second per user
+RATE_LIMIT_USER_BURST = float(os.getenv("RATE_LIMIT_USER_BURST", 20))
+RATE_LIMIT_GLOBAL_RPS = float(os.getenv("RATE_LIMIT_GLOBAL_RPS", 200))  # sustained requests per second for all users
+RATE_LIMIT_GLOBAL_BURST = float(os.getenv("RATE_LIMIT_GLOBAL_BURST", 400))
+MAX_INFLIGHT_PER_USER = int(os.getenv("MAX_INFLIGHT_PER_USER", 4))  # concurrent order requests per user
+MAX_INFLIGHT_GLOBAL = int(os.getenv("MAX_INFLIGHT_GLOBAL", 64))
+# The limits above are for the whole deployment. Admission state lives in each API process, so with
+# N stateless workers in the split deployment (gunicorn -w N) set this to N and every worker
+# enforces 1/N of each limit
+API_WORKERS = max(1, int(os.getenv("P2P_API_WORKERS", 1)))
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", 1))  # keep 1 in N INFO/DEBUG records per call site
+
+# Split deployment: when set, API workers forward order operations to a separate matching engine
+# process listening on this address ("host:port" for TCP, otherwise a Unix socket path)
+ENGINE_ADDRESS = os.getenv("P2P_ENGINE_ADDRESS")
+ENGINE_AUTHKEY = os.getenv("P2P_ENGINE_AUTHKEY", "p2p-engine-key").encode()
+
+# Agent mode for the process that owns the order book: "xmpp" runs the SPADE agents,
+# "loopback" stores and matches orders in-process without an XMPP server (local testing)
+AGENT_MODE = os.getenv("P2P_AGENT_MODE", "xmpp")
+
+# HTTP port used when api_server.py is run directly
+API_PORT = int(os.getenv("API_PORT", 5000))
+
+# PBKDF2-SHA256 work factor for stored password hashes (raise as hardware gets faster)
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", 200000))
+
+# Prediction model (the Prediction Agent's LSTM, loaded lazily on first use)
+PREDICTION_AGENT_DIR = os.getenv(
+    "PREDICTION_AGENT_DIR",
+    os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..", "PredictionAgent")))
+# A model bundle (weights plus the training scaler, see PredictionAgent/model_bundle.py) is preferred
+# when present, so start-up does not read the dataset; otherwise the bare weights are used
+PREDICTION_BUNDLE_PATH = os.path.join(PREDICTION_AGENT_DIR, "best_model.bundle.pt")
+PREDICTION_MODEL_PATH = os.getenv(
+    "PREDICTION_MODEL_PATH",
+    PREDICTION_BUNDLE_PATH if os.path.exists(PREDICTION_BUNDLE_PATH) else os.path.join(PREDICTION_AGENT_DIR, "best_model.pth"))
+# "eager", "torchscript" or "onnx"; the latter two load artifacts from PredictionAgent/model_export.py
+PREDICTION_BACKEND = os.getenv("PREDICTION_BACKEND", "eager")
+# Dynamic int8 quantization of the eager model (CPU only; see PredictionAgent/benchmark_quantization.py)
+PREDICTION_QUANTIZED = os.getenv("PREDICTION_QUANTIZED", "0") == "1"
+PREDICTION_DATA_PATH = os.getenv(
+    "PREDICTION_DATA_PATH", os.path.join(PREDICTION_AGENT_DIR, "household_power_consumption.csv"))
+PREDICTION_STEP_HOURS = float(os.getenv("PREDICTION_STEP_HOURS", 1.0))  # duration of one forecast step
+PREDICTION_BATCH_MAX_SIZE = int(os.getenv("PREDICTION_BATCH_MAX_SIZE", 64))
+PREDICTION_BATCH_MAX_WAIT_MS = float(os.getenv("PREDICTION_BATCH_MAX_WAIT_MS", 5))
+PREDICTION_TIMEOUT = float(os.getenv("PREDICTION_TIMEOUT", 10))  # seconds a request waits for its forecast
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", 1024))  # max cached (profile, period) forecasts
+PREDICTION_CACHE_TTL = float(os.getenv("PREDICTION_CACHE_TTL", 300))  # seconds
+
+# Order-book pricing
+PRICING_TICK = float(os.getenv("PRICING_TICK", 0.01))  # price step of the quote grid
+PRICING_MAX_TICKS = int(os.getenv("PRICING_MAX_TICKS", 50))  # furthest quote from the opposite best
+PRICING_VWAP_FILLS = int(os.getenv("PRICING_VWAP_FILLS", 100))  # fills in the VWAP window
+PRICING_TARGET_FILL = float(os.getenv("PRICING_TARGET_FILL", 0.8))  # default target fill probability
+PRICING_PRIOR_WEIGHT = float(os.getenv("PRICING_PRIOR_WEIGHT", 5))  # pseudo-orders behind the prior curve
+
+# Demand response
+MAX_DR_HOUSEHOLDS = int(os.getenv("MAX_DR_HOUSEHOLDS", 100000))  # households per /api/demand_response/batch call
+
+# Appliance priority scoring
+MAX_SCORING_USERS = int(os.getenv("MAX_SCORING_USERS", 100000))  # users per /api/appliance_priority/batch call
+
+# Model execution (kept off the request threads)
+MODEL_WORKERS = int(os.getenv("MODEL_WORKERS", 4))  # concurrent model calls
+MODEL_QUEUE_SIZE = int(os.getenv("MODEL_QUEUE_SIZE", 32))  # calls allowed to wait for a worker
+MODEL_CALL_TIMEOUT = float(os.getenv("MODEL_CALL_TIMEOUT", 2.0))  # seconds before a degraded answer
+# Prediction calls block in the micro-batcher, so they get their own pool with room for a full batch
+# (a smaller pool would cap the batch at its size) and a deadline covering the batcher's own timeout
+PREDICTION_WORKERS = int(os.getenv("PREDICTION_WORKERS", max(MODEL_WORKERS, PREDICTION_BATCH_MAX_SIZE)))
+PREDICTION_CALL_TIMEOUT = max(float(os.getenv("PREDICTION_CALL_TIMEOUT", PREDICTION_TIMEOUT)), PREDICTION_TIMEOUT)
+# Fleet demand response plans take ~15us per household, so a full batch gets its own pool and a
+# deadline of MODEL_CALL_TIMEOUT plus DR_SECONDS_PER_HOUSEHOLD for each household
+DR_WORKERS = int(os.getenv("DR_WORKERS", 2))
+DR_SECONDS_PER_HOUSEHOLD = float(os.getenv("DR_SECONDS_PER_HOUSEHOLD", 0.00005))
+MODEL_REGISTRY_MAX_LOADED = int(os.getenv("MODEL_REGISTRY_MAX_LOADED", 4))  # models kept in memory (LRU)
+MODEL_LOAD_RETRY_SECONDS = float(os.getenv("MODEL_LOAD_RETRY_SECONDS", 30))  # wait before retrying a failed load
+MODEL_SWAP_TIMEOUT = float(os.getenv("MODEL_SWAP_TIMEOUT", 30))  # seconds a hot swap may take before a 503
+MODEL_ARTIFACT_DIR = os.getenv("MODEL_ARTIFACT_DIR", PREDICTION_AGENT_DIR)  # checkpoints allowed for hot swap
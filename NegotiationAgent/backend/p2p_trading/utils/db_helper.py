@@ -1,77 +1,122 @@
 import os
 import json
-import traceback
+import logging
 import time
+from p2p_trading.utils.metrics import (
+    MATCHING_DURATION, MATCHES_FOUND, ORDER_BOOK_SIZE,
+    STORE_READS, STORE_READ_BYTES, STORE_WRITES, STORE_WRITE_BYTES
+)
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.pricing_engine import PRICER
+
+logger = get_logger("db")
+match_logger = get_logger("match")
 
 ORDERS_FILE = "data/orders.json"
 
+
+def next_order_id(orders):
+    """One past the highest stored ID, so IDs stay unique after orders are deleted"""
+    return max((o["id"] for o in orders if o.get("id") is not None), default=0) + 1
+
 class DatabaseManager:
     def __init__(self):
         try:
-            print(f"[DB] Initializing database manager")
-            print(f"[DB] Current working directory: {os.getcwd()}")
-            print(f"[DB] Orders file path: {os.path.abspath(ORDERS_FILE)}")
+            logger.debug("Initializing database manager, orders file: %s", os.path.abspath(ORDERS_FILE))
             
             os.makedirs("data", exist_ok=True)
-            print(f"[DB] Data directory created/exists: {os.path.exists('data')}")
             
             if not os.path.exists(ORDERS_FILE):
-                print(f"[DB] Creating new orders file")
+                logger.info("Creating new orders file")
                 with open(ORDERS_FILE, "w") as f:
                     json.dump([], f)
-                print(f"[DB] New orders file created: {os.path.exists(ORDERS_FILE)}")
-            else:
-                print(f"[DB] Orders file already exists")
-        except Exception as e:
-            print(f"[DB] Error in database initialization: {e}")
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error in database initialization")
 
     def store_order(self, order):
         try:
             orders = self.get_all_orders()
-            order["id"] = len(orders) + 1  # generate order id
+            order["id"] = next_order_id(orders)
             orders.append(order)
-            print(f"[DB] Storing order: {order}")
-            print(f"[DB] Total orders after add: {len(orders)}")
-            with open(ORDERS_FILE, "w") as f:
-                json.dump(orders, f, indent=2)
-            print(f"[DB] Order stored successfully to {ORDERS_FILE}")
-        except Exception as e:
-            print(f"[DB] Error storing order: {e}")
-            print(traceback.format_exc())
+            logger.debug("Storing order: %s", order)
+            self._write_orders(orders)
+            PRICER.order_added(order)
+            logger.info("Order stored", extra={"order_id": order["id"], "total_orders": len(orders)})
+        except Exception:
+            logger.exception("Error storing order")
             # Emergency measure: write the order directly to a backup file
             try:
                 with open("data/emergency_orders.json", "a") as f:
                     f.write(json.dumps(order) + "\n")
-                print(f"[DB] Order saved to emergency file")
+                logger.warning("Order saved to emergency file")
+            except Exception as ee:
+                logger.error("Failed to save to emergency file: %s", ee)
+
+    def store_orders(self, new_orders):
+        """Store a batch of orders with a single read-modify-write, returning their IDs"""
+        try:
+            orders = self.get_all_orders()
+            order_ids = []
+            next_id = next_order_id(orders)
+            for order in new_orders:
+                order["id"] = next_id
+                next_id += 1
+                orders.append(order)
+                order_ids.append(order["id"])
+            self._write_orders(orders)
+            for order in new_orders:
+                PRICER.order_added(order)
+            logger.info("Order batch stored", extra={"batch_size": len(new_orders), "total_orders": len(orders)})
+            return order_ids
+        except Exception:
+            logger.exception("Error storing order batch")
+            # Emergency measure: write the orders directly to a backup file
+            try:
+                with open("data/emergency_orders.json", "a") as f:
+                    for order in new_orders:
+                        f.write(json.dumps(order) + "\n")
+                logger.warning("Order batch saved to emergency file")
             except Exception as ee:
-                print(f"[DB] Failed to save to emergency file: {ee}")
+                logger.error("Failed to save to emergency file: %s", ee)
+            return [None] * len(new_orders)
 
     def get_all_orders(self):
         try:
-            print(f"[DB] Reading all orders from {ORDERS_FILE}")
             if not os.path.exists(ORDERS_FILE):
-                print(f"[DB] Orders file does not exist, creating empty file")
+                logger.info("Orders file does not exist, creating empty file")
                 with open(ORDERS_FILE, "w") as f:
                     json.dump([], f)
                 return []
             
-            with open(ORDERS_FILE, "r") as f:
-                orders = json.load(f)
-            print(f"[DB] Read {len(orders)} orders from file")
+            with open(ORDERS_FILE, "rb") as f:
+                raw = f.read()
+            STORE_READS.inc()
+            STORE_READ_BYTES.inc(len(raw))
+            orders = json.loads(raw)
+            logger.debug("Read %d orders from %s", len(orders), ORDERS_FILE)
             return orders
-        except Exception as e:
-            print(f"[DB] Error reading orders: {e}")
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error reading orders")
             return []
 
+    def _write_orders(self, orders):
+        """Rewrite the whole orders file, recording the write in the store metrics"""
+        # Write to a temporary file and swap it in, so readers never see a half-written book
+        tmp_file = f"{ORDERS_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(orders, f, indent=2)
+            written = f.tell()
+        os.replace(tmp_file, ORDERS_FILE)
+        STORE_WRITES.inc()
+        STORE_WRITE_BYTES.inc(written)
+
     def match_orders(self):
         try:
-            print(f"[DB] Starting order matching process")
+            started = time.perf_counter()
             orders = self.get_all_orders()
             buys = [o for o in orders if o["type"] == "buy" and o["status"] == "open"]
             sells = [o for o in orders if o["type"] == "sell" and o["status"] == "open"]
-            print(f"[DB] Found {len(buys)} buy orders and {len(sells)} sell orders")
+            logger.debug("Matching %d buy orders against %d sell orders", len(buys), len(sells))
 
             # Sort by price (primary) and quantity (secondary)
             # For buys: price descending, amount descending
@@ -79,8 +124,9 @@ class DatabaseManager:
             # For sells: price ascending, amount descending (using negative to achieve descending)
             sells.sort(key=lambda x: (x["price"], -x["amount"]))
             
-            print(f"[DB] Sorted buy orders: {[(o['id'], o['price'], o['amount']) for o in buys]}")
-            print(f"[DB] Sorted sell orders: {[(o['id'], o['price'], o['amount']) for o in sells]}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Sorted buy orders: %s", [(o['id'], o['price'], o['amount']) for o in buys])
+                logger.debug("Sorted sell orders: %s", [(o['id'], o['price'], o['amount']) for o in sells])
             
             matches_found = 0
             matched_ids = set()  # Track already matched order IDs
@@ -113,7 +159,7 @@ class DatabaseManager:
                             matched_ids.add(sell["id"])
                             matches_found += 1
                             
-                            print(f"[MATCH] Complete match: {buy['user']} buys ← {sell['user']} sells! Price: ${buy['price']} Amount: {buy['amount']} kWh")
+                            match_logger.info("Complete match: %s buys <- %s sells, price %s, amount %s kWh", buy['user'], sell['user'], buy['price'], buy['amount'])
                             break  # Found a complete match for this buy order, move to next buy order
                         
                         # Case 2: Buy amount > Sell amount - Partial match for buy, complete match for sell
@@ -144,7 +190,7 @@ class DatabaseManager:
                             matched_ids.add(sell["id"])
                             matches_found += 1
                             
-                            print(f"[MATCH] Partial match (buy): {buy['user']} buys {sell['amount']} ← {sell['user']} sells {sell['amount']} kWh, Remaining buy amount: {remaining_amount} kWh")
+                            match_logger.info("Partial match (buy): %s buys %s <- %s sells %s kWh, remaining buy amount %s kWh", buy['user'], sell['amount'], sell['user'], sell['amount'], remaining_amount)
                             break  # Found a partial match for this buy order, move to next buy order
                             
                         # Case 3: Sell amount > Buy amount - Complete match for buy, partial match for sell
@@ -175,67 +221,76 @@ class DatabaseManager:
                             matched_ids.add(sell["id"])
                             matches_found += 1
                             
-                            print(f"[MATCH] Partial match (sell): {buy['user']} buys {buy['amount']} ← {sell['user']} sells {buy['amount']} kWh, Remaining sell amount: {remaining_amount} kWh")
+                            match_logger.info("Partial match (sell): %s buys %s <- %s sells %s kWh, remaining sell amount %s kWh", buy['user'], buy['amount'], sell['user'], buy['amount'], remaining_amount)
                             break  # Found a match for this buy order, move to next buy order
             
             # Add new orders created from partial matches
+            next_id = next_order_id(orders)
             for new_order in new_orders:
                 if new_order["id"] is None:
-                    new_order["id"] = len(orders) + 1
+                    new_order["id"] = next_id
+                    next_id += 1
                     orders.append(new_order)
-                    print(f"[DB] Created new order: User {new_order['user']} {new_order['type']} {new_order['amount']} kWh at ${new_order['price']}")
+                    logger.debug("Created remainder order: user %s %s %s kWh at %s", new_order['user'], new_order['type'], new_order['amount'], new_order['price'])
 
-            print(f"[DB] Found {matches_found} matching orders")
             if matches_found > 0 or len(new_orders) > 0:
-                with open(ORDERS_FILE, "w") as f:
-                    json.dump(orders, f, indent=2)
-                print(f"[DB] Updated order statuses and created {len(new_orders)} new orders")
+                self._write_orders(orders)
+                # Keep the pricing engine's book, fills and fill curves in step with the store
+                for order in buys + sells:
+                    if order["id"] in matched_ids:
+                        PRICER.order_closed(order["id"], filled=True)
+                        if order["type"] == "buy":
+                            PRICER.fill(order["price"], order["amount"])
+                for new_order in new_orders:
+                    PRICER.order_added(new_order)
+                logger.info("Matching pass updated the book", extra={"matches": matches_found, "new_orders": len(new_orders)})
+
+            MATCHING_DURATION.observe(time.perf_counter() - started)
+            MATCHES_FOUND.inc(matches_found)
+            for side, book in (("buy", buys), ("sell", sells)):
+                still_open = sum(1 for o in book if o["status"] == "open")
+                still_open += sum(1 for o in new_orders if o["type"] == side)
+                ORDER_BOOK_SIZE.set(still_open, side=side)
             return matches_found
-        except Exception as e:
-            print(f"[DB] Error matching orders: {e}")
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error matching orders")
             return 0
 
     def delete_order(self, order_id):
         try:
-            print(f"[DB] Deleting order with ID: {order_id}")
             orders = self.get_all_orders()
             filtered_orders = [o for o in orders if o.get('id') != order_id]
             
             if len(filtered_orders) == len(orders):
-                print(f"[DB] Order with ID {order_id} not found")
+                logger.info("Order %s not found for deletion", order_id)
                 return False
             
-            with open(ORDERS_FILE, "w") as f:
-                json.dump(filtered_orders, f, indent=2)
-            print(f"[DB] Order {order_id} deleted successfully")
+            self._write_orders(filtered_orders)
+            PRICER.order_closed(order_id)
+            logger.info("Order deleted", extra={"order_id": order_id})
             return True
-        except Exception as e:
-            print(f"[DB] Error deleting order: {e}")
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error deleting order")
             return False
     
     def get_matched_orders(self):
         try:
             orders = self.get_all_orders()
             matched_orders = [o for o in orders if o["status"] == "matched" or o["status"] == "partially_matched"]
-            print(f"[DB] Found {len(matched_orders)} matched orders")
+            logger.debug("Found %d matched orders", len(matched_orders))
             return matched_orders
-        except Exception as e:
-            print(f"[DB] Error getting matched orders: {e}")
-            print(traceback.format_exc())
+        except Exception:
+            logger.exception("Error getting matched orders")
             return []
 
 # Path: backend/p2p_trading/utils/db_helper.py
 def get_open_orders():
     try:
-        print(f"[API] Getting open orders")
         db = DatabaseManager()
         orders = db.get_all_orders()
         open_orders = [o for o in orders if o["status"] == "open"]
-        print(f"[API] Found {len(open_orders)} open orders")
+        logger.debug("Found %d open orders", len(open_orders))
         return open_orders
-    except Exception as e:
-        print(f"[API] Error getting open orders: {e}")
-        print(traceback.format_exc())
+    except Exception:
+        logger.exception("Error getting open orders")
         return []
\ No newline at end of file
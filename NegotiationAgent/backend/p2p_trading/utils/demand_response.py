@@ -0,0 +1,141 @@
+import math
+import numpy as np
+from p2p_trading.utils.logger import get_logger
+
+logger = get_logger("demand_response")
+
+DEFAULT_DURATION_HOURS = 2.0
+DEFAULT_INCENTIVE_PER_KWH = 0.05
+
+
+def flatten_households(households):
+    """
+    Turn household profiles into flat per-load arrays.
+
+    Each profile looks like:
+        {"household_id": "h1",
+         "flexible_loads": {"hvac": 3.0, "water_heater": 2.0},   # kW currently drawn
+         "comfort_bounds": {"hvac": 0.5},                         # max share of a load to shed
+         "incentive_per_kwh": 0.06}                               # asking price per kWh shed
+
+    Returns:
+        tuple: (household ids, load names, household index per load, curtailable kW per load,
+                incentive per kWh per load)
+    """
+    ids, names, owner, curtailable, price = [], [], [], [], []
+    for index, household in enumerate(households):
+        ids.append(household.get("household_id", index))
+        loads = household.get("flexible_loads") or {}
+        bounds = household.get("comfort_bounds") or {}
+        rate = float(household.get("incentive_per_kwh", DEFAULT_INCENTIVE_PER_KWH))
+        for name, kw in loads.items():
+            names.append(name)
+            owner.append(index)
+            curtailable.append(float(kw) * min(1.0, max(0.0, float(bounds.get(name, 1.0)))))
+            price.append(rate)
+    return (ids, names, np.asarray(owner, dtype=np.int64), np.asarray(curtailable, dtype=np.float64),
+            np.asarray(price, dtype=np.float64))
+
+
+def _is_number(value):
+    return not isinstance(value, bool) and isinstance(value, (int, float)) and math.isfinite(value)
+
+
+def validate_fleet_request(grid_status, households):
+    """Return an error message for a malformed grid event or household profile, or None if both are valid"""
+    if not isinstance(grid_status, dict):
+        return "grid_status must be an object"
+    for field in ("target_reduction_kw", "duration_hours", "max_incentive_per_kwh"):
+        if grid_status.get(field) is not None and not _is_number(grid_status[field]):
+            return f"grid_status.{field} must be a number"
+    for index, household in enumerate(households):
+        if not isinstance(household, dict):
+            return f"households[{index}] must be an object"
+        for field in ("flexible_loads", "comfort_bounds"):
+            values = household.get(field) or {}
+            if not isinstance(values, dict) or not all(_is_number(value) for value in values.values()):
+                return f"households[{index}].{field} must map load names to numbers"
+        if "incentive_per_kwh" in household and not _is_number(household["incentive_per_kwh"]):
+            return f"households[{index}].incentive_per_kwh must be a number"
+    return None
+
+
+def allocate_curtailment(target_kw, curtailable_kw, incentive_per_kwh, max_incentive_per_kwh=None):
+    """
+    Minimum-cost curtailment that reaches `target_kw` (the LP relaxation of the fleet problem).
+
+    With linear incentives and per-load upper bounds the LP is a fractional knapsack, so the
+    greedy rule is optimal: shed the cheapest kW first, and only part of the marginal load.
+
+    Returns:
+        numpy.ndarray: kW to shed per load
+    """
+    eligible = curtailable_kw > 0
+    if max_incentive_per_kwh is not None:
+        eligible &= incentive_per_kwh <= max_incentive_per_kwh
+    order = np.flatnonzero(eligible)
+    order = order[np.argsort(incentive_per_kwh[order], kind="stable")]
+
+    shed = np.zeros_like(curtailable_kw)
+    cumulative = np.cumsum(curtailable_kw[order])
+    # Loads fully shed before the cumulative capacity reaches the target, then a partial one
+    full = np.searchsorted(cumulative, target_kw, side="left")
+    shed[order[:full]] = curtailable_kw[order[:full]]
+    if full < len(order):
+        already = cumulative[full - 1] if full else 0.0
+        shed[order[full]] = max(0.0, target_kw - already)
+    return shed
+
+
+class DemandResponseOptimizer:
+    """Fleet-wide curtailment planning for a grid event"""
+    def plan(self, grid_status, households):
+        """
+        Split a grid event's target reduction across households at minimum incentive cost.
+
+        Args:
+            grid_status (dict): "target_reduction_kw", optional "duration_hours" and
+                "max_incentive_per_kwh"
+            households (list): Household profiles (see flatten_households)
+
+        Returns:
+            dict: Fleet totals and one plan per household that is asked to curtail
+        """
+        target_kw = float(grid_status.get("target_reduction_kw", 0.0))
+        duration = float(grid_status.get("duration_hours", DEFAULT_DURATION_HOURS))
+        max_rate = grid_status.get("max_incentive_per_kwh")
+        ids, names, owner, curtailable, price = flatten_households(households)
+
+        shed = allocate_curtailment(target_kw, curtailable, price,
+                                    float(max_rate) if max_rate is not None else None)
+        incentive = shed * duration * price
+
+        # Per-household totals in one pass over the load arrays
+        household_kw = np.bincount(owner, weights=shed, minlength=len(ids))
+        household_incentive = np.bincount(owner, weights=incentive, minlength=len(ids))
+        active_loads = np.flatnonzero(shed > 0)
+        loads_by_household = {}
+        for load in active_loads:
+            loads_by_household.setdefault(owner[load], {})[names[load]] = round(float(shed[load]), 4)
+
+        plans = [{
+            "household_id": ids[index],
+            "reduction_kw": round(float(household_kw[index]), 4),
+            "incentive": round(float(household_incentive[index]), 4),
+            "loads": loads_by_household[index]
+        } for index in np.flatnonzero(household_kw > 0)]
+
+        achieved = float(shed.sum())
+        logger.info("Demand response plan computed", extra={
+            "households": len(ids), "loads": len(names), "target_kw": target_kw, "achieved_kw": achieved})
+        return {
+            "target_reduction_kw": target_kw,
+            "achieved_reduction_kw": round(achieved, 4),
+            "shortfall_kw": round(max(0.0, target_kw - achieved), 4),
+            "total_incentive": round(float(incentive.sum()), 4),
+            "marginal_incentive_per_kwh": float(price[active_loads].max()) if len(active_loads) else 0.0,
+            "time_window": f"next {duration:g} hours",
+            "households_called": len(plans),
+            "plans": plans,
+            "method": "demand_response_lp"
+        }
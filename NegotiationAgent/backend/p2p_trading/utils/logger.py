@@ -0,0 +1,119 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from p2p_trading.utils.config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_EVERY
+
+ROOT_LOGGER = "p2p"
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is a structured field
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_setup_lock = threading.Lock()
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as one line, appending `extra=` fields as key=value pairs or JSON keys"""
+    def __init__(self, json_lines=False):
+        super().__init__()
+        self.json_lines = json_lines
+
+    def format(self, record):
+        fields = {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS}
+        timestamp = self.formatTime(record)
+        message = record.getMessage()
+        exc_text = self.formatException(record.exc_info) if record.exc_info else None
+
+        if self.json_lines:
+            payload = {"ts": timestamp, "level": record.levelname, "logger": record.name, "msg": message}
+            payload.update(fields)
+            if exc_text:
+                payload["exc"] = exc_text
+            return json.dumps(payload, default=str)
+
+        line = f"{timestamp} {record.levelname} [{record.name}] {message}"
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        if exc_text:
+            line += "\n" + exc_text
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps one in every `every_n` records per call site at or below `max_level`; higher levels always pass.
+    At most `max_sites` call sites are counted; past that the counts start over.
+    """
+    def __init__(self, every_n, max_level=logging.INFO, max_sites=4096):
+        super().__init__()
+        self.every_n = max(1, int(every_n))
+        self.max_level = max_level
+        self.max_sites = max_sites
+        self.counts = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if self.every_n == 1 or record.levelno > self.max_level:
+            return True
+        key = (record.pathname, record.lineno)
+        with self.lock:
+            count = self.counts.get(key, 0)
+            if count == 0 and len(self.counts) >= self.max_sites:
+                self.counts.clear()
+            self.counts[key] = count + 1
+        return count % self.every_n == 0
+
+
+class InProcessQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that hands records to the listener thread unformatted.
+    The queue never leaves the process, so message formatting and the stdout write
+    both happen on the listener thread instead of the request or agent thread.
+    """
+    def prepare(self, record):
+        return record
+
+
+def setup_logging(level=LOG_LEVEL, json_lines=None, sample_every=LOG_SAMPLE_EVERY, stream=None):
+    """Install the queue handler on the `p2p` logger and start the listener thread (idempotent)"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return
+        if json_lines is None:
+            json_lines = LOG_FORMAT == "json"
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(StructuredFormatter(json_lines=json_lines))
+
+        log_queue = queue.SimpleQueue()
+        handler = InProcessQueueHandler(log_queue)
+        handler.addFilter(SamplingFilter(sample_every))
+
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(handler)
+        root.propagate = False
+
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def get_logger(name):
+    """Return the `p2p.<name>` logger, setting up logging on first use"""
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,307 @@
+import asyncio
+import os
+import queue
+import threading
+from multiprocessing.connection import Client, Listener
+from p2p_trading.agents.trader_agent import TraderAgent
+from p2p_trading.agents.market_agent import MarketAgent
+from p2p_trading.utils.db_helper import get_open_orders, DatabaseManager
+from p2p_trading.utils.metrics import REGISTRY, ENGINE_METRICS
+from p2p_trading.utils.pricing_engine import PRICER
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.config import TRADER_AGENT_JID, MARKET_AGENT_JID, PASSWORD, BATCH_ACK_TIMEOUT, AGENT_MODE
+
+logger = get_logger("engine")
+
+
+def parse_engine_address(address):
+    """Turn "host:port" into a TCP address tuple; anything else is a Unix socket path"""
+    if ":" in address and not address.startswith("/"):
+        host, port = address.rsplit(":", 1)
+        return host, int(port)
+    return address
+
+
+class LocalMarketService:
+    """
+    Owns the market and trader agents and the order book.
+    The agents run on a private event loop in a background thread, and every write to the
+    order store (storing, matching and deleting orders) happens on that loop's thread,
+    so the book has a single writer.
+    """
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.trader_agent = None
+        self.market_agent = None
+        self.thread = None
+
+    def start(self):
+        """Start the agent thread (called once per process)"""
+        if self.thread is None:
+            # Seed the pricing engine once; the order store keeps it current from here on
+            PRICER.rebuild(DatabaseManager().get_all_orders())
+            self.thread = threading.Thread(target=self._run_agents, daemon=True)
+            self.thread.start()
+
+    async def _start_agents(self):
+        try:
+            logger.info("Starting market agent")
+            self.market_agent = MarketAgent(MARKET_AGENT_JID, PASSWORD)
+            await self.market_agent.start()
+            logger.info("Market agent started: %s, alive: %s", self.market_agent.jid, self.market_agent.is_alive())
+
+            logger.info("Starting trader agent")
+            self.trader_agent = TraderAgent(TRADER_AGENT_JID, PASSWORD)
+            await self.trader_agent.start()
+            logger.info("Trader agent started: %s, alive: %s", self.trader_agent.jid, self.trader_agent.is_alive())
+
+            logger.info("Both agents are now running")
+        except Exception:
+            logger.exception("Error starting agents")
+
+    def _run_agents(self):
+        try:
+            logger.debug("Setting up agent thread")
+            asyncio.set_event_loop(self.loop)
+            self.loop.run_until_complete(self._start_agents())
+            logger.debug("Agents started, now running event loop forever")
+            self.loop.run_forever()
+        except Exception:
+            logger.exception("Error in agent thread")
+
+    def _call_in_loop(self, fn, *args, timeout=5):
+        """Run a synchronous function on the agent loop thread and wait for its result"""
+        async def run():
+            return fn(*args)
+        return asyncio.run_coroutine_threadsafe(run(), self.loop).result(timeout=timeout)
+
+    def is_ready(self):
+        return self.trader_agent is not None and self.trader_agent.is_alive()
+
+    def agent_status(self):
+        return {
+            "trader_agent": "running" if self.trader_agent and self.trader_agent.is_alive() else "not running",
+            "market_agent": "running" if self.market_agent and self.market_agent.is_alive() else "not running"
+        }
+
+    def mailbox_depths(self):
+        depths = {}
+        for name, agent in (("trader", self.trader_agent), ("market", self.market_agent)):
+            if agent is not None:
+                depths[name] = sum(b.mailbox_size() for b in list(agent.behaviours))
+        return depths
+
+    def submit_order(self, order, timeout=5):
+        future = asyncio.run_coroutine_threadsafe(self.trader_agent.submit_order(order), self.loop)
+        future.result(timeout=timeout)  # Wait for the order to be processed
+
+    def submit_orders(self, orders, timeout=BATCH_ACK_TIMEOUT + 1):
+        """Forward a batch to the market and return the assigned IDs (None if not acknowledged)"""
+        future = asyncio.run_coroutine_threadsafe(self.trader_agent.submit_orders(orders), self.loop)
+        return future.result(timeout=timeout)
+
+    def get_open_orders(self):
+        return get_open_orders()
+
+    def get_all_orders(self):
+        return DatabaseManager().get_all_orders()
+
+    def get_matched_orders(self):
+        return DatabaseManager().get_matched_orders()
+
+    def delete_order(self, order_id, username):
+        """
+        Delete one of `username`'s orders on the agent loop thread.
+
+        Returns:
+            str: "deleted", "not_found", "forbidden" or "failed"
+        """
+        return self._call_in_loop(self._delete_order, order_id, username)
+
+    def _delete_order(self, order_id, username):
+        db = DatabaseManager()
+        order = next((o for o in db.get_all_orders() if o.get("id") == order_id), None)
+        if not order:
+            return "not_found"
+        if order["user"] != username:
+            return "forbidden"
+        return "deleted" if db.delete_order(order_id) else "failed"
+
+    def price_quote(self, order_type, amount=None, target_fill_probability=None):
+        """Price recommendation from the live book (None if there is nothing to anchor on)"""
+        if target_fill_probability is None:
+            return PRICER.quote(order_type, amount)
+        return PRICER.quote(order_type, amount, target_fill_probability)
+
+    def engine_metrics(self):
+        """Prometheus text for the metrics owned by the matching engine"""
+        return REGISTRY.render(names=ENGINE_METRICS)
+
+
+class LoopbackMarketService(LocalMarketService):
+    """
+    LocalMarketService without XMPP: orders are stored and matched directly on the writer
+    thread instead of travelling trader -> market as agent messages. Used for local testing
+    and load tests, where no XMPP server is available.
+    """
+    def _run_agents(self):
+        logger.info("Running market in loopback mode (no XMPP agents)")
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def is_ready(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def agent_status(self):
+        status = "loopback" if self.is_ready() else "not running"
+        return {"trader_agent": status, "market_agent": status}
+
+    def mailbox_depths(self):
+        return {}
+
+    def submit_order(self, order, timeout=5):
+        self.submit_orders([order], timeout)
+
+    def submit_orders(self, orders, timeout=BATCH_ACK_TIMEOUT + 1):
+        for order in orders:
+            order["status"] = "open"
+        return self._call_in_loop(self._store_and_match, orders, timeout=timeout)
+
+    def _store_and_match(self, orders):
+        db = DatabaseManager()
+        order_ids = db.store_orders(orders)
+        db.match_orders()
+        return order_ids
+
+
+def create_local_service(mode=AGENT_MODE):
+    """Build the service for the process that owns the order book"""
+    if mode == "loopback":
+        return LoopbackMarketService()
+    return LocalMarketService()
+
+
+# Operations the engine exposes to API workers
+ENGINE_OPERATIONS = (
+    "is_ready", "agent_status", "mailbox_depths", "submit_order", "submit_orders",
+    "get_open_orders", "get_all_orders", "get_matched_orders", "delete_order", "price_quote", "engine_metrics"
+)
+
+
+class EngineError(Exception):
+    """Raised by RemoteMarketService when the engine rejects or fails a request"""
+
+
+class RemoteMarketService:
+    """
+    Stateless stand-in for LocalMarketService used by API worker processes.
+    Each call is forwarded to the matching engine over a local socket; connections are
+    pooled because a multiprocessing Connection must not be shared between threads.
+    """
+    def __init__(self, address, authkey, timeout=BATCH_ACK_TIMEOUT + 2, max_idle_connections=8):
+        self.address = parse_engine_address(address)
+        self.authkey = authkey
+        self.timeout = timeout
+        self.idle = queue.LifoQueue(maxsize=max_idle_connections)
+
+    def start(self):
+        """Nothing to start: the engine process owns the agents"""
+
+    def _call(self, operation, *args):
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            conn = Client(self.address, authkey=self.authkey)
+        try:
+            conn.send((operation, args))
+            if not conn.poll(self.timeout):
+                raise TimeoutError(f"Matching engine did not answer {operation} within {self.timeout}s")
+            status, result = conn.recv()
+        except BaseException:
+            conn.close()  # the connection state is unknown, never reuse it
+            raise
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+        if status != "ok":
+            raise EngineError(result)
+        return result
+
+    def is_ready(self):
+        try:
+            return self._call("is_ready")
+        except (OSError, EOFError, TimeoutError):
+            return False
+
+    def agent_status(self):
+        try:
+            return self._call("agent_status")
+        except (OSError, EOFError, TimeoutError):
+            return {"trader_agent": "unreachable", "market_agent": "unreachable"}
+
+    def mailbox_depths(self):
+        return self._call("mailbox_depths")
+
+    def submit_order(self, order, timeout=5):
+        self._call("submit_order", order, timeout)
+
+    def submit_orders(self, orders, timeout=BATCH_ACK_TIMEOUT + 1):
+        return self._call("submit_orders", orders, timeout)
+
+    def get_open_orders(self):
+        return self._call("get_open_orders")
+
+    def get_all_orders(self):
+        return self._call("get_all_orders")
+
+    def get_matched_orders(self):
+        return self._call("get_matched_orders")
+
+    def delete_order(self, order_id, username):
+        return self._call("delete_order", order_id, username)
+
+    def price_quote(self, order_type, amount=None, target_fill_probability=None):
+        return self._call("price_quote", order_type, amount, target_fill_probability)
+
+    def engine_metrics(self):
+        return self._call("engine_metrics")
+
+
+def serve_engine(service, address, authkey):
+    """Serve `service` to API workers on `address`, one thread per worker connection (blocks forever)"""
+    address = parse_engine_address(address)
+    if isinstance(address, str) and os.path.exists(address):
+        os.unlink(address)  # stale socket from a previous run
+    listener = Listener(address, authkey=authkey)
+    logger.info("Matching engine listening on %s", address)
+
+    def handle(conn):
+        with conn:
+            while True:
+                try:
+                    operation, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if operation not in ENGINE_OPERATIONS:
+                        raise ValueError(f"Unknown operation: {operation}")
+                    reply = ("ok", getattr(service, operation)(*args))
+                except Exception as e:
+                    logger.exception("Engine operation %s failed", operation)
+                    reply = ("error", str(e) or type(e).__name__)
+                try:
+                    conn.send(reply)
+                except (EOFError, OSError):
+                    return
+
+    try:
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception:
+                logger.exception("Error accepting worker connection")
+                continue
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+    finally:
+        listener.close()
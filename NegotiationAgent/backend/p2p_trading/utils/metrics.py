@@ -0,0 +1,195 @@
+import bisect
+import threading
+
+# Default latency buckets in seconds, from sub-millisecond up to the 5 s order timeout
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = []
+    for name, value in pairs:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{name}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class _ValueMetric(_Metric):
+    """Metric holding one value per label set, set directly or read from a callback at scrape time"""
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.values = {}
+        self.callback = callback
+
+    def set_callback(self, callback):
+        """Use `callback()` to compute the value(s) at scrape time; it returns a number or a {label tuple: value} dict"""
+        self.callback = callback
+
+    def render(self):
+        lines = self.header()
+        if self.callback is not None:
+            try:
+                result = self.callback()
+            except Exception:
+                result = {}
+            items = sorted(result.items()) if isinstance(result, dict) else [((), result)]
+        else:
+            with self.lock:
+                items = sorted(self.values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_ValueMetric):
+    """Monotonically increasing counter"""
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(_ValueMetric):
+    """Gauge holding the last value set"""
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed upper bounds"""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.series = {}  # key -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = self.header()
+        with self.lock:
+            items = sorted((key, list(series)) for key, series in self.series.items())
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the Prometheus text exposition format"""
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric):
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=(), callback=None):
+        return self.register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(self, name, documentation, labelnames=(), callback=None):
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self, names=None, exclude=()):
+        """Render all metrics, or only those in `names`, skipping any in `exclude`"""
+        with self.lock:
+            metrics = [m for m in self.metrics.values()
+                       if (names is None or m.name in names) and m.name not in exclude]
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry and the metrics shared by the API server and the order store
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "p2p_http_requests_total", "HTTP requests handled, by endpoint, method and status",
+    ("endpoint", "method", "status"))
+HTTP_REQUEST_LATENCY = REGISTRY.histogram(
+    "p2p_http_request_duration_seconds", "HTTP request latency by endpoint and method",
+    ("endpoint", "method"))
+
+MATCHING_DURATION = REGISTRY.histogram(
+    "p2p_matching_pass_duration_seconds", "Duration of one order matching pass")
+MATCHES_FOUND = REGISTRY.counter(
+    "p2p_matches_total", "Matches produced by the matching engine")
+ORDER_BOOK_SIZE = REGISTRY.gauge(
+    "p2p_order_book_open_orders", "Open orders in the book after the last matching pass", ("side",))
+
+STORE_READS = REGISTRY.counter(
+    "p2p_store_reads_total", "Full reads of the order store")
+STORE_READ_BYTES = REGISTRY.counter(
+    "p2p_store_read_bytes_total", "Bytes read from the order store")
+STORE_WRITES = REGISTRY.counter(
+    "p2p_store_writes_total", "Full rewrites of the order store")
+STORE_WRITE_BYTES = REGISTRY.counter(
+    "p2p_store_write_bytes_total", "Bytes written to the order store")
+
+AGENT_MAILBOX_DEPTH = REGISTRY.gauge(
+    "p2p_agent_mailbox_depth", "Messages waiting in agent behaviour mailboxes", ("agent",))
+
+# Metrics recorded by the process that owns the order book (the matching engine in split mode)
+ENGINE_METRICS = (
+    MATCHING_DURATION.name, MATCHES_FOUND.name, ORDER_BOOK_SIZE.name,
+    STORE_READS.name, STORE_READ_BYTES.name, STORE_WRITES.name, STORE_WRITE_BYTES.name
+)
@@ -0,0 +1,78 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+from p2p_trading.utils.logger import get_logger
+
+logger = get_logger("batcher")
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-item requests into batches for a vectorized function.
+
+    Callers block in `submit()`; a worker thread waits for the first request, keeps
+    collecting for up to `max_wait_ms` (or until `max_batch_size` requests are queued),
+    then calls `batch_fn(items)` once and hands each caller its own result.
+    """
+    def __init__(self, batch_fn, max_batch_size=64, max_wait_ms=5, name="batcher"):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.items = 0
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def submit(self, item, timeout=None):
+        """Queue one item and wait for its result (raises the batch function's exception)"""
+        future = Future()
+        self.requests.put((item, future))
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()  # dropped by the worker if it has not started the batch yet
+            raise
+
+    def _collect(self):
+        batch = [self.requests.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            # Skip requests whose caller has already given up
+            batch = [(item, future) for item, future in batch if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            try:
+                results = self.batch_fn([item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"Batch function returned {len(results)} results for {len(batch)} items")
+            except Exception as e:
+                logger.exception("Batch of %d items failed", len(batch))
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "queued": self.requests.qsize()
+        }
@@ -0,0 +1,194 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.prediction_model import profile_key
+from p2p_trading.utils.model_interface import (
+    sample_production, sample_consumption, sample_optimal_price,
+    sample_appliance_priority, sample_demand_response_action
+)
+
+logger = get_logger("model")
+
+
+class ModelExecutor:
+    """
+    Bounded worker pool for model calls, separate from the Flask request threads.
+
+    At most `max_workers` calls run and `max_queue` wait; beyond that a call is refused at
+    once. A caller waits up to its deadline, after which a call that has not started yet is
+    cancelled (a running one finishes in the background, still holding its slot).
+    """
+    def __init__(self, max_workers=4, max_queue=32):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model")
+        self.slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.outcomes = {"completed": 0, "failed": 0, "timeout": 0, "rejected": 0}
+        self.lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self.lock:
+            self.outcomes[outcome] += 1
+
+    def submit(self, fn, *args):
+        """Queue a call and return its Future, or None if the pool and queue are full"""
+        if not self.slots.acquire(blocking=False):
+            self._count("rejected")
+            return None
+        try:
+            future = self.pool.submit(fn, *args)
+        except RuntimeError:
+            self.slots.release()
+            raise
+        # Also runs for cancelled futures, so the slot is always returned
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def call(self, fn, args, timeout, fallback):
+        """
+        Run fn(*args) on the pool and wait at most `timeout` seconds.
+
+        Returns:
+            The call's result, or fallback(reason) with reason "busy" or "timeout"
+        """
+        future = self.submit(fn, *args)
+        if future is None:
+            return fallback("busy")
+        try:
+            result = future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            self._count("timeout")
+            logger.warning("Model call %s missed its %.2fs deadline", getattr(fn, "__name__", fn), timeout)
+            return fallback("timeout")
+        except Exception:
+            self._count("failed")
+            raise
+        self._count("completed")
+        return result
+
+    def stats(self):
+        with self.lock:
+            outcomes = dict(self.outcomes)
+        return {"max_workers": self.max_workers, "max_queue": self.max_queue, "outcomes": outcomes}
+
+
+class ModelBusy(Exception):
+    """A model call that has no degraded answer (an update or a status read) was refused or missed its deadline"""
+    def __init__(self, operation, reason):
+        super().__init__(f"{operation}: model executor {reason}, retry later")
+        self.reason = reason
+
+
+def _busy(operation):
+    def fallback(reason):
+        raise ModelBusy(operation, reason)
+    return fallback
+
+
+def _degraded(response, reason):
+    response["degraded"] = True
+    response["degraded_reason"] = reason
+    return response
+
+
+class AsyncModelInterface:
+    """
+    Deadline-bound facade over ModelInterface used by the API routes.
+
+    Every model call runs on a ModelExecutor. When the pool is saturated or the deadline is
+    missed the route answers immediately with a degraded response: the last cached forecast
+    if there is one, otherwise the placeholder answer, flagged with "degraded". Calls with no
+    meaningful placeholder (data ingest, hot swap, status) raise ModelBusy instead, which the
+    routes turn into a 503. Only plain attributes are forwarded to the interface, so a new model
+    method cannot bypass the executor by accident.
+
+    Predictions use a separate executor and deadline: their calls wait in the micro-batcher, so
+    the pool must be at least as large as a batch and the deadline at least the batcher's timeout.
+    Fleet demand response plans also get their own executor, with a deadline that grows by
+    `dr_seconds_per_household` per household, so a large fleet neither starves the short
+    calls nor times out on its own size.
+    """
+    def __init__(self, model_interface, executor, timeout=2.0, prediction_executor=None, prediction_timeout=None,
+                 dr_executor=None, dr_seconds_per_household=0.0, swap_timeout=30.0):
+        self.model_interface = model_interface
+        self.executor = executor
+        self.timeout = timeout
+        self.prediction_executor = prediction_executor or executor
+        self.prediction_timeout = prediction_timeout or timeout
+        self.dr_executor = dr_executor or executor
+        self.dr_seconds_per_household = dr_seconds_per_household
+        self.swap_timeout = swap_timeout
+
+    def __getattr__(self, name):
+        # Non-model attributes (cache, availability flags, ...) come straight from the interface
+        value = getattr(self.model_interface, name)
+        if callable(value):
+            raise AttributeError(f"{name} is a model call without an executor-bound wrapper")
+        return value
+
+    def warm_up(self):
+        # Start-up only, on its own background thread: no request is waiting on it
+        return self.model_interface.warm_up()
+
+    def ingest_profile_data(self, profile, samples):
+        return self.executor.call(
+            self.model_interface.ingest_profile_data, (profile, samples), self.timeout,
+            _busy("ingest_profile_data"))
+
+    def ingest_appliance_usage(self, user_id, hours, sub_metering):
+        return self.executor.call(
+            self.model_interface.ingest_appliance_usage, (user_id, hours, sub_metering), self.timeout,
+            _busy("ingest_appliance_usage"))
+
+    def swap_model(self, name, path):
+        # Loading a checkpoint can take seconds; a swap that misses the deadline still completes
+        return self.executor.call(
+            self.model_interface.swap_model, (name, path), self.swap_timeout, _busy("swap_model"))
+
+    def model_status(self):
+        return self.executor.call(self.model_interface.model_status, (), self.timeout, _busy("model_status"))
+
+    def _cached_or(self, kind, profile, time_period, sample):
+        cache = self.model_interface.prediction_cache
+        cached = cache.peek(kind, profile_key(profile), profile_key(time_period))
+        return dict(cached) if cached is not None else sample
+
+    def predict_energy_production(self, location, time_period):
+        return self.prediction_executor.call(
+            self.model_interface.predict_energy_production, (location, time_period), self.prediction_timeout,
+            lambda reason: _degraded(self._cached_or(
+                "production", location, time_period, sample_production(location, time_period)), reason))
+
+    def predict_energy_consumption(self, user_profile, time_period):
+        return self.prediction_executor.call(
+            self.model_interface.predict_energy_consumption, (user_profile, time_period), self.prediction_timeout,
+            lambda reason: _degraded(self._cached_or(
+                "consumption", user_profile, time_period, sample_consumption(user_profile, time_period)), reason))
+
+    def get_optimal_price(self, order_type, current_market_data):
+        return self.executor.call(
+            self.model_interface.get_optimal_price, (order_type, current_market_data), self.timeout,
+            lambda reason: _degraded(sample_optimal_price(order_type), reason))
+
+    def get_appliance_priority(self, user_id, appliances):
+        return self.executor.call(
+            self.model_interface.get_appliance_priority, (user_id, appliances), self.timeout,
+            lambda reason: _degraded(sample_appliance_priority(), reason))
+
+    def get_demand_response_action(self, grid_status, user_profile):
+        return self.executor.call(
+            self.model_interface.get_demand_response_action, (grid_status, user_profile), self.timeout,
+            lambda reason: _degraded(sample_demand_response_action(), reason))
+
+    def get_appliance_priorities(self, user_ids, appliances):
+        return self.executor.call(
+            self.model_interface.get_appliance_priorities, (user_ids, appliances), self.timeout,
+            lambda reason: _degraded({"appliances": [], "priorities": {}, "method": "behavioral_scoring"}, reason))
+
+    def plan_demand_response(self, grid_status, households):
+        # There is no meaningful partial plan: the degraded answer carries only the error (the route sends 503)
+        return self.dr_executor.call(
+            self.model_interface.plan_demand_response, (grid_status, households),
+            self.timeout + self.dr_seconds_per_household * len(households),
+            lambda reason: _degraded({"error": "Demand response planner unavailable, retry later"}, reason))
@@ -1,5 +1,79 @@
 import json
 import os
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.micro_batcher import MicroBatcher
+from p2p_trading.utils.model_registry import ModelRegistry
+from p2p_trading.utils.prediction_model import LSTMForecaster, profile_key
+from p2p_trading.utils.prediction_cache import PredictionCache
+from p2p_trading.utils.appliance_scoring import ApplianceScorer, appliance_name
+from p2p_trading.utils.demand_response import (
+    DemandResponseOptimizer, DEFAULT_DURATION_HOURS, DEFAULT_INCENTIVE_PER_KWH
+)
+from p2p_trading.utils.config import (
+    PREDICTION_AGENT_DIR, PREDICTION_MODEL_PATH, PREDICTION_DATA_PATH, PREDICTION_BACKEND,
+    PREDICTION_QUANTIZED, PREDICTION_STEP_HOURS,
+    PREDICTION_BATCH_MAX_SIZE, PREDICTION_BATCH_MAX_WAIT_MS, PREDICTION_TIMEOUT,
+    PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL, MODEL_REGISTRY_MAX_LOADED, MODEL_LOAD_RETRY_SECONDS
+)
+
+logger = get_logger("model")
+
+
+# Placeholder answers, used until a model has data and as fast degraded responses
+
+def sample_production(location, time_period):
+    return {
+        "location": location,
+        "time_period": time_period,
+        "predicted_kwh": 15.0,
+        "confidence": 0.8,
+        "method": "prediction_agent"
+    }
+
+def sample_consumption(user_profile, time_period):
+    return {
+        "user_profile": user_profile,
+        "time_period": time_period,
+        "predicted_kwh": 8.5,
+        "confidence": 0.75,
+        "method": "prediction_agent"
+    }
+
+def sample_optimal_price(order_type):
+    if order_type == "buy":
+        sample_price = 1.25  # Sample buy price
+    else:
+        sample_price = 1.18  # Sample sell price
+
+    return {
+        "suggested_price": sample_price,
+        "market_analysis": "Based on current market conditions",
+        "confidence": 0.82,
+        "method": "negotiation_agent"
+    }
+
+def sample_appliance_priority():
+    return {
+        "appliances": {
+            "refrigerator": 1,
+            "hvac": 2,
+            "lighting": 3,
+            "entertainment": 4
+        },
+        "analysis": "Based on user behavior patterns",
+        "method": "behavioral_agent"
+    }
+
+def sample_demand_response_action():
+    return {
+        "action": "reduce_consumption",
+        "target_reduction": 2.0,  # kWh
+        "priority_devices": ["hvac", "water_heater"],
+        "incentive": 0.05,  # $ per kWh reduced
+        "time_window": "next 2 hours",
+        "method": "demand_response_agent"
+    }
+
 
 class ModelInterface:
     """
@@ -7,15 +81,92 @@ class ModelInterface:
     This acts as a bridge between the platform and the sophisticated mathematical models
     that may be developed separately.
     """
-    def __init__(self):
+    def __init__(self, market_service=None):
         # Initialize interface
         self.models_available = {
             "prediction": False,
-            "demand_response": False,
-            "behavioral": False,
-            "negotiation": False
+            "demand_response": True,
+            "behavioral": True,
+            "negotiation": market_service is not None
         }
-        print("[Model] Model interface initialized")
+        self.demand_response = DemandResponseOptimizer()
+        self.appliance_scorer = ApplianceScorer()
+        # Source of live order-book quotes for get_optimal_price
+        self.market_service = market_service
+        # Concurrent prediction requests share one batched LSTM forward pass
+        # Model artifacts are loaded on first use and can be hot-swapped (see swap_model)
+        self.registry = ModelRegistry(MODEL_REGISTRY_MAX_LOADED, MODEL_LOAD_RETRY_SECONDS)
+        self.forecaster = LSTMForecaster(
+            self.registry, PREDICTION_AGENT_DIR, PREDICTION_MODEL_PATH, PREDICTION_DATA_PATH,
+            PREDICTION_BACKEND, PREDICTION_QUANTIZED, max_profiles=PREDICTION_CACHE_SIZE)
+        self.prediction_batcher = MicroBatcher(
+            self._forecast_batch, PREDICTION_BATCH_MAX_SIZE, PREDICTION_BATCH_MAX_WAIT_MS, name="prediction-batcher")
+        # Repeated (profile, time period) questions are answered without touching the model
+        self.prediction_cache = PredictionCache(PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL)
+        logger.info("Model interface initialized")
+
+    def warm_up(self):
+        """Load the prediction model now (run in the background at start-up) so the first request does not pay for it"""
+        self.models_available["prediction"] = self.forecaster.available()
+        return self.models_available["prediction"]
+
+    def _forecast_batch(self, keys):
+        return list(self.forecaster.predict_batch(keys))
+
+    def _forecast(self, key):
+        """Forecast for one profile through the micro-batcher, or None if the model is unavailable"""
+        self.models_available["prediction"] = self.forecaster.available()
+        if not self.models_available["prediction"]:
+            return None
+        return self.prediction_batcher.submit(key, timeout=PREDICTION_TIMEOUT)
+
+    def _forecast_result(self, forecast):
+        return {
+            "predicted_kwh": round(float(forecast.sum()) * PREDICTION_STEP_HOURS, 3),
+            "forecast_kw": [round(float(value), 3) for value in forecast],
+            "method": "lstm_prediction_agent"
+        }
+
+    def swap_model(self, name, path):
+        """
+        Replace a model's checkpoint without restarting the server.
+
+        Args:
+            name (str): Registered model name
+            path (str): New artifact path
+
+        Returns:
+            dict: Status of the model after the swap
+        """
+        status = self.registry.swap(name, path)
+        # Cached answers came from the previous checkpoint
+        self.prediction_cache.clear()
+        return status
+
+    def model_status(self):
+        """Per-model artifact, load state, load time and memory"""
+        return self.registry.status()
+
+    def ingest_profile_data(self, profile, samples):
+        """
+        Feed new measurements for a user profile or location into its prediction window.
+
+        Args:
+            profile (str): User profile or location the samples belong to
+            samples (list): Rows of [Global_active_power, Global_reactive_power, Voltage,
+                Global_intensity, Sub_metering_1, Sub_metering_2, Sub_metering_3]
+
+        Returns:
+            int: Number of rows of the window that now come from this profile's own data
+
+        Raises:
+            ModelUnavailable: If the prediction model could not be loaded (nothing is stored)
+        """
+        key = profile_key(profile)
+        rows = self.forecaster.ingest(key, samples)
+        # Cached forecasts for this profile were made from the old window
+        self.prediction_cache.invalidate(key)
+        return rows
     
     def predict_energy_production(self, location, time_period):
         """
@@ -30,18 +181,25 @@ class ModelInterface:
             dict: Prediction results including estimated production and confidence levels
         """
         # This is a reserved interface, actual functionality will be provided by mathematical models
-        print(f"[Model] Energy production prediction requested for {location}, period: {time_period}")
-        
-        # Return sample data as placeholder
-        sample_data = {
-            "location": location,
-            "time_period": time_period,
-            "predicted_kwh": 15.0,
-            "confidence": 0.8,
-            "method": "prediction_agent"
-        }
-        
-        return sample_data
+        logger.debug("Energy production prediction requested for %s, period: %s", location, time_period)
+
+        key, period = profile_key(location), profile_key(time_period)
+        cached = self.prediction_cache.get("production", key, period)
+        if cached is not None:
+            return cached
+        generation = self.prediction_cache.generation()
+
+        # The household LSTM is the only trained model; production reuses it per location
+        forecast = self._forecast(key)
+        if forecast is not None:
+            result = {"location": location, "time_period": time_period, "confidence": 0.8,
+                      **self._forecast_result(forecast)}
+            self.prediction_cache.put("production", key, period, result, generation)
+            return result
+
+        # Return sample data as placeholder (not cached, so a real forecast replaces it as soon
+        # as the model is available)
+        return sample_production(location, time_period)
     
     def predict_energy_consumption(self, user_profile, time_period):
         """
@@ -55,50 +213,64 @@ class ModelInterface:
         Returns:
             dict: Prediction results including estimated consumption and confidence levels
         """
-        print(f"[Model] Energy consumption prediction requested for user {user_profile}, period: {time_period}")
-        
-        # Return sample data as placeholder
-        sample_data = {
-            "user_profile": user_profile,
-            "time_period": time_period,
-            "predicted_kwh": 8.5,
-            "confidence": 0.75,
-            "method": "prediction_agent"
-        }
-        
-        return sample_data
+        logger.debug("Energy consumption prediction requested for user %s, period: %s", user_profile, time_period)
+
+        key, period = profile_key(user_profile), profile_key(time_period)
+        cached = self.prediction_cache.get("consumption", key, period)
+        if cached is not None:
+            return cached
+        generation = self.prediction_cache.generation()
+
+        forecast = self._forecast(key)
+        if forecast is not None:
+            result = {"user_profile": user_profile, "time_period": time_period, "confidence": 0.75,
+                      **self._forecast_result(forecast)}
+            self.prediction_cache.put("consumption", key, period, result, generation)
+            return result
+
+        # Return sample data as placeholder (not cached, so a real forecast replaces it as soon
+        # as the model is available)
+        return sample_consumption(user_profile, time_period)
     
     def get_optimal_price(self, order_type, current_market_data):
         """
         Calculates the optimal price for a buy or sell order based on current market conditions.
-        Reserved for the Negotiation Agent implementation.
+        Quotes come from the live order book (spread, depth, recent fills) when a market
+        service is attached; the sample price is returned while the book is empty.
         
         Args:
             order_type (str): Type of order ("buy" or "sell")
-            current_market_data (dict): Current market conditions and historical data
+            current_market_data (dict): Optional "amount" (kWh) and "target_fill_probability"
             
         Returns:
             dict: Price recommendation and supporting analysis
         """
-        print(f"[Model] Optimal price requested for {order_type} order")
-        
-        # Return sample data as placeholder
-        if order_type == "buy":
-            sample_price = 1.25  # Sample buy price
-        else:
-            sample_price = 1.18  # Sample sell price
-            
-        return {
-            "suggested_price": sample_price,
-            "market_analysis": "Based on current market conditions",
-            "confidence": 0.82,
-            "method": "negotiation_agent"
-        }
+        logger.debug("Optimal price requested for %s order", order_type)
+
+        if self.market_service is not None:
+            market_data = current_market_data if isinstance(current_market_data, dict) else {}
+            quote = self.market_service.price_quote(
+                order_type, market_data.get("amount"), market_data.get("target_fill_probability"))
+            if quote is not None:
+                book = quote["market"]
+                return {
+                    "suggested_price": quote["suggested_price"],
+                    "fill_probability": quote["fill_probability"],
+                    "target_fill_probability": quote["target_fill_probability"],
+                    "market": book,
+                    "market_analysis": f"Spread {book['spread']}, depth imbalance {book['depth_imbalance']}, "
+                                       f"VWAP {book['vwap']} over {book['recent_fills']} recent fills",
+                    "confidence": quote["fill_probability"],
+                    "method": "order_book_pricing"
+                }
+
+        # Empty book and no fills yet: return sample data as placeholder
+        return sample_optimal_price(order_type)
     
     def get_appliance_priority(self, user_id, appliances):
         """
         Determines priority levels for different appliances based on user behavior patterns.
-        Reserved for the Behavioral and Segmentation Agent implementation.
+        Scored from the user's sub-metering aggregates once usage has been ingested.
         
         Args:
             user_id (str): User identifier
@@ -107,26 +279,60 @@ class ModelInterface:
         Returns:
             dict: Prioritized appliances with analysis
         """
-        print(f"[Model] Appliance priority requested for user {user_id}")
+        logger.debug("Appliance priority requested for user %s", user_id)
+
+        if user_id in self.appliance_scorer.index and appliances:
+            names = [appliance_name(a) for a in appliances]
+            scores, ranks = self.appliance_scorer.score([user_id], names)
+            return {
+                "appliances": {name: int(rank) for name, rank in zip(names, ranks[0])},
+                "scores": {name: round(float(score), 4) for name, score in zip(names, scores[0])},
+                "analysis": "Based on sub-metering usage share, time-of-use regularity and flexibility",
+                "method": "behavioral_scoring"
+            }
         
-        # Return sample data as placeholder
-        sample_priorities = {
-            "appliances": {
-                "refrigerator": 1,
-                "hvac": 2,
-                "lighting": 3,
-                "entertainment": 4
-            },
-            "analysis": "Based on user behavior patterns",
-            "method": "behavioral_agent"
+        # No usage history for this user: return sample data as placeholder
+        return sample_appliance_priority()
+
+    def get_appliance_priorities(self, user_ids, appliances):
+        """
+        Scores the same appliance list for many users in one vectorized call.
+
+        Args:
+            user_ids (list): User identifiers
+            appliances (list): Appliances to prioritize
+
+        Returns:
+            dict: Appliance ranks per user (1 = highest priority)
+        """
+        logger.debug("Appliance priorities requested for %d users", len(user_ids))
+        names = [appliance_name(a) for a in appliances]
+        _, ranks = self.appliance_scorer.score(user_ids, names)
+        return {
+            "appliances": names,
+            "priorities": {str(user_id): [int(rank) for rank in row] for user_id, row in zip(user_ids, ranks.tolist())},
+            "method": "behavioral_scoring"
         }
-        
-        return sample_priorities
+
+    def ingest_appliance_usage(self, user_id, hours, sub_metering):
+        """
+        Adds sub-metering readings to a user's usage aggregates.
+
+        Args:
+            user_id (str): User identifier
+            hours (list): Hour of day of each reading
+            sub_metering (list): [Sub_metering_1, Sub_metering_2, Sub_metering_3] per reading
+
+        Returns:
+            int: Total readings aggregated for the user
+        """
+        return self.appliance_scorer.ingest(user_id, hours, sub_metering)
     
     def get_demand_response_action(self, grid_status, user_profile):
         """
         Recommends demand response actions based on grid status and user profile.
-        Reserved for the Demand Response Agent implementation.
+        Profiles with "flexible_loads" and a grid status with "target_reduction_kw" are
+        planned by the fleet optimizer as a fleet of one.
         
         Args:
             grid_status (dict): Current grid status information
@@ -135,16 +341,37 @@ class ModelInterface:
         Returns:
             dict: Recommended actions and incentives
         """
-        print(f"[Model] Demand response action requested for grid status: {grid_status}")
+        logger.debug("Demand response action requested for grid status: %s", grid_status)
+
+        if isinstance(user_profile, dict) and user_profile.get("flexible_loads") \
+                and isinstance(grid_status, dict) and "target_reduction_kw" in grid_status:
+            plan = self.demand_response.plan(grid_status, [user_profile])
+            household = plan["plans"][0] if plan["plans"] else {"reduction_kw": 0.0, "loads": {}}
+            duration = float(grid_status.get("duration_hours", DEFAULT_DURATION_HOURS))
+            return {
+                "action": "reduce_consumption" if household["reduction_kw"] > 0 else "no_action",
+                "target_reduction": round(household["reduction_kw"] * duration, 4),  # kWh
+                "priority_devices": sorted(household["loads"], key=household["loads"].get, reverse=True),
+                "incentive": float(user_profile.get("incentive_per_kwh", DEFAULT_INCENTIVE_PER_KWH)),
+                "time_window": plan["time_window"],
+                "method": plan["method"]
+            }
         
         # Return sample data as placeholder
-        sample_action = {
-            "action": "reduce_consumption",
-            "target_reduction": 2.0,  # kWh
-            "priority_devices": ["hvac", "water_heater"],
-            "incentive": 0.05,  # $ per kWh reduced
-            "time_window": "next 2 hours",
-            "method": "demand_response_agent"
-        }
-        
-        return sample_action
\ No newline at end of file
+        return sample_demand_response_action()
+
+    def plan_demand_response(self, grid_status, households):
+        """
+        Computes curtailment plans for a fleet of households during a grid event.
+
+        Args:
+            grid_status (dict): Grid event with "target_reduction_kw" and optional
+                "duration_hours" and "max_incentive_per_kwh"
+            households (list): Household profiles with flexible loads, comfort bounds and
+                incentive rates
+
+        Returns:
+            dict: Fleet totals and per-household curtailment plans
+        """
+        logger.debug("Fleet demand response requested for %d households", len(households))
+        return self.demand_response.plan(grid_status, households)
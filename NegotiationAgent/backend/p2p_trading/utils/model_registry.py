@@ -0,0 +1,176 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from p2p_trading.utils.logger import get_logger
+
+logger = get_logger("registry")
+
+
+class ModelUnavailable(Exception):
+    """Raised when a model's artifact cannot be loaded"""
+
+
+def estimate_memory(model):
+    """Bytes held by a model's tensors (parameters and buffers), if it exposes any"""
+    if hasattr(model, "memory_bytes"):
+        return model.memory_bytes()
+    module = getattr(model, "model", model)
+    if hasattr(module, "parameters"):
+        tensors = list(module.parameters()) + list(module.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    return None
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class _Entry:
+    def __init__(self, model, path, load_seconds):
+        self.model = model
+        self.path = path
+        self.load_seconds = load_seconds
+        self.memory_bytes = estimate_memory(model)
+        self.loaded_at = time.time()
+        self.last_used = self.loaded_at
+
+
+class ModelRegistry:
+    """
+    Named model artifacts, loaded on first use and kept in memory with LRU eviction.
+
+    `register` only records how to load a model, so start-up costs nothing. `get` loads it
+    on first use; beyond `max_loaded` the least recently used model is dropped and reloaded
+    when next asked for. `swap` loads a new checkpoint next to the running one and then
+    replaces it in a single step, so requests never see a half-loaded model. A failed load is
+    reported without retrying for `retry_after` seconds, or until the artifact's mtime changes.
+    """
+    def __init__(self, max_loaded=4, retry_after=30.0):
+        self.max_loaded = max_loaded
+        self.retry_after = retry_after
+        self.loaders = {}  # name -> loader(path) returning the model
+        self.paths = {}  # name -> current artifact path
+        self.loaded = OrderedDict()  # name -> _Entry, least recently used first
+        self.errors = {}  # name -> (message, failed_at, artifact mtime) of the last load failure
+        self.versions = {}  # name -> number of swaps
+        self.lock = threading.Lock()
+        self.load_locks = {}
+
+    def register(self, name, loader, path):
+        with self.lock:
+            self.loaders[name] = loader
+            self.paths[name] = path
+            self.versions.setdefault(name, 0)
+            self.load_locks.setdefault(name, threading.Lock())
+
+    def _load(self, name, path):
+        started = time.perf_counter()
+        try:
+            model = self.loaders[name](path)
+        except Exception as e:
+            raise ModelUnavailable(f"{name}: {str(e) or type(e).__name__}") from e
+        entry = _Entry(model, path, time.perf_counter() - started)
+        logger.info("Loaded model", extra={"model": name, "path": path,
+                                           "load_seconds": round(entry.load_seconds, 3),
+                                           "memory_bytes": entry.memory_bytes})
+        return entry
+
+    def _install(self, name, entry):
+        with self.lock:
+            self.loaded[name] = entry
+            self.loaded.move_to_end(name)
+            self.paths[name] = entry.path
+            self.errors.pop(name, None)
+            while len(self.loaded) > self.max_loaded:
+                evicted, _ = self.loaded.popitem(last=False)
+                logger.info("Evicted model %s (least recently used)", evicted)
+
+    def _failure(self, name):
+        """The last load error for `name` while it still applies, else None (call with self.lock held)"""
+        error = self.errors.get(name)
+        if error is None:
+            return None
+        message, failed_at, mtime = error
+        if time.monotonic() - failed_at < self.retry_after and _mtime(self.paths[name]) == mtime:
+            return message
+        return None
+
+    def get(self, name):
+        """Return the loaded model, loading it first if needed (raises ModelUnavailable)"""
+        with self.lock:
+            entry = self.loaded.get(name)
+            if entry is not None:
+                self.loaded.move_to_end(name)
+                entry.last_used = time.time()
+                return entry.model
+            if name not in self.loaders:
+                raise ModelUnavailable(f"Unknown model: {name}")
+            failure = self._failure(name)
+            if failure is not None:
+                raise ModelUnavailable(failure)
+
+        # One loader per model at a time; other callers wait for its result
+        with self.load_locks[name]:
+            with self.lock:
+                entry = self.loaded.get(name)
+                if entry is not None:
+                    return entry.model
+                failure = self._failure(name)
+                if failure is not None:
+                    raise ModelUnavailable(failure)
+                path = self.paths[name]
+            try:
+                entry = self._load(name, path)
+            except ModelUnavailable as e:
+                with self.lock:
+                    self.errors[name] = (str(e), time.monotonic(), _mtime(path))
+                logger.warning("Model unavailable: %s", e)
+                raise
+            self._install(name, entry)
+            return entry.model
+
+    def swap(self, name, path):
+        """
+        Load `path` for model `name` and switch to it atomically; the old model keeps serving
+        until the new one is ready and stays in place if loading fails.
+        """
+        if name not in self.loaders:
+            raise ModelUnavailable(f"Unknown model: {name}")
+        with self.load_locks[name]:
+            entry = self._load(name, path)
+            self._install(name, entry)
+            with self.lock:
+                self.versions[name] += 1
+        logger.info("Swapped model %s to %s", name, path)
+        return self.status()[name]
+
+    def is_available(self, name):
+        try:
+            self.get(name)
+            return True
+        except ModelUnavailable:
+            return False
+
+    def status(self):
+        """Per-model artifact, load state, load time and memory"""
+        with self.lock:
+            result = {}
+            for name, path in self.paths.items():
+                entry = self.loaded.get(name)
+                error = self.errors.get(name)
+                result[name] = {
+                    "path": path,
+                    "artifact_exists": os.path.exists(path),
+                    "loaded": entry is not None,
+                    "version": self.versions.get(name, 0),
+                    "load_seconds": round(entry.load_seconds, 4) if entry else None,
+                    "memory_bytes": entry.memory_bytes if entry else None,
+                    "loaded_at": entry.loaded_at if entry else None,
+                    "last_used": entry.last_used if entry else None,
+                    "error": error[0] if error else None
+                }
+            return result
@@ -0,0 +1,118 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache with a per-entry TTL for prediction results.
+
+    Entries are keyed by (kind, profile, time_period) and indexed by profile, so new data for
+    one profile drops only that profile's forecasts. Hits and misses are counted for /metrics.
+
+    A forecast that was still running when its profile was invalidated must not be stored:
+    callers take `generation()` before computing and pass it to `put`, which discards the value
+    if the profile has been invalidated since. Invalidation stamps come from one clock and at
+    most `maxsize` are kept; profiles whose stamp was dropped are treated as invalidated at the
+    newest dropped stamp, which can only reject a put, never accept a stale one.
+    """
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, value)
+        self.by_profile = {}  # profile -> set of keys
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.clock = 0
+        self.invalidated_at = OrderedDict()  # profile -> clock value of its last invalidation
+        self.invalidated_floor = 0
+        self.stale_puts = 0
+
+    def get(self, kind, profile, time_period):
+        """Return the cached value, or None on a miss or an expired entry"""
+        key = (kind, profile, time_period)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def peek(self, kind, profile, time_period):
+        """Return the cached value even if expired, without touching LRU order or counters"""
+        with self.lock:
+            entry = self.entries.get((kind, profile, time_period))
+        return entry[1] if entry is not None else None
+
+    def generation(self):
+        """Token to pass to `put` for a value computed from data seen from now on"""
+        with self.lock:
+            return self.clock
+
+    def put(self, kind, profile, time_period, value, generation=None):
+        key = (kind, profile, time_period)
+        with self.lock:
+            if generation is not None and \
+                    self.invalidated_at.get(profile, self.invalidated_floor) > generation:
+                self.stale_puts += 1
+                return False
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            self.by_profile.setdefault(profile, set()).add(key)
+            while len(self.entries) > self.maxsize:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, profile):
+        """Drop every cached prediction for `profile` and return how many were removed"""
+        with self.lock:
+            self.clock += 1
+            self.invalidated_at.pop(profile, None)
+            self.invalidated_at[profile] = self.clock
+            while len(self.invalidated_at) > self.maxsize:
+                self.invalidated_floor = self.invalidated_at.popitem(last=False)[1]
+            keys = self.by_profile.pop(profile, ())
+            for key in keys:
+                self.entries.pop(key, None)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.by_profile.clear()
+            # Everything computed before now is stale
+            self.clock += 1
+            self.invalidated_at.clear()
+            self.invalidated_floor = self.clock
+
+    def _remove(self, key):
+        self.entries.pop(key, None)
+        keys = self.by_profile.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.by_profile[key[1]]
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale_puts": self.stale_puts
+            }
@@ -0,0 +1,132 @@
+import importlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.model_registry import estimate_memory
+
+logger = get_logger("prediction")
+
+LSTM_MODEL_NAME = "consumption_lstm"
+
+
+def profile_key(profile):
+    """Hashable key for a user profile / location, which may arrive as a string or a JSON object"""
+    if isinstance(profile, (dict, list)):
+        return json.dumps(profile, sort_keys=True)
+    return str(profile)
+
+
+class LoadedLSTM:
+    """A PowerPredictor with its scaler fitted and the reference input window"""
+    def __init__(self, predictor, reference_window):
+        self.predictor = predictor
+        self.reference_window = reference_window
+
+    def memory_bytes(self):
+        return (estimate_memory(self.predictor.model) or 0) + self.reference_window.nbytes
+
+
+class LSTMForecaster:
+    """
+    Adapter around the Prediction Agent's LSTM (PredictionAgent/predictor.py).
+
+    The model lives in a ModelRegistry under LSTM_MODEL_NAME, so torch and the weights are
+    loaded on first use and a new checkpoint can be swapped in while serving; `available()`
+    reports whether loading succeeded. Every profile keeps its own raw (unscaled) rows, at most
+    one lookback of them, in an LRU bounded to `max_profiles`; they are scaled against the
+    current model and appended to its reference window when read, so a swap or a reload needs
+    no rewrite and no window pins an old model. `predict_batch` runs one forward pass for any
+    number of profiles.
+    """
+    def __init__(self, registry, agent_dir, model_path, data_path, backend="eager", quantized=False,
+                 max_profiles=1024):
+        self.registry = registry
+        self.agent_dir = agent_dir
+        self.data_path = data_path
+        self.backend = backend
+        self.quantized = quantized
+        self.max_profiles = max_profiles
+        self.profile_rows = OrderedDict()  # key -> raw rows, oldest first
+        self.evictions = 0
+        self.lock = threading.Lock()
+        registry.register(LSTM_MODEL_NAME, self.load, model_path)
+
+    def load(self, model_path):
+        """Registry loader: build the predictor for `model_path` with its scaler and reference window"""
+        if self.agent_dir not in sys.path:
+            sys.path.insert(0, self.agent_dir)
+        predictor_module = importlib.import_module("predictor")
+        predictor = predictor_module.PowerPredictor(model_path=model_path, backend=self.backend,
+                                                    quantized=self.quantized)
+        predictor.load_model()  # read the weights now rather than on the first request
+        if predictor.reference_window is not None:
+            # A model bundle carries the training scaler and reference window: no dataset pass
+            reference_window = np.asarray(predictor.reference_window, dtype=np.float32)
+        else:
+            # Bare weights: fit the scaler on the history and use its last `lookback` rows
+            reference_window = np.asarray(predictor.load_data(self.data_path), dtype=np.float32)
+        logger.info("Prepared LSTM from %s (lookback %d, %s backend)", model_path, predictor.lookback, self.backend)
+        return LoadedLSTM(predictor, reference_window)
+
+    def _loaded(self):
+        return self.registry.get(LSTM_MODEL_NAME)
+
+    def available(self):
+        """False if torch, the weights or the data are missing"""
+        return self.registry.is_available(LSTM_MODEL_NAME)
+
+    def _window(self, loaded, key):
+        """The profile's scaled input window for `loaded` (call with self.lock held)"""
+        raw = self.profile_rows.get(key)
+        if raw is None:
+            return loaded.reference_window
+        self.profile_rows.move_to_end(key)
+        scaler, lookback = loaded.predictor.scaler, loaded.predictor.lookback
+        own = raw[len(raw) - min(len(raw), lookback):]
+        own = (own * scaler.scale_ + scaler.min_).astype(np.float32)
+        return np.concatenate([loaded.reference_window, own])[-lookback:]
+
+    def ingest(self, key, samples):
+        """
+        Append raw feature rows (Global_active_power ... Sub_metering_3) for a profile.
+
+        Returns:
+            int: Number of rows of the profile's window that now come from its own data
+
+        Raises:
+            ModelUnavailable: If the model cannot be loaded
+        """
+        loaded = self._loaded()
+        lookback = loaded.predictor.lookback
+        rows = np.asarray(samples, dtype=np.float32).reshape(-1, loaded.reference_window.shape[1])
+        with self.lock:
+            raw = self.profile_rows.pop(key, None)
+            raw = rows if raw is None else np.concatenate([raw, rows])
+            self.profile_rows[key] = raw = raw[len(raw) - min(len(raw), lookback):]
+            while len(self.profile_rows) > self.max_profiles:
+                self.profile_rows.popitem(last=False)
+                self.evictions += 1
+            return len(raw)
+
+    def predict_batch(self, keys):
+        """
+        Forecast Global_active_power (kW) for each profile in a single forward pass.
+
+        Args:
+            keys (list): Profile keys; profiles without own data use the reference window
+
+        Returns:
+            numpy.ndarray: Forecasts of shape [len(keys), output_steps]
+        """
+        loaded = self._loaded()
+        with self.lock:
+            windows = [self._window(loaded, key) for key in keys]
+        return loaded.predictor.predict_batch(np.stack(windows))
+
+    def stats(self):
+        with self.lock:
+            return {"profiles": len(self.profile_rows), "max_profiles": self.max_profiles,
+                    "evictions": self.evictions}
@@ -0,0 +1,217 @@
+import bisect
+import math
+import threading
+from collections import deque
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.config import (
+    PRICING_TICK, PRICING_MAX_TICKS, PRICING_VWAP_FILLS, PRICING_TARGET_FILL, PRICING_PRIOR_WEIGHT
+)
+
+logger = get_logger("pricing")
+
+
+class _BookSide:
+    """Aggregated open amount per price level, with the levels kept sorted"""
+    def __init__(self):
+        self.depth = {}  # price -> open amount
+        self.levels = []  # sorted prices
+        self.total = 0.0
+
+    def add(self, price, amount):
+        if price not in self.depth:
+            bisect.insort(self.levels, price)
+            self.depth[price] = 0.0
+        self.depth[price] += amount
+        self.total += amount
+
+    def remove(self, price, amount):
+        if price not in self.depth:
+            return
+        self.depth[price] -= amount
+        self.total -= amount
+        if self.depth[price] <= 1e-9:
+            del self.depth[price]
+            self.levels.pop(bisect.bisect_left(self.levels, price))
+
+    def clear(self):
+        self.depth.clear()
+        self.levels.clear()
+        self.total = 0.0
+
+
+class OrderBookPricer:
+    """
+    Incrementally maintained view of the order book used for price recommendations.
+
+    The order store reports every order that opens, closes or fills, so spread, depth
+    imbalance, recent VWAP and the fill-probability curves are always current and a quote
+    never rereads orders.json. Fill probability is estimated per side and per distance (in
+    ticks) from the opposite best price at the time an order was placed: the share of such
+    orders that later matched, smoothed towards a prior that decays with distance.
+    """
+    def __init__(self, tick=PRICING_TICK, max_ticks=PRICING_MAX_TICKS, vwap_fills=PRICING_VWAP_FILLS,
+                 prior_weight=PRICING_PRIOR_WEIGHT):
+        self.tick = tick
+        self.max_ticks = max_ticks
+        self.prior_weight = prior_weight
+        self.sides = {"buy": _BookSide(), "sell": _BookSide()}
+        self.open_orders = {}  # order id -> (side, price, amount, offset bucket)
+        self.placed = {side: [0] * (max_ticks + 1) for side in self.sides}
+        self.filled = {side: [0] * (max_ticks + 1) for side in self.sides}
+        self.fills = deque()  # (price, amount) of the most recent fills
+        self.vwap_fills = vwap_fills
+        self.fill_notional = 0.0
+        self.fill_amount = 0.0
+        self.lock = threading.Lock()
+
+    def rebuild(self, orders):
+        """Reset the state from a full snapshot of the order store"""
+        with self.lock:
+            for side in self.sides.values():
+                side.clear()
+            self.open_orders.clear()
+            self.fills.clear()
+            self.fill_notional = self.fill_amount = 0.0
+
+            matched = [o for o in orders if o.get("type") == "buy"
+                       and o.get("status") in ("matched", "partially_matched")]
+            matched.sort(key=lambda o: o.get("match_time", ""))
+            for order in matched[-self.vwap_fills:]:
+                self._record_fill(order["price"], order["amount"])
+            for order in orders:
+                if order.get("status") == "open" and order.get("id") is not None:
+                    self._add(order)
+        logger.info("Pricing state rebuilt", extra={"open_orders": len(self.open_orders), "fills": len(self.fills)})
+
+    def _bucket(self, side, price):
+        """Ticks between `price` and the best opposite price, 0 meaning the order crosses"""
+        if side == "buy":
+            anchor = self._best("sell") or self._reference_price()
+            ticks = (anchor - price) / self.tick if anchor else 0
+        else:
+            anchor = self._best("buy") or self._reference_price()
+            ticks = (price - anchor) / self.tick if anchor else 0
+        return min(self.max_ticks, max(0, int(round(ticks))))
+
+    def _add(self, order):
+        side = order["type"]
+        bucket = self._bucket(side, order["price"])
+        self.placed[side][bucket] += 1
+        self.sides[side].add(order["price"], order["amount"])
+        self.open_orders[order["id"]] = (side, order["price"], order["amount"], bucket)
+
+    def _record_fill(self, price, amount):
+        self.fills.append((price, amount))
+        self.fill_notional += price * amount
+        self.fill_amount += amount
+        if len(self.fills) > self.vwap_fills:
+            old_price, old_amount = self.fills.popleft()
+            self.fill_notional -= old_price * old_amount
+            self.fill_amount -= old_amount
+
+    def order_added(self, order):
+        if order.get("status", "open") != "open" or order.get("id") is None:
+            return
+        with self.lock:
+            self._add(order)
+
+    def order_closed(self, order_id, filled=False):
+        """Remove an order from the book; `filled` marks it as matched for the fill curves"""
+        with self.lock:
+            entry = self.open_orders.pop(order_id, None)
+            if entry is None:
+                return
+            side, price, amount, bucket = entry
+            self.sides[side].remove(price, amount)
+            if filled:
+                self.filled[side][bucket] += 1
+
+    def fill(self, price, amount):
+        with self.lock:
+            self._record_fill(price, amount)
+
+    def _best(self, side):
+        levels = self.sides[side].levels
+        if not levels:
+            return None
+        return levels[-1] if side == "buy" else levels[0]
+
+    def _reference_price(self):
+        if self.fill_amount > 0:
+            return self.fill_notional / self.fill_amount
+        return None
+
+    def _fill_probability(self, side, bucket, imbalance):
+        # Prior: a crossing order fills, and the chance decays with distance from the
+        # opposite best; it decays faster when our own side of the book is the crowded one
+        crowding = imbalance if side == "buy" else -imbalance
+        prior = math.exp(-bucket * (1 + crowding) / 10)
+        placed = self.placed[side][bucket]
+        return (self.filled[side][bucket] + self.prior_weight * prior) / (placed + self.prior_weight)
+
+    def snapshot(self):
+        """Spread, depth and VWAP inputs of the current book"""
+        with self.lock:
+            return self._snapshot()
+
+    def _snapshot(self):
+        best_bid, best_ask = self._best("buy"), self._best("sell")
+        bid_depth, ask_depth = self.sides["buy"].total, self.sides["sell"].total
+        total = bid_depth + ask_depth
+        return {
+            "best_bid": best_bid,
+            "best_ask": best_ask,
+            "spread": round(best_ask - best_bid, 6) if best_bid is not None and best_ask is not None else None,
+            "bid_depth": round(bid_depth, 6),
+            "ask_depth": round(ask_depth, 6),
+            "depth_imbalance": round((bid_depth - ask_depth) / total, 6) if total > 0 else 0.0,
+            "vwap": round(self._reference_price(), 6) if self.fill_amount > 0 else None,
+            "recent_fills": len(self.fills)
+        }
+
+    def quote(self, order_type, amount=None, target_fill_probability=PRICING_TARGET_FILL):
+        """
+        Recommend the least aggressive price whose estimated fill probability reaches the target.
+
+        Args:
+            order_type (str): "buy" or "sell"
+            amount (float): Order size in kWh; limits the fill probability of a crossing price
+                to the depth available at the opposite best
+            target_fill_probability (float): Fill probability the price should reach
+
+        Returns:
+            dict: Suggested price, its fill probability and the book inputs, or None if the
+                book is empty and there is no recent fill to anchor on
+        """
+        if order_type not in self.sides:
+            raise ValueError("Order type must be 'buy' or 'sell'")
+        opposite = "sell" if order_type == "buy" else "buy"
+        direction = -1 if order_type == "buy" else 1  # moving away from the opposite best
+
+        with self.lock:
+            book = self._snapshot()
+            anchor = self._best(opposite) or self._reference_price()
+            if anchor is None:
+                return None
+
+            price, probability = None, 0.0
+            for bucket in range(self.max_ticks, -1, -1):
+                probability = self._fill_probability(order_type, bucket, book["depth_imbalance"])
+                best_depth = self.sides[opposite].depth.get(self._best(opposite), 0.0)
+                if bucket == 0 and best_depth:
+                    # Crossing the spread matches at once, up to the depth at the best level
+                    probability = min(1.0, best_depth / amount) if amount else 1.0
+                if probability >= target_fill_probability or bucket == 0:
+                    price = anchor + direction * bucket * self.tick
+                    break
+
+        return {
+            "suggested_price": round(max(price, self.tick), 4),
+            "fill_probability": round(probability, 4),
+            "target_fill_probability": target_fill_probability,
+            "market": book
+        }
+
+
+# Book state of the process that owns the order store, fed by DatabaseManager
+PRICER = OrderBookPricer()
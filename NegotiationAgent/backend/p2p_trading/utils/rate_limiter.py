@@ -0,0 +1,128 @@
+import math
+import threading
+import time
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second up to `capacity`"""
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+
+    def available(self, cost, now):
+        self._refill(now)
+        return self.tokens >= cost
+
+    def full(self, now):
+        """True when the bucket has refilled to capacity (it then behaves exactly like a new one)"""
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def consume(self, cost):
+        self.tokens -= cost
+
+    def wait_time(self, cost):
+        """Seconds until `cost` tokens will be available"""
+        if self.rate <= 0:
+            return math.inf
+        return max(0.0, (cost - self.tokens) / self.rate)
+
+
+class AdmissionController:
+    """
+    Admission control in front of the order endpoints.
+    Combines per-user and global token buckets with bounded in-flight request counts,
+    so a flood from one client is rejected before any storage is touched. Every
+    `sweep_interval` seconds the buckets of users with nothing in flight that have refilled
+    to capacity are dropped, so memory follows the number of recently active users.
+    """
+    def __init__(self, user_rate, user_burst, global_rate, global_burst,
+                 max_inflight_per_user, max_inflight_global, sweep_interval=60.0):
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_inflight_per_user = max_inflight_per_user
+        self.max_inflight_global = max_inflight_global
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+        self.user_buckets = {}
+        self.sweep_interval = sweep_interval
+        self.last_sweep = time.monotonic()
+        self.evicted = 0
+        self.inflight = {}
+        self.inflight_total = 0
+        self.accepted = 0
+        self.rejected = {"user_rate": 0, "global_rate": 0, "user_inflight": 0, "global_inflight": 0}
+        self.lock = threading.Lock()
+
+    def try_admit(self, username, cost=1):
+        """
+        Try to admit a request costing `cost` tokens.
+
+        Returns:
+            tuple: (admitted, reason, retry_after) - reason and retry_after are None when admitted
+        """
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_sweep >= self.sweep_interval:
+                self._sweep(now)
+            if self.inflight.get(username, 0) >= self.max_inflight_per_user:
+                return self._reject("user_inflight", 1.0)
+            if self.inflight_total >= self.max_inflight_global:
+                return self._reject("global_inflight", 1.0)
+
+            bucket = self.user_buckets.get(username)
+            if bucket is None:
+                bucket = self.user_buckets[username] = TokenBucket(self.user_rate, self.user_burst)
+            if not bucket.available(cost, now):
+                return self._reject("user_rate", bucket.wait_time(cost))
+            if not self.global_bucket.available(cost, now):
+                return self._reject("global_rate", self.global_bucket.wait_time(cost))
+
+            # Only charge the buckets once every check has passed
+            bucket.consume(cost)
+            self.global_bucket.consume(cost)
+            self.inflight[username] = self.inflight.get(username, 0) + 1
+            self.inflight_total += 1
+            self.accepted += 1
+            return True, None, None
+
+    def release(self, username):
+        """Release the in-flight slot taken by an admitted request"""
+        with self.lock:
+            count = self.inflight.get(username, 0) - 1
+            if count > 0:
+                self.inflight[username] = count
+            else:
+                self.inflight.pop(username, None)
+            self.inflight_total = max(0, self.inflight_total - 1)
+
+    def _sweep(self, now):
+        """Drop idle buckets that are back at capacity (call with self.lock held)"""
+        idle = [name for name, bucket in self.user_buckets.items()
+                if name not in self.inflight and bucket.full(now)]
+        for name in idle:
+            del self.user_buckets[name]
+        self.evicted += len(idle)
+        self.last_sweep = now
+
+    def _reject(self, reason, retry_after):
+        self.rejected[reason] += 1
+        return False, reason, retry_after
+
+    def stats(self):
+        """Snapshot of the admission counters"""
+        with self.lock:
+            return {
+                "accepted": self.accepted,
+                "rejected": dict(self.rejected),
+                "rejected_total": sum(self.rejected.values()),
+                "inflight": self.inflight_total,
+                "tracked_users": len(self.user_buckets),
+                "evicted_users": self.evicted
+            }
@@ -1,60 +1,176 @@
 import os
 import json
-import traceback
+import hashlib
+import hmac
+import secrets
+import threading
+from p2p_trading.utils.logger import get_logger
+from p2p_trading.utils.config import PASSWORD_HASH_ITERATIONS
+
+logger = get_logger("user")
 
 USERS_FILE = "data/users.json"
 
+HASH_ALGORITHM = "pbkdf2_sha256"
+
+
+def hash_password(password, iterations=PASSWORD_HASH_ITERATIONS, salt=None):
+    """Hash a password as "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>" with a random salt"""
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{HASH_ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
+
+
+def verify_password(password, encoded):
+    """Check a password against a hash produced by hash_password (constant-time comparison)"""
+    try:
+        algorithm, iterations, salt, expected = encoded.split("$")
+        if algorithm != HASH_ALGORITHM:
+            return False
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode(), bytes.fromhex(salt), int(iterations))
+        return hmac.compare_digest(digest.hex(), expected)
+    except (ValueError, AttributeError):
+        return False
+
+
+def hash_plaintext_passwords(users, iterations=PASSWORD_HASH_ITERATIONS):
+    """Replace every plain-text "password" field in place with a salted "password_hash"; return the count"""
+    upgraded = 0
+    for user in users:
+        if "password" in user:
+            user["password_hash"] = hash_password(user.pop("password"), iterations)
+            upgraded += 1
+    return upgraded
+
+
+def migrate_users_file(path=USERS_FILE, iterations=PASSWORD_HASH_ITERATIONS):
+    """
+    One-off migration: rewrite a users file so it holds only salted hashes.
+    Run it once on upgrade with `python -m p2p_trading.utils.user_manager [path]`.
+    """
+    with open(path, "r") as f:
+        users = json.load(f)
+    upgraded = hash_plaintext_passwords(users, iterations)
+    if upgraded:
+        _write_users(path, users)
+    return upgraded
+
+
+def _write_users(path, users):
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "w") as f:
+        json.dump(users, f, indent=2)
+    os.replace(tmp_file, path)
+
+
+class UserDirectory:
+    """
+    In-memory index of the users file keyed by username.
+    The file is re-parsed only when its mtime or size changes, so a login costs one stat()
+    and one dict lookup however many accounts there are. Plain-text passwords found in the
+    file (one that skipped migrate_users_file) are replaced by salted hashes the first time
+    it is loaded.
+    """
+    def __init__(self, path=USERS_FILE, iterations=PASSWORD_HASH_ITERATIONS):
+        self.path = path
+        self.iterations = iterations
+        self.users = {}
+        self.signature = None
+        self.lock = threading.Lock()
+        # Verified against when the username is unknown, so both cases take the same time
+        self.dummy_hash = hash_password(secrets.token_hex(8), iterations)
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            with self.lock:
+                self.users, self.signature = {}, None
+            return
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.signature:
+            return
+
+        with self.lock:
+            if signature == self.signature:
+                return  # another thread reloaded while we waited
+            with open(self.path, "r") as f:
+                users = json.load(f)
+
+            upgraded = hash_plaintext_passwords(users, self.iterations)
+            if upgraded:
+                _write_users(self.path, users)
+                logger.info("Replaced %d plain-text passwords with salted hashes", upgraded)
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+
+            self.users = {user["username"]: user for user in users}
+            self.signature = signature
+            logger.debug("Loaded %d users from %s", len(self.users), self.path)
+
+    def get(self, username):
+        self._refresh()
+        return self.users.get(username)
+
+    def all(self):
+        self._refresh()
+        return list(self.users.values())
+
+    def verify(self, username, password):
+        """Return the user record if the credentials are valid, otherwise None"""
+        user = self.get(username)
+        encoded = user.get("password_hash") if user else self.dummy_hash
+        if verify_password(password, encoded) and user is not None:
+            return user
+        return None
+
+
 class UserManager:
     def __init__(self):
         try:
             # Ensure data directory exists
             os.makedirs("data", exist_ok=True)
-            
+
             # If users file doesn't exist, create with default users
             if not os.path.exists(USERS_FILE):
                 default_users = [
-                    {"username": "user1", "password": "password1"},
-                    {"username": "user2", "password": "password2"},
-                    {"username": "user3", "password": "password3"}
+                    {"username": "user1", "password_hash": hash_password("password1")},
+                    {"username": "user2", "password_hash": hash_password("password2")},
+                    {"username": "user3", "password_hash": hash_password("password3")}
                 ]
                 with open(USERS_FILE, "w") as f:
                     json.dump(default_users, f, indent=2)
-                print(f"[User] Created default users file")
-        except Exception as e:
-            print(f"[User] Error initializing user manager: {e}")
-            print(traceback.format_exc())
-    
+                logger.info("Created default users file")
+        except Exception:
+            logger.exception("Error initializing user manager")
+        self.directory = UserDirectory(USERS_FILE)
+
     def get_all_users(self):
-        """Get all registered users"""
+        """Get all registered users (without password hashes)"""
         try:
-            if not os.path.exists(USERS_FILE):
-                with open(USERS_FILE, "w") as f:
-                    json.dump([], f)
-                return []
-            
-            with open(USERS_FILE, "r") as f:
-                users = json.load(f)
-            return users
-        except Exception as e:
-            print(f"[User] Error reading users: {e}")
-            print(traceback.format_exc())
+            return [{k: v for k, v in user.items() if k != "password_hash"} for user in self.directory.all()]
+        except Exception:
+            logger.exception("Error reading users")
             return []
-    
+
     def authenticate_user(self, username, password):
         """Authenticate a user with username and password"""
         try:
-            users = self.get_all_users()
-            
-            for user in users:
-                if user["username"] == username and user["password"] == password:
-                    return True, user
-            
+            user = self.directory.verify(username, password)
+            if user is not None:
+                return True, {k: v for k, v in user.items() if k != "password_hash"}
+
             return False, "Invalid username or password"
         except Exception as e:
-            print(f"[User] Authentication error: {e}")
-            print(traceback.format_exc())
+            logger.exception("Authentication error")
             return False, str(e)
-    
+
     def get_user_orders(self, username, orders):
         """Filter orders to get only those belonging to a specific user"""
-        return [order for order in orders if order.get("user") == username]
\ No newline at end of file
+        return [order for order in orders if order.get("user") == username]
+
+
+if __name__ == "__main__":
+    import sys
+    users_file = sys.argv[1] if len(sys.argv) > 1 else USERS_FILE
+    print(f"Hashed {migrate_users_file(users_file)} plain-text passwords in {users_file}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the backend the way api_server.py does (p2p_trading.utils...), from the backend directory
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
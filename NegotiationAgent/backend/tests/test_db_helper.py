@@ -0,0 +1,51 @@
+import pytest
+from p2p_trading.utils.db_helper import DatabaseManager, next_order_id
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # the store lives in ./data/orders.json
+    return DatabaseManager()
+
+
+def order(side, price, amount, user="alice"):
+    return {"type": side, "price": price, "amount": amount, "status": "open", "user": user}
+
+
+def test_next_order_id_follows_the_highest_id():
+    assert next_order_id([]) == 1
+    assert next_order_id([{"id": 1}, {"id": 7}, {"id": None}]) == 8
+
+
+def test_ids_stay_unique_after_a_delete(db):
+    for _ in range(3):
+        db.store_order(order("buy", 1.0, 1))
+    db.delete_order(2)
+    assert db.store_orders([order("buy", 1.0, 1), order("buy", 1.0, 1)]) == [4, 5]
+    ids = [o["id"] for o in db.get_all_orders()]
+    assert len(ids) == len(set(ids))
+
+
+def test_partial_match_remainder_gets_a_new_id(db):
+    db.store_order(order("buy", 1.0, 1))
+    db.store_order(order("buy", 1.0, 1))
+    db.delete_order(1)
+    db.store_order(order("sell", 1.0, 3, user="bob"))
+    assert db.match_orders() == 1
+    orders = db.get_all_orders()
+    ids = [o["id"] for o in orders]
+    assert len(ids) == len(set(ids))
+    remainder = [o for o in orders if o.get("original_order_id") is not None]
+    assert [(o["id"], o["amount"], o["status"]) for o in remainder] == [(4, 2, "open")]
+
+
+def test_order_batch_is_stored_with_one_write(db):
+    from p2p_trading.utils.metrics import STORE_WRITES
+
+    db.store_order(order("sell", 2.0, 1, user="bob"))
+    writes = sum(STORE_WRITES.values.values())
+    batch = [order("buy", 1.0, 1), order("buy", 1.1, 2), order("sell", 3.0, 1, user="bob")]
+    assert db.store_orders(batch) == [2, 3, 4]
+    assert sum(STORE_WRITES.values.values()) == writes + 1
+    assert [o["id"] for o in db.get_all_orders()] == [1, 2, 3, 4]
+    assert [o["id"] for o in batch] == [2, 3, 4]  # the caller's orders carry their IDs
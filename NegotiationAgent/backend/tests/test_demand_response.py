@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from p2p_trading.utils.demand_response import (
+    DemandResponseOptimizer, allocate_curtailment, flatten_households, validate_fleet_request
+)
+
+
+def test_cheapest_loads_are_shed_first_and_the_marginal_one_partly():
+    curtailable = np.array([2.0, 1.0, 3.0])
+    price = np.array([0.10, 0.05, 0.07])
+    shed = allocate_curtailment(3.5, curtailable, price)
+    np.testing.assert_allclose(shed, [0.0, 1.0, 2.5])
+
+
+def test_incentive_cap_excludes_expensive_loads():
+    shed = allocate_curtailment(10.0, np.array([2.0, 1.0]), np.array([0.10, 0.05]), max_incentive_per_kwh=0.08)
+    np.testing.assert_allclose(shed, [0.0, 1.0])
+
+
+@pytest.mark.parametrize("target", [0.0, 1.0, 5.5, 100.0])
+def test_total_is_the_target_capped_by_capacity(target):
+    rng = np.random.default_rng(0)
+    curtailable = rng.uniform(0, 2, 50)
+    price = rng.uniform(0.01, 0.2, 50)
+    shed = allocate_curtailment(target, curtailable, price)
+    assert shed.sum() == pytest.approx(min(target, curtailable.sum()))
+    assert (shed >= 0).all() and (shed <= curtailable + 1e-12).all()
+    if target > 0:
+        # Optimal: every load cheaper than the marginal one is shed completely
+        cheaper = price < price[shed > 0].max()
+        np.testing.assert_allclose(shed[cheaper], curtailable[cheaper])
+
+
+def test_flatten_applies_comfort_bounds_and_default_rate():
+    ids, names, owner, curtailable, price = flatten_households([
+        {"household_id": "h1", "flexible_loads": {"hvac": 3.0, "water_heater": 2.0},
+         "comfort_bounds": {"hvac": 0.5}, "incentive_per_kwh": 0.06},
+        {"flexible_loads": {"ev": 7.0}},
+    ])
+    assert ids == ["h1", 1]
+    assert names == ["hvac", "water_heater", "ev"]
+    np.testing.assert_array_equal(owner, [0, 0, 1])
+    np.testing.assert_allclose(curtailable, [1.5, 2.0, 7.0])
+    np.testing.assert_allclose(price, [0.06, 0.06, 0.05])
+
+
+def test_plan_reports_totals_and_per_household_loads():
+    plan = DemandResponseOptimizer().plan({"target_reduction_kw": 4.0, "duration_hours": 2}, [
+        {"household_id": "cheap", "flexible_loads": {"hvac": 3.0}, "incentive_per_kwh": 0.02},
+        {"household_id": "dear", "flexible_loads": {"hvac": 3.0}, "incentive_per_kwh": 0.09},
+        {"household_id": "idle", "flexible_loads": {}},
+    ])
+    assert plan["achieved_reduction_kw"] == 4.0
+    assert plan["shortfall_kw"] == 0.0
+    assert plan["households_called"] == 2
+    assert plan["plans"][0] == {"household_id": "cheap", "reduction_kw": 3.0, "incentive": 0.12, "loads": {"hvac": 3.0}}
+    assert plan["plans"][1]["loads"] == {"hvac": 1.0}
+    assert plan["marginal_incentive_per_kwh"] == 0.09
+
+
+@pytest.mark.parametrize("grid_status, households", [
+    ([], []),
+    ({"target_reduction_kw": "5"}, []),
+    ({}, ["h1"]),
+    ({}, [{"flexible_loads": {"hvac": "3"}}]),
+    ({}, [{"flexible_loads": [3.0]}]),
+    ({}, [{"comfort_bounds": {"hvac": None}}]),
+    ({}, [{"incentive_per_kwh": True}]),
+    ({}, [{"flexible_loads": {"hvac": float("nan")}}]),
+])
+def test_malformed_requests_are_rejected(grid_status, households):
+    assert validate_fleet_request(grid_status, households) is not None
+
+
+def test_well_formed_request_passes_validation():
+    assert validate_fleet_request({"target_reduction_kw": 5, "max_incentive_per_kwh": None}, [
+        {"household_id": "h1", "flexible_loads": {"hvac": 3}, "comfort_bounds": {"hvac": 0.5},
+         "incentive_per_kwh": 0.06},
+        {"flexible_loads": None},
+    ]) is None
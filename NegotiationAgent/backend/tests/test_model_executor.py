@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+from p2p_trading.utils.model_executor import AsyncModelInterface, ModelBusy, ModelExecutor
+from p2p_trading.utils.prediction_cache import PredictionCache
+
+
+class FakeModels:
+    """Just enough of ModelInterface for the facade: one slow call and plain attributes"""
+    def __init__(self):
+        self.release = threading.Event()
+        self.prediction_cache = PredictionCache()
+        self.models_available = {"prediction": False}
+
+    def model_status(self):
+        self.release.wait(5)
+        return {"m": {"loaded": True}}
+
+    def get_optimal_price(self, order_type, market_data):
+        self.release.wait(5)
+        return {"suggested_price": 2.0}
+
+    def undeclared_model_call(self):
+        return "ran on the request thread"
+
+
+@pytest.fixture
+def models():
+    models = FakeModels()
+    yield models
+    models.release.set()
+
+
+def test_calls_return_results_within_the_deadline(models):
+    models.release.set()
+    facade = AsyncModelInterface(models, ModelExecutor(1, 0), timeout=1.0)
+    assert facade.model_status() == {"m": {"loaded": True}}
+    assert facade.executor.stats()["outcomes"]["completed"] == 1
+
+
+def test_missed_deadline_gives_a_degraded_answer(models):
+    facade = AsyncModelInterface(models, ModelExecutor(1, 0), timeout=0.01)
+    result = facade.get_optimal_price("buy", {})
+    assert result["degraded"] and result["degraded_reason"] == "timeout"
+
+
+def test_calls_without_a_placeholder_raise_model_busy(models):
+    facade = AsyncModelInterface(models, ModelExecutor(1, 0), timeout=0.01)
+    with pytest.raises(ModelBusy) as timeout:
+        facade.model_status()
+    with pytest.raises(ModelBusy) as busy:
+        facade.model_status()  # the first call still holds the only worker
+    assert (timeout.value.reason, busy.value.reason) == ("timeout", "busy")
+    assert facade.executor.stats()["outcomes"]["rejected"] == 1
+
+
+def test_only_plain_attributes_are_forwarded(models):
+    facade = AsyncModelInterface(models, ModelExecutor(1, 0))
+    assert facade.prediction_cache is models.prediction_cache
+    assert facade.models_available == {"prediction": False}
+    with pytest.raises(AttributeError):
+        facade.undeclared_model_call()
@@ -0,0 +1,101 @@
+import pytest
+from p2p_trading.utils.model_registry import ModelRegistry, ModelUnavailable
+
+
+class Loader:
+    """Loader that records its calls and can be told to fail"""
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def __call__(self, path):
+        self.calls.append(path)
+        if self.fail:
+            raise IOError(f"cannot read {path}")
+        return {"path": path}
+
+
+@pytest.fixture
+def loader():
+    return Loader()
+
+
+def test_models_load_on_first_use_only(loader):
+    registry = ModelRegistry()
+    registry.register("m", loader, "v1.pt")
+    assert loader.calls == []
+    assert registry.get("m") == {"path": "v1.pt"}
+    assert registry.get("m") is registry.get("m")
+    assert loader.calls == ["v1.pt"]
+
+
+def test_least_recently_used_model_is_evicted(loader):
+    registry = ModelRegistry(max_loaded=2)
+    for name in ("a", "b", "c"):
+        registry.register(name, loader, f"{name}.pt")
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")  # "b" is now the least recently used
+    registry.get("c")
+    assert list(registry.loaded) == ["a", "c"]
+    registry.get("b")  # reloaded on demand
+    assert loader.calls == ["a.pt", "b.pt", "c.pt", "b.pt"]
+
+
+def test_swap_replaces_the_model_and_bumps_the_version(loader):
+    registry = ModelRegistry()
+    registry.register("m", loader, "v1.pt")
+    registry.get("m")
+    status = registry.swap("m", "v2.pt")
+    assert registry.get("m") == {"path": "v2.pt"}
+    assert (status["path"], status["version"], status["loaded"]) == ("v2.pt", 1, True)
+
+
+def test_failed_swap_keeps_the_old_model(loader):
+    registry = ModelRegistry()
+    registry.register("m", loader, "v1.pt")
+    registry.get("m")
+    loader.fail = True
+    with pytest.raises(ModelUnavailable):
+        registry.swap("m", "broken.pt")
+    assert registry.get("m") == {"path": "v1.pt"}
+    assert registry.status()["m"]["version"] == 0
+
+
+def test_failed_load_is_not_retried_until_the_backoff_expires(loader):
+    registry = ModelRegistry(retry_after=3600)
+    registry.register("m", loader, "missing.pt")
+    loader.fail = True
+    for _ in range(3):
+        assert not registry.is_available("m")
+    assert loader.calls == ["missing.pt"]
+    assert "cannot read" in registry.status()["m"]["error"]
+
+
+def test_failed_load_is_retried_after_the_backoff(loader):
+    registry = ModelRegistry(retry_after=0)
+    registry.register("m", loader, "v1.pt")
+    loader.fail = True
+    assert not registry.is_available("m")
+    loader.fail = False
+    assert registry.is_available("m")
+    assert registry.status()["m"]["error"] is None
+
+
+def test_failed_load_is_retried_when_the_artifact_changes(loader, tmp_path):
+    artifact = tmp_path / "model.pt"
+    registry = ModelRegistry(retry_after=3600)
+    registry.register("m", loader, str(artifact))
+    loader.fail = True
+    assert not registry.is_available("m")  # the file does not exist yet
+    artifact.write_bytes(b"weights")
+    loader.fail = False
+    assert registry.is_available("m")
+
+
+def test_unknown_models_are_unavailable():
+    registry = ModelRegistry()
+    with pytest.raises(ModelUnavailable):
+        registry.get("nope")
+    with pytest.raises(ModelUnavailable):
+        registry.swap("nope", "x.pt")
@@ -0,0 +1,60 @@
+from p2p_trading.utils.prediction_cache import PredictionCache
+
+
+def test_hit_miss_and_lru_eviction():
+    cache = PredictionCache(maxsize=2, ttl=60)
+    cache.put("consumption", "a", "p", 1)
+    cache.put("consumption", "b", "p", 2)
+    assert cache.get("consumption", "a", "p") == 1  # "a" is now most recently used
+    cache.put("consumption", "c", "p", 3)
+    assert cache.get("consumption", "b", "p") is None
+    assert cache.get("consumption", "a", "p") == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1)
+
+
+def test_expired_entries_miss_but_can_be_peeked():
+    cache = PredictionCache(maxsize=4, ttl=0)
+    cache.put("production", "a", "p", 1)
+    assert cache.peek("production", "a", "p") == 1
+    assert cache.get("production", "a", "p") is None
+    assert cache.peek("production", "a", "p") is None  # the expired entry was dropped by get
+
+
+def test_invalidate_drops_only_that_profile():
+    cache = PredictionCache(maxsize=8, ttl=60)
+    cache.put("production", "a", "p1", 1)
+    cache.put("consumption", "a", "p2", 2)
+    cache.put("consumption", "b", "p1", 3)
+    assert cache.invalidate("a") == 2
+    assert cache.get("consumption", "a", "p2") is None
+    assert cache.get("consumption", "b", "p1") == 3
+
+
+def test_put_after_invalidate_is_discarded():
+    cache = PredictionCache(maxsize=8, ttl=60)
+    generation = cache.generation()
+    cache.invalidate("a")  # new data arrived while the forecast was running
+    assert not cache.put("consumption", "a", "p", 1, generation)
+    assert cache.put("consumption", "b", "p", 2, generation)  # other profiles are unaffected
+    assert cache.put("consumption", "a", "p", 3, cache.generation())
+    assert cache.get("consumption", "a", "p") == 3
+    assert cache.stats()["stale_puts"] == 1
+
+
+def test_forgotten_invalidations_still_reject_older_puts():
+    cache = PredictionCache(maxsize=1, ttl=60)
+    generation = cache.generation()
+    cache.invalidate("a")
+    cache.invalidate("b")  # "a"'s stamp is dropped to keep the index bounded
+    assert len(cache.invalidated_at) == 1
+    assert not cache.put("consumption", "a", "p", 1, generation)
+
+
+def test_clear_rejects_puts_from_before():
+    cache = PredictionCache(maxsize=8, ttl=60)
+    generation = cache.generation()
+    cache.put("consumption", "a", "p", 1)
+    cache.clear()
+    assert cache.get("consumption", "a", "p") is None
+    assert not cache.put("consumption", "z", "p", 1, generation)
@@ -0,0 +1,84 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from p2p_trading.utils.model_registry import ModelRegistry, ModelUnavailable
+from p2p_trading.utils.prediction_model import LSTM_MODEL_NAME, LSTMForecaster, LoadedLSTM, profile_key
+
+N_FEATURES = 2
+
+
+class EchoPredictor:
+    """Stands in for PowerPredictor: returns the input windows, so tests can see what the model got"""
+    def __init__(self, lookback, scale, offset):
+        self.lookback = lookback
+        self.scaler = SimpleNamespace(scale_=np.full(N_FEATURES, scale), min_=np.full(N_FEATURES, offset))
+        self.model = None
+
+    def predict_batch(self, windows):
+        return windows
+
+
+def echo_loader(path):
+    lookback, scale, offset = {"v1": (3, 1.0, 0.0), "v2": (2, 0.5, 1.0)}[path]
+    return LoadedLSTM(EchoPredictor(lookback, scale, offset), np.full((lookback, N_FEATURES), -1.0, np.float32))
+
+
+@pytest.fixture
+def registry():
+    return ModelRegistry()
+
+
+@pytest.fixture
+def forecaster(registry):
+    forecaster = LSTMForecaster(registry, "unused", "v1", None, max_profiles=2)
+    registry.register(LSTM_MODEL_NAME, echo_loader, "v1")  # no torch or weights needed
+    return forecaster
+
+
+def rows(*values):
+    return [[value] * N_FEATURES for value in values]
+
+
+def test_profile_key_is_stable_for_json_profiles():
+    assert profile_key({"b": 1, "a": 2}) == profile_key({"a": 2, "b": 1})
+    assert profile_key(7) == "7"
+
+
+def test_windows_start_from_the_reference_and_fill_with_own_rows(forecaster):
+    assert forecaster.ingest("a", rows(1)) == 1
+    windows = forecaster.predict_batch(["a", "nobody"])
+    np.testing.assert_array_equal(windows[0, :, 0], [-1, -1, 1])
+    np.testing.assert_array_equal(windows[1, :, 0], [-1, -1, -1])
+    assert forecaster.ingest("a", rows(2, 3, 4)) == 3  # at most one lookback is kept
+    np.testing.assert_array_equal(forecaster.predict_batch(["a"])[0, :, 0], [2, 3, 4])
+
+
+def test_rows_are_kept_raw_and_scaled_for_the_current_model(forecaster, registry):
+    forecaster.ingest("a", rows(2, 4, 6))
+    registry.swap(LSTM_MODEL_NAME, "v2")
+    # New lookback 2 and scaler x * 0.5 + 1, applied to the raw rows
+    np.testing.assert_array_equal(forecaster.predict_batch(["a"])[0, :, 0], [3, 4])
+    assert all(raw.dtype == np.float32 for raw in forecaster.profile_rows.values())
+
+
+def test_profiles_beyond_the_bound_are_evicted_least_recently_used_first(forecaster):
+    forecaster.ingest("a", rows(1))
+    forecaster.ingest("b", rows(2))
+    forecaster.predict_batch(["a"])  # reading "a" keeps it
+    forecaster.ingest("c", rows(3))
+    assert list(forecaster.profile_rows) == ["a", "c"]
+    assert forecaster.stats() == {"profiles": 2, "max_profiles": 2, "evictions": 1}
+
+
+def test_ingest_reports_an_unavailable_model():
+    registry = ModelRegistry()
+    forecaster = LSTMForecaster(registry, "unused", "missing", None)
+
+    def failing_loader(path):
+        raise IOError("no weights")
+
+    registry.register(LSTM_MODEL_NAME, failing_loader, "missing")
+    with pytest.raises(ModelUnavailable):
+        forecaster.ingest("a", rows(1))
+    assert not forecaster.available()
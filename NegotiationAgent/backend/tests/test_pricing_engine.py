@@ -0,0 +1,73 @@
+import pytest
+from p2p_trading.utils.pricing_engine import OrderBookPricer
+
+
+def order(order_id, side, price, amount, status="open", **extra):
+    return {"id": order_id, "type": side, "price": price, "amount": amount, "status": status, **extra}
+
+
+@pytest.fixture
+def pricer():
+    pricer = OrderBookPricer(tick=0.01, max_ticks=20, vwap_fills=2, prior_weight=5)
+    for item in (order(1, "buy", 1.00, 3), order(2, "buy", 0.98, 1),
+                 order(3, "sell", 1.05, 2), order(4, "sell", 1.10, 2)):
+        pricer.order_added(item)
+    return pricer
+
+
+def test_snapshot_tracks_spread_and_depth(pricer):
+    book = pricer.snapshot()
+    assert (book["best_bid"], book["best_ask"], book["spread"]) == (1.00, 1.05, 0.05)
+    assert (book["bid_depth"], book["ask_depth"]) == (4, 4)
+    assert book["depth_imbalance"] == 0.0
+    assert book["vwap"] is None
+
+
+def test_closed_orders_leave_the_book(pricer):
+    pricer.order_closed(3, filled=True)
+    pricer.order_closed(3)  # closing twice is harmless
+    book = pricer.snapshot()
+    assert book["best_ask"] == 1.10
+    assert book["ask_depth"] == 2
+
+
+def test_vwap_covers_only_recent_fills(pricer):
+    pricer.fill(1.0, 1)
+    pricer.fill(2.0, 1)
+    pricer.fill(4.0, 3)  # pushes the first fill out of the two-fill window
+    book = pricer.snapshot()
+    assert book["vwap"] == pytest.approx((2.0 + 12.0) / 4)
+    assert book["recent_fills"] == 2
+
+
+def test_quote_needs_an_anchor():
+    assert OrderBookPricer().quote("buy", 1) is None
+
+
+def test_quote_rejects_unknown_side(pricer):
+    with pytest.raises(ValueError):
+        pricer.quote("hold", 1)
+
+
+def test_certain_fill_crosses_the_spread(pricer):
+    quote = pricer.quote("buy", 2, target_fill_probability=1.0)
+    assert quote["suggested_price"] == 1.05
+    assert quote["fill_probability"] == 1.0
+    # Only 2 kWh rest at the best ask, so a 4 kWh order is at most half filled there
+    assert pricer.quote("buy", 4, target_fill_probability=1.0)["fill_probability"] == 0.5
+
+
+def test_lower_target_quotes_a_less_aggressive_price(pricer):
+    buy = pricer.quote("buy", 1, target_fill_probability=0.5)
+    sell = pricer.quote("sell", 1, target_fill_probability=0.5)
+    assert buy["suggested_price"] < 1.05 and buy["fill_probability"] >= 0.5
+    assert sell["suggested_price"] > 1.00 and sell["fill_probability"] >= 0.5
+
+
+def test_rebuild_matches_incremental_state(pricer):
+    rebuilt = OrderBookPricer(tick=0.01, max_ticks=20, vwap_fills=2, prior_weight=5)
+    rebuilt.rebuild([order(1, "buy", 1.00, 3), order(2, "buy", 0.98, 1),
+                     order(3, "sell", 1.05, 2), order(4, "sell", 1.10, 2),
+                     order(5, "buy", 1.20, 1, status="matched", match_time="2025-01-01 00:00:00")])
+    pricer.fill(1.20, 1)
+    assert rebuilt.snapshot() == pricer.snapshot()
@@ -0,0 +1,60 @@
+import pytest
+from p2p_trading.utils.rate_limiter import TokenBucket, AdmissionController
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate=2, capacity=4)
+    start = bucket.updated
+    bucket.consume(4)
+    assert not bucket.available(1, start)
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    assert bucket.available(1, start + 0.5)
+    assert not bucket.full(start + 1.0)
+    assert bucket.full(start + 10.0)
+    assert bucket.tokens == 4
+
+
+def test_token_bucket_without_rate_never_refills():
+    bucket = TokenBucket(rate=0, capacity=1)
+    bucket.consume(1)
+    assert bucket.wait_time(1) == float("inf")
+
+
+def test_user_burst_is_enforced_per_user():
+    admission = AdmissionController(0, 2, 0, 100, max_inflight_per_user=10, max_inflight_global=10)
+    assert admission.try_admit("alice")[0]
+    assert admission.try_admit("alice")[0]
+    assert admission.try_admit("alice")[:2] == (False, "user_rate")
+    assert admission.try_admit("bob")[0]  # other users keep their own bucket
+
+
+def test_global_bucket_and_inflight_limits():
+    admission = AdmissionController(0, 10, 0, 2, max_inflight_per_user=1, max_inflight_global=10)
+    assert admission.try_admit("alice")[0]
+    assert admission.try_admit("alice")[:2] == (False, "user_inflight")
+    admission.release("alice")
+    assert admission.try_admit("alice")[0]
+    assert admission.try_admit("bob")[:2] == (False, "global_rate")
+    stats = admission.stats()
+    assert stats["accepted"] == 2
+    assert stats["rejected"]["user_inflight"] == 1
+    assert stats["rejected"]["global_rate"] == 1
+
+
+def test_rejected_requests_are_not_charged():
+    admission = AdmissionController(0, 1, 0, 1, max_inflight_per_user=0, max_inflight_global=10)
+    assert admission.try_admit("alice")[:2] == (False, "user_inflight")
+    assert admission.user_buckets == {}  # rejected before a bucket was created or charged
+    assert admission.global_bucket.tokens == 1
+
+
+def test_idle_full_buckets_are_evicted():
+    admission = AdmissionController(1e9, 1, 1e9, 1e9, max_inflight_per_user=10, max_inflight_global=10,
+                                    sweep_interval=0)
+    admission.try_admit("busy")
+    admission.try_admit("idle")
+    admission.release("idle")
+    admission.try_admit("other")  # sweeps first: "idle" has refilled and has nothing in flight
+    assert "idle" not in admission.user_buckets
+    assert "busy" in admission.user_buckets
+    assert admission.stats()["evicted_users"] == 1
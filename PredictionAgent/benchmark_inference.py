@@ -0,0 +1,78 @@
+"""
+推理后端基准测试
+
+在 CPU 上比较各推理后端在不同 batch 大小下的延迟和吞吐，并检查输出与 eager 模型一致。
+需要先用 model_export.py 导出 TorchScript / ONNX 文件；未导出或未安装 onnxruntime 的后端会被跳过。
+
+    python benchmark_inference.py --model best_model.pth
+    python benchmark_inference.py --model best_model.pth --batch-sizes 1 64 1024 --threads 4
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from model_export import BACKENDS
+from predictor import PowerPredictor, forward_batch
+
+BATCH_SIZES = (1, 4, 16, 64, 256, 1024)
+ATOL = 1e-4  # 与 eager 输出（标准化尺度）的最大允许误差
+
+
+def time_backend(model, device, windows, repeats):
+    forward_batch(model, device, windows)  # 预热
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        forward_batch(model, device, windows)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings))
+
+
+def load_backends(model_path, backends):
+    models = {}
+    for backend in backends:
+        predictor = PowerPredictor(model_path=model_path, backend=backend)
+        try:
+            models[backend] = (predictor, predictor.load_model())
+        except (ImportError, FileNotFoundError) as e:
+            print(f"skip {backend}: {e}")
+    return models
+
+
+def run(model_path, backends, batch_sizes, repeats, seed=0):
+    models = load_backends(model_path, backends)
+    reference, _ = models["eager"]
+    rng = np.random.default_rng(seed)
+    rows = []
+    for batch_size in batch_sizes:
+        windows = rng.random((batch_size, reference.lookback, len(reference.features)), dtype=np.float32)
+        expected = forward_batch(reference.model, reference.device, windows)
+        for backend, (predictor, model) in models.items():
+            error = float(np.abs(forward_batch(model, predictor.device, windows) - expected).max())
+            seconds = time_backend(model, predictor.device, windows, repeats)
+            rows.append({"backend": backend, "batch": batch_size, "latency_ms": seconds * 1000,
+                         "windows_per_s": batch_size / seconds, "max_abs_error": error, "ok": error <= ATOL})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark LSTMModel inference backends on CPU")
+    parser.add_argument("--model", default="best_model.pth")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=list(BATCH_SIZES))
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--threads", type=int, help="torch intra-op threads")
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    backends = ["eager"] + [b for b in args.backends if b != "eager"]
+
+    rows = run(args.model, backends, args.batch_sizes, args.repeats)
+    print(f"{'backend':<12}{'batch':>6}{'latency ms':>12}{'windows/s':>12}{'max err':>10}")
+    for row in rows:
+        print(f"{row['backend']:<12}{row['batch']:>6}{row['latency_ms']:>12.3f}{row['windows_per_s']:>12.0f}"
+              f"{row['max_abs_error']:>10.1e}{'' if row['ok'] else '  MISMATCH'}")
+    if not all(row["ok"] for row in rows):
+        raise SystemExit(f"outputs differ from eager by more than {ATOL}")
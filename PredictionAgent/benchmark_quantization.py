@@ -0,0 +1,96 @@
+"""
+动态 int8 量化模型与 fp32 模型的对比
+
+精度：在按时间划分的测试集（最后 test_size 部分，与 train.py 的划分一致）上比较两者预测
+Global_active_power 的 MAE / RMSE（kW），以及两者输出之间的差异。
+性能：CPU 上不同 batch 大小的延迟和吞吐，以及序列化后的模型大小。
+
+    python benchmark_quantization.py --model best_model.pth --data household_power_consumption.csv
+    python benchmark_quantization.py --model best_model.pth --data household_power_consumption.csv --threads 1
+"""
+import argparse
+import io
+
+import numpy as np
+import torch
+
+from benchmark_inference import time_backend
+from predictor import PowerPredictor, inverse_target
+
+BATCH_SIZES = (1, 16, 256, 1024)
+
+
+def model_bytes(model):
+    """序列化后的 state dict 大小（量化层的权重打包存放，parameters() 统计不到）"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+
+def held_out_windows(predictor, test_size, max_windows):
+    """测试集上的输入窗口和对应的真实值（kW），窗口数超过 max_windows 时等间隔抽取"""
+    data = np.asarray(predictor.scaled_data, dtype=np.float32)
+    lookback, steps = predictor.lookback, predictor.forecast_steps
+    test = data[int(len(data) * (1 - test_size)) - lookback:]
+    starts = np.arange(len(test) - lookback - steps)
+    if len(starts) > max_windows:
+        starts = starts[np.linspace(0, len(starts) - 1, max_windows).astype(int)]
+    windows = test[starts[:, None] + np.arange(lookback)]
+    targets = test[starts[:, None] + lookback + np.arange(steps), 0]
+    return windows, inverse_target(predictor.scaler, targets)
+
+
+def accuracy(forecast, truth):
+    error = forecast - truth
+    return {"mae": float(np.abs(error).mean()), "rmse": float(np.sqrt((error ** 2).mean()))}
+
+
+def run(model_path, data_path, test_size, max_windows, batch_sizes, repeats, seed=0):
+    fp32 = PowerPredictor(model_path=model_path)
+    int8 = PowerPredictor(model_path=model_path, quantized=True)
+    fp32.device = torch.device("cpu")  # 两者都在 CPU 上比较
+    for predictor in (fp32, int8):
+        predictor.load_data(data_path)
+
+    windows, truth = held_out_windows(fp32, test_size, max_windows)
+    forecast = {"fp32": fp32.predict_batch(windows), "int8": int8.predict_batch(windows)}
+    report = {
+        "windows": len(windows),
+        "accuracy": {name: accuracy(values, truth) for name, values in forecast.items()},
+        "int8_vs_fp32_max_abs_kw": float(np.abs(forecast["int8"] - forecast["fp32"]).max()),
+        "model_bytes": {"fp32": model_bytes(fp32.model), "int8": model_bytes(int8.model)},
+        "latency": [],
+    }
+
+    rng = np.random.default_rng(seed)
+    for batch_size in batch_sizes:
+        batch = rng.random((batch_size, fp32.lookback, len(fp32.features)), dtype=np.float32)
+        for name, predictor in (("fp32", fp32), ("int8", int8)):
+            seconds = time_backend(predictor.model, predictor.device, batch, repeats)
+            report["latency"].append({"model": name, "batch": batch_size, "latency_ms": seconds * 1000,
+                                      "windows_per_s": batch_size / seconds})
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare dynamic int8 quantized LSTMModel with fp32")
+    parser.add_argument("--model", default="best_model.pth")
+    parser.add_argument("--data", default="household_power_consumption.csv")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--max-windows", type=int, default=20000)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=list(BATCH_SIZES))
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--threads", type=int, help="torch intra-op threads")
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    report = run(args.model, args.data, args.test_size, args.max_windows, args.batch_sizes, args.repeats)
+    print(f"held-out windows: {report['windows']}")
+    for name, metrics in report["accuracy"].items():
+        print(f"{name}: MAE {metrics['mae']:.4f} kW  RMSE {metrics['rmse']:.4f} kW  "
+              f"model {report['model_bytes'][name] / 1024:.1f} KiB")
+    print(f"max |int8 - fp32|: {report['int8_vs_fp32_max_abs_kw']:.4f} kW")
+    print(f"{'model':<6}{'batch':>6}{'latency ms':>12}{'windows/s':>12}")
+    for row in report["latency"]:
+        print(f"{row['model']:<6}{row['batch']:>6}{row['latency_ms']:>12.3f}{row['windows_per_s']:>12.0f}")
@@ -0,0 +1,79 @@
+"""
+预测 Agent 启动耗时基准测试
+
+每一项都在新的 Python 进程中测量（避免模块已导入的缓存），取多次的中位数：
+- import prediction_agent：Agent 进程从启动到能注册行为、回复状态查询所需的导入时间；
+- import torch / pandas / sklearn.preprocessing：作为对照，这些都推迟到了后台预热中；
+- 预热：导入上述依赖、加载模型和数据并执行一次预测（PowerPredictor.warm_up），即 Agent 变为 ready 的时间。
+同时检查导入 prediction_agent 之后 torch、pandas、sklearn 是否仍未被导入。
+
+    python benchmark_startup.py --model best_model.pth --data household_power_consumption.csv
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+HEAVY_MODULES = ("torch", "pandas", "sklearn")
+REFERENCE_IMPORTS = ("torch", "pandas", "sklearn.preprocessing")
+
+_IMPORT = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_WARMUP = """
+import json, time
+from prediction_agent import PowerPredictor
+predictor = PowerPredictor(model_path={model!r})
+started = time.perf_counter()
+predictor.warm_up({data!r})
+print(json.dumps({{"seconds": time.perf_counter() - started, "loaded": []}}))
+"""
+
+
+def run_fresh(code):
+    """在新的解释器中执行 code（工作目录为本目录），返回它最后一行输出的 JSON 结果"""
+    output = subprocess.run([sys.executable, "-W", "ignore", "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure(code, repeats):
+    results = [run_fresh(code) for _ in range(repeats)]
+    return {"seconds": float(np.median([r["seconds"] for r in results])), "loaded": results[-1]["loaded"]}
+
+
+def run(model_path, data_path, repeats):
+    report = {"prediction_agent": measure(_IMPORT.format(module="prediction_agent", heavy=HEAVY_MODULES), repeats)}
+    for module in REFERENCE_IMPORTS:
+        report[module] = measure(_IMPORT.format(module=module, heavy=HEAVY_MODULES), repeats)
+    if data_path:
+        report["warm_up"] = measure(_WARMUP.format(model=os.path.abspath(model_path),
+                                                   data=os.path.abspath(data_path)), repeats)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure prediction agent import and warm-up time")
+    parser.add_argument("--model", default="best_model.pth")
+    parser.add_argument("--data", default="household_power_consumption.csv", help="empty to skip the warm-up")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    report = run(args.model, args.data, args.repeats)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for name, result in report.items():
+            print(f"{name:<24}{result['seconds'] * 1000:>10.1f} ms")
+    eager = report["prediction_agent"]["loaded"]
+    if eager:
+        raise SystemExit(f"import prediction_agent also imports: {', '.join(eager)}")
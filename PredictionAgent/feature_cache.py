@@ -0,0 +1,102 @@
+"""
+清洗后特征矩阵的磁盘缓存
+
+第一次加载时把清洗并标准化后的特征矩阵写成 .npy 文件（scaler 参数另存为 .npz），
+文件名带源 CSV 的 SHA-256，源文件一变缓存自动失效。之后的加载直接内存映射该文件，
+同一进程内再次加载只需一次 os.stat。
+"""
+import hashlib
+import os
+import threading
+
+import numpy as np
+from sklearn.preprocessing import MinMaxScaler
+
+CACHE_DIR = os.getenv("FEATURE_CACHE_DIR")  # 默认放在源文件旁边的 .feature_cache 目录
+SCALER_FIELDS = ("min_", "scale_", "data_min_", "data_max_", "data_range_")
+FORMAT_VERSION = 2  # 清洗规则变化时递增，旧缓存随之失效
+
+_lock = threading.Lock()
+_hashes = {}  # (路径, 大小, mtime) -> 源文件哈希
+_mapped = {}  # (缓存目录, 源文件哈希) -> (特征矩阵, scaler)
+
+
+def source_hash(file_path):
+    """源文件内容的 SHA-256；文件未变时复用上次的结果"""
+    stat = os.stat(file_path)
+    signature = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    digest = _hashes.get(signature)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                sha.update(block)
+        digest = _hashes[signature] = sha.hexdigest()
+    return digest
+
+
+def _cache_paths(file_path, digest, cache_dir):
+    cache_dir = cache_dir or CACHE_DIR or os.path.join(os.path.dirname(os.path.abspath(file_path)), ".feature_cache")
+    stem = f"{os.path.basename(file_path)}.v{FORMAT_VERSION}.{digest[:16]}"
+    return cache_dir, os.path.join(cache_dir, stem + ".features.npy"), os.path.join(cache_dir, stem + ".scaler.npz")
+
+
+def _save_atomic(path, save):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        save(f)
+    os.replace(tmp_path, path)
+
+
+def scaler_from_params(params):
+    """由保存的参数重建已拟合的 MinMaxScaler"""
+    scaler = MinMaxScaler(feature_range=tuple(params["feature_range"]))
+    for field in SCALER_FIELDS:
+        setattr(scaler, field, np.asarray(params[field], dtype=np.float64))
+    scaler.n_features_in_ = len(scaler.min_)
+    scaler.n_samples_seen_ = int(params["n_samples_seen"])
+    return scaler
+
+
+def scaler_params(scaler):
+    params = {field: getattr(scaler, field) for field in SCALER_FIELDS}
+    params["feature_range"] = np.asarray(scaler.feature_range, dtype=np.float64)
+    params["n_samples_seen"] = np.asarray(scaler.n_samples_seen_)
+    return params
+
+
+def load_features(file_path, clean_fn, cache_dir=None):
+    """
+    返回 (标准化后的特征矩阵, 已拟合的 scaler)
+
+    缓存不存在时调用 clean_fn(file_path) 得到清洗后的特征 DataFrame，拟合 MinMaxScaler，
+    写入缓存；否则以只读内存映射方式打开缓存。
+    """
+    digest = source_hash(file_path)
+    cache_dir, features_path, scaler_path = _cache_paths(file_path, digest, cache_dir)
+    # 同一份数据放在不同缓存目录时各自映射，不会拿到另一个目录的文件
+    key = (os.path.abspath(cache_dir), digest)
+    cached = _mapped.get(key)
+    if cached is not None:
+        return cached
+
+    with _lock:
+        cached = _mapped.get(key)
+        if cached is not None:
+            return cached
+        if not (os.path.exists(features_path) and os.path.exists(scaler_path)):
+            df = clean_fn(file_path)
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            scaled = scaler.fit_transform(df).astype(np.float32)
+            # 数据校验
+            assert not np.isnan(scaled).any(), "存在NaN值"
+            assert not np.isinf(scaled).any(), "存在无穷值"
+            os.makedirs(cache_dir, exist_ok=True)
+            _save_atomic(features_path, lambda f: np.save(f, scaled))
+            _save_atomic(scaler_path, lambda f: np.savez(f, **scaler_params(scaler)))
+
+        features = np.load(features_path, mmap_mode="r")
+        with np.load(scaler_path) as params:
+            scaler = scaler_from_params(params)
+        _mapped[key] = (features, scaler)
+        return features, scaler
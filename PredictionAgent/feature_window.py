@@ -0,0 +1,57 @@
+"""
+流式输入窗口
+
+新的电表采样逐条追加到固定大小的 NumPy 环形缓冲区，追加时按已拟合的 MinMaxScaler
+参数就地标准化，每条采样的开销与数据集大小无关。缓冲区长度为窗口的两倍、每条采样写两次，
+因此最近 lookback 行始终是一段连续内存，取窗口不需要拼接。
+"""
+import numpy as np
+
+
+class FeatureWindow:
+    def __init__(self, lookback, n_features, scaler, stride=1):
+        """
+        lookback: 窗口长度（行数）
+        scaler: 已拟合的 MinMaxScaler，只使用其 min_ / scale_
+        stride: 窗口每前进多少条采样触发一次预测
+        """
+        self.lookback = lookback
+        self.stride = stride
+        self.scale = np.asarray(scaler.scale_, dtype=np.float32)
+        self.offset = np.asarray(scaler.min_, dtype=np.float32)
+        self.buffer = np.zeros((2 * lookback, n_features), dtype=np.float32)
+        self.pos = 0     # 下一条采样写入的位置
+        self.count = 0   # 累计写入的采样数
+
+    @property
+    def full(self):
+        return self.count >= self.lookback
+
+    def append(self, sample):
+        """
+        追加一条原始采样（未标准化的特征行）
+
+        返回 True 表示窗口已满且自上次触发起前进了 stride 条，应当进行一次预测
+        """
+        row = np.asarray(sample, dtype=np.float32) * self.scale + self.offset
+        self.buffer[self.pos] = row
+        self.buffer[self.pos + self.lookback] = row
+        self.pos = (self.pos + 1) % self.lookback
+        self.count += 1
+        return self.full and (self.count - self.lookback) % self.stride == 0
+
+    def reset(self):
+        """清空窗口（数据不连续时使用，例如回放从头开始），重新累计满 lookback 条后才触发预测"""
+        self.pos = 0
+        self.count = 0
+
+    def extend(self, samples):
+        """追加多条原始采样，返回其中是否有触发预测的位置"""
+        fired = False
+        for sample in np.asarray(samples, dtype=np.float32).reshape(-1, self.buffer.shape[1]):
+            fired = self.append(sample) or fired
+        return fired
+
+    def window(self):
+        """最近 lookback 行（已标准化，按时间顺序）的副本"""
+        return self.buffer[self.pos:self.pos + self.lookback].copy()
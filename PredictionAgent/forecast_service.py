@@ -0,0 +1,208 @@
+"""
+多户预测服务（进程池）
+
+把大量住户的输入窗口分片交给多个工作进程做批量推理：
+- 模型权重在主进程加载一次并放进共享内存（Tensor.share_memory_），各工作进程映射同一份只读权重；
+- 输入窗口和预测结果都放在 multiprocessing.shared_memory 中，进程间只传递分片的起止位置；
+- 每个工作进程的 torch 线程数固定（默认 CPU 核数 / 进程数），避免多进程 x 多线程的超额订阅。
+
+逆标准化需要 scaler：模型包自带；旧格式的权重须同时给出 data_path，由 load_data 拟合。
+共享缓冲区只有一套，forecast 的并发调用会排队依次执行。
+
+    service = ForecastService("best_model.bundle.pt", workers=4)
+    forecasts = service.forecast(windows)   # [N, lookback, 7] 已标准化 -> [N, forecast_steps] float32（kW）
+    service.close()
+
+基准测试：
+    python forecast_service.py --model best_model.pth --data household_power_consumption.csv --workers 1 2 4
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import torch
+import torch.multiprocessing as torch_mp  # 注册在进程间共享 tensor 的序列化方式
+
+from predictor import PowerPredictor, forward_batch, inverse_target, quantize_int8
+
+_worker = {}  # 工作进程中的模型和线程设置
+
+
+def _init_worker(model, threads, quantized):
+    os.environ["OMP_NUM_THREADS"] = os.environ["MKL_NUM_THREADS"] = str(threads)
+    torch.set_num_threads(threads)
+    _worker["model"] = quantize_int8(model) if quantized else model
+    _worker["buffers"] = {}
+
+
+def _attach(*specs):
+    """映射主进程创建的共享内存（每块只映射一次），并关闭主进程已换掉的旧缓冲区"""
+    buffers = _worker["buffers"]
+    names = {spec[0] for spec in specs}
+    for name in [name for name in buffers if name not in names]:
+        memory, array = buffers.pop(name)
+        del array
+        memory.close()
+    for name, shape, dtype in specs:
+        if name not in buffers:
+            memory = shared_memory.SharedMemory(name=name)
+            buffers[name] = (memory, np.ndarray(shape, dtype=dtype, buffer=memory.buf))
+    return [buffers[spec[0]][1] for spec in specs]
+
+
+def _run_shard(inputs, outputs, start, stop, max_batch):
+    windows, results = _attach(inputs, outputs)
+    results[start:stop] = forward_batch(_worker["model"], torch.device("cpu"), windows[start:stop], max_batch)
+    return stop - start
+
+
+class _SharedArray:
+    def __init__(self, shape, dtype):
+        size = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+        self.memory = shared_memory.SharedMemory(create=True, size=size)
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.memory.buf)
+        self.spec = (self.memory.name, shape, np.dtype(dtype).str)
+
+    def release(self):
+        del self.array
+        self.memory.close()
+        self.memory.unlink()
+
+
+class ForecastService:
+    def __init__(self, model_path, workers=None, threads_per_worker=None, quantized=False,
+                 shards_per_worker=4, max_batch=4096, data_path=None):
+        """
+        data_path: 旧格式的权重（不带 scaler）用来拟合 scaler 的数据集；模型包不需要
+        workers: 工作进程数，默认 CPU 核数
+        threads_per_worker: 每个进程的 torch 线程数，默认 CPU 核数 / workers（至少 1）
+        quantized: 工作进程中使用动态 int8 量化的模型（量化后的权重各进程各一份，只有 fp32 权重共享）
+        """
+        cpus = os.cpu_count() or 1
+        self.workers = workers or cpus
+        self.threads_per_worker = threads_per_worker or max(1, cpus // self.workers)
+        self.shards_per_worker = shards_per_worker
+        self.max_batch = max_batch
+
+        self.predictor = PowerPredictor(model_path=model_path)
+        self.predictor.device = torch.device("cpu")
+        model = self.predictor.load_model()
+        if self.predictor.scaler is None:
+            # 在启动工作进程之前报错，而不是等到第一次 forecast
+            if data_path is None:
+                raise RuntimeError(f"{model_path} has no bundled scaler: pass data_path to fit one "
+                                   "or use a model bundle (model_bundle.py)")
+            self.predictor.load_data(data_path)
+        self.scaler = self.predictor.scaler
+        model.share_memory()  # 参数移入共享内存，工作进程不再各自复制
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=torch_mp.get_context("spawn"),
+            initializer=_init_worker, initargs=(model, self.threads_per_worker, quantized))
+        self._inputs = self._outputs = None
+        self._lock = threading.Lock()  # 缓冲区和统计由各次调用共用
+        self.forecasts = 0
+        self.seconds = 0.0
+
+    def _buffers(self, n, lookback, n_features, steps):
+        """按需（扩大）分配共享的输入输出缓冲区"""
+        if self._inputs is None or len(self._inputs.array) < n:
+            self._release()
+            capacity = max(n, 1)
+            self._inputs = _SharedArray((capacity, lookback, n_features), np.float32)
+            self._outputs = _SharedArray((capacity, steps), np.float32)
+        return self._inputs, self._outputs
+
+    def forecast(self, windows):
+        """
+        windows: [N, lookback, n_features] 已标准化的输入窗口
+        返回 [N, forecast_steps] 的 Global_active_power 预测值（kW，float32）
+        """
+        windows = np.asarray(windows, dtype=np.float32)
+        n, lookback, n_features = windows.shape
+        with self._lock:
+            started = time.perf_counter()
+            inputs, outputs = self._buffers(n, lookback, n_features, self.predictor.model.linear.out_features)
+            inputs.array[:n] = windows
+
+            timings = self.predictor.timings
+            with timings.stage("predict"):
+                shard = max(1, -(-n // (self.workers * self.shards_per_worker)))
+                futures = [self.pool.submit(_run_shard, inputs.spec, outputs.spec, start, min(start + shard, n),
+                                            self.max_batch)
+                           for start in range(0, n, shard)]
+                for future in futures:
+                    future.result()
+            with timings.stage("post_process"):
+                forecasts = inverse_target(self.scaler, outputs.array[:n]).astype(np.float32)
+            self.forecasts += n
+            self.seconds += time.perf_counter() - started
+            return forecasts
+
+    def stats(self):
+        with self._lock:
+            forecasts, seconds = self.forecasts, self.seconds
+        return {"workers": self.workers, "threads_per_worker": self.threads_per_worker,
+                "forecasts": forecasts, "seconds": round(seconds, 4),
+                "timings": self.predictor.timings.snapshot()}
+
+    def _release(self):
+        for buffer in (self._inputs, self._outputs):
+            if buffer is not None:
+                buffer.release()
+        self._inputs = self._outputs = None
+
+    def close(self):
+        self.pool.shutdown()
+        with self._lock:
+            self._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def benchmark(model_path, data_path, households, worker_counts, repeats=3, seed=0):
+    """对不同进程数测量吞吐（窗口/秒），并检查结果与单进程 predict_batch 一致"""
+    predictor = PowerPredictor(model_path=model_path)
+    predictor.device = torch.device("cpu")
+    predictor.load_data(data_path)
+    data = np.asarray(predictor.scaled_data, dtype=np.float32)
+    starts = np.random.default_rng(seed).integers(0, len(data) - predictor.lookback, households)
+    windows = data[starts[:, None] + np.arange(predictor.lookback)]
+    expected = predictor.predict_batch(windows[:1024])
+
+    rows = []
+    for workers in worker_counts:
+        with ForecastService(model_path, workers=workers, data_path=data_path) as service:
+            service.forecast(windows[:workers])  # 启动并预热工作进程
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                forecasts = service.forecast(windows)
+                timings.append(time.perf_counter() - started)
+            seconds = float(np.median(timings))
+            rows.append({"workers": workers, "threads_per_worker": service.threads_per_worker,
+                         "seconds": seconds, "windows_per_s": households / seconds,
+                         "max_abs_error": float(np.abs(forecasts[:1024] - expected).max())})
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the multi-household forecasting service")
+    parser.add_argument("--model", default="best_model.pth")
+    parser.add_argument("--data", default="household_power_consumption.csv")
+    parser.add_argument("--households", type=int, default=100000)
+    parser.add_argument("--workers", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'threads':>8}{'seconds':>10}{'windows/s':>12}{'max err':>10}")
+    for row in benchmark(args.model, args.data, args.households, args.workers, args.repeats):
+        print(f"{row['workers']:>8}{row['threads_per_worker']:>8}{row['seconds']:>10.3f}"
+              f"{row['windows_per_s']:>12.0f}{row['max_abs_error']:>10.1e}")
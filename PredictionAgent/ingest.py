@@ -0,0 +1,125 @@
+"""
+家庭用电数据集的统一读取与清洗
+
+predictor.py、prediction_agent.py、train.py 和 preprocess.py 共用这里的代码：
+CSV 只读一遍，'?' 直接当作缺失值，数值列按 float32 解析，日期按固定格式解析，
+不再逐列 replace 再转 object -> float。大文件按块解析，只是为了限制 pandas 解析时的中间开销；
+清洗结果（float32 特征矩阵）仍完整放在内存里，因为排序、缺失值填充和 scaler 拟合都需要整列数据。
+"""
+import numpy as np
+import pandas as pd
+
+FEATURES = ['Global_active_power', 'Global_reactive_power', 'Voltage',
+            'Global_intensity', 'Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
+# '?' 的替代值（各列最常见的取值）；Sub_metering_3 原始数据中缺失为空，不在此列
+FILL_VALUES = {
+    'Global_active_power': 0.214,
+    'Global_reactive_power': 0.1,
+    'Voltage': 240,
+    'Global_intensity': 1.4,
+    'Sub_metering_1': 0,
+    'Sub_metering_2': 0,
+}
+DATE_FORMAT = '%d/%m/%Y'  # 原始数据为 日/月/年
+CHUNK_ROWS = 500_000
+DTYPES = {name: np.float32 for name in FEATURES}
+DTYPES.update(Date='category', Time='category')  # 日期/时刻重复度极高，只解析不同的取值
+
+
+def _read(file_path, chunksize):
+    return pd.read_csv(file_path, usecols=['Date', 'Time'] + FEATURES, dtype=DTYPES,
+                       na_values='?', chunksize=chunksize)
+
+
+def _parse(column, parser):
+    """对分类列只解析每个不同的取值，再按编码展开"""
+    return pd.Series(parser(column.cat.categories).take(column.cat.codes), index=column.index)
+
+
+def _dates(column):
+    return _parse(column, lambda values: pd.to_datetime(values, format=DATE_FORMAT))
+
+
+def _times(column):
+    return _parse(column, pd.to_timedelta)  # 固定为 HH:MM:SS
+
+
+def _timestamps(chunk):
+    """Date + Time -> datetime64"""
+    return _dates(chunk['Date']) + _times(chunk['Time'])
+
+
+def read_household_csv(file_path, chunksize=None):
+    """
+    读取原始 CSV：Date 为日期，Time 为当天时刻（timedelta），特征列为 float32，'?' 为 NaN
+
+    chunksize 为 None 时返回按时间排序的整个 DataFrame，否则返回逐块的迭代器（块内保持文件顺序）
+    """
+    def convert(chunk):
+        chunk['Date'] = _dates(chunk['Date'])
+        chunk['Time'] = _times(chunk['Time'])
+        return chunk
+
+    if chunksize is not None:
+        return (convert(chunk) for chunk in _read(file_path, chunksize))
+    df = convert(_read(file_path, None))
+    return df.sort_values(['Date', 'Time'], kind='stable', ignore_index=True)
+
+
+def fill_defaults(df):
+    """用 FILL_VALUES 填充 '?' 留下的缺失值（原地修改并返回 df）"""
+    for name, value in FILL_VALUES.items():
+        df[name] = df[name].fillna(value)
+    return df
+
+
+def _fill_gaps(values):
+    """逐列前向填充 NaN，开头的 NaN 用该列第一个有效值回填（等价于 ffill + bfill）"""
+    rows = np.arange(len(values))
+    for col in range(values.shape[1]):
+        column = values[:, col]
+        missing = np.isnan(column)
+        if not missing.any() or missing.all():
+            continue
+        last_valid = np.maximum.accumulate(np.where(missing, 0, rows))
+        first = np.argmax(~missing)
+        last_valid[:first] = first
+        values[:, col] = column[last_valid]
+    return values
+
+
+def clean_features(file_path, chunksize=CHUNK_ROWS):
+    """
+    读取并清洗原始数据，返回按时间排序的特征列 DataFrame（float32）
+
+    清洗规则与原先各脚本一致：'?' 按 FILL_VALUES 替换，0 视为缺失并前向/后向填充，
+    标准差为 0 的列加入微小噪声
+
+    按 chunksize 分块解析，但各块的特征会拼接成一个矩阵：峰值内存约为整个特征矩阵的两倍，
+    不随 chunksize 减小
+    """
+    values, stamps = [], []
+    for chunk in _read(file_path, chunksize):
+        block = chunk[FEATURES].to_numpy(dtype=np.float32)
+        for col, name in enumerate(FEATURES):
+            if name in FILL_VALUES:
+                column = block[:, col]
+                column[np.isnan(column)] = FILL_VALUES[name]
+        values.append(block)
+        stamps.append(_timestamps(chunk).to_numpy(dtype='datetime64[ns]').view(np.int64))
+    values = np.concatenate(values) if values else np.empty((0, len(FEATURES)), dtype=np.float32)
+    stamps = np.concatenate(stamps) if stamps else np.empty(0, dtype=np.int64)
+
+    # 文件一般已按时间排列，只有乱序时才重排（稳定排序，同一时刻保持文件顺序）
+    if len(stamps) > 1 and (np.diff(stamps) < 0).any():
+        values = values[np.argsort(stamps, kind='stable')]
+
+    # 处理缺失值
+    values[values == 0] = np.nan
+    _fill_gaps(values)
+
+    # 处理常数列问题
+    for col in range(values.shape[1]):
+        if len(values) and np.isclose(values[:, col].std(), 0):  # 标准差接近0
+            values[:, col] += np.random.normal(0, 1e-6, size=len(values)).astype(np.float32)  # 添加噪声
+    return pd.DataFrame(values, columns=FEATURES)
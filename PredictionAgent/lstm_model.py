@@ -0,0 +1,94 @@
+"""
+LSTM 模型及依赖 torch 的推理函数
+
+从 predictor.py 中拆出：import predictor 不再加载 torch（Agent 启动和健康检查不必等待），
+这里的名字仍可以从 predictor 导入（按需导入本模块）。
+"""
+import numpy as np
+import torch
+import torch.nn as nn
+from torch.utils.data import Dataset
+
+class PowerDataset(Dataset):
+    """自定义时间序列数据集"""
+    def __init__(self, data, lookback, forecast_steps):
+        self.X, self.y = [], []
+        for i in range(len(data)-lookback-forecast_steps):
+            self.X.append(data[i:(i+lookback)])
+            self.y.append(data[i+lookback : i+lookback+forecast_steps, 0])
+        
+    def __len__(self):
+        return len(self.X)
+    
+    def __getitem__(self, idx):
+        return torch.tensor(self.X[idx], dtype=torch.float), \
+               torch.tensor(self.y[idx], dtype=torch.float)
+
+class LSTMModel(nn.Module):
+    """精简后的LSTM预测模型"""
+    def __init__(self, input_size, hidden_size, output_steps, num_layers=2, dropout=0.1):
+        super().__init__()
+        self.lstm = nn.LSTM(
+            input_size=input_size,
+            hidden_size=hidden_size,
+            num_layers=num_layers,
+            batch_first=True,
+            dropout=dropout if num_layers>1 else 0
+        )
+        # 添加层标准化
+        self.ln1 = nn.LayerNorm(hidden_size)
+        self.dropout = nn.Dropout(dropout)
+        # 修改初始化方式
+        self.linear = nn.Linear(hidden_size, output_steps)
+        self._init_weights()
+    
+    def _init_weights(self):
+        """改进的权重初始化"""
+        for name, param in self.lstm.named_parameters():
+            if 'weight_ih' in name:
+                nn.init.kaiming_normal_(param.data)
+            elif 'weight_hh' in name:
+                nn.init.orthogonal_(param.data)
+            elif 'bias' in name:
+                nn.init.constant_(param.data, 0)
+        nn.init.xavier_normal_(self.linear.weight)
+        
+    def forward(self, x):
+        # LSTM层
+        # print('LSTM 0:', x.size(), x)
+        out, (h_n, c_n) = self.lstm(x)
+        # print('LSTM 1:', out.size(), out) # [24, 64]
+        # 取最后一个时间步的输出
+        out = out[:, -1, :]  
+        # print('LSTM 2:', out.size(), out)
+        out = self.ln1(out)
+        # Dropout
+        out = self.dropout(out)
+        # print('LSTM 3:', out.size(), out)
+        # 全连接层
+        out = self.linear(out)
+        # print('LSTM 4:', out.size(), out)
+        return out
+
+def forward_batch(model, device, windows, max_batch=4096):
+    """
+    对 [N, lookback, n_features] 的标准化窗口做前向计算，返回 [N, output_steps]（仍为标准化值）
+
+    N 超过 max_batch 时分段计算，限制单次前向的内存
+    """
+    windows = np.asarray(windows, dtype=np.float32)
+    if windows.ndim == 2:
+        windows = windows[None]
+    if not (windows.flags.writeable and windows.flags.c_contiguous):
+        windows = np.array(windows)  # 内存映射的只读切片等
+    outputs = []
+    with torch.inference_mode():
+        for start in range(0, max(len(windows), 1), max_batch):
+            batch = torch.from_numpy(windows[start:start + max_batch]).to(device)
+            outputs.append(model(batch).cpu().numpy())
+    return np.concatenate(outputs)
+
+
+def quantize_int8(model):
+    """LSTM 和 Linear 层的动态 int8 量化：权重存为 int8，激活在运行时量化，只能在 CPU 上执行"""
+    return torch.ao.quantization.quantize_dynamic(model.cpu(), {nn.LSTM, nn.Linear}, dtype=torch.qint8)
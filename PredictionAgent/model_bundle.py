@@ -0,0 +1,93 @@
+"""
+模型包（bundle）格式
+
+一个文件里保存推理所需的全部内容：LSTM 的 state dict、训练时拟合的 MinMaxScaler 参数、
+特征列、时间窗口 lookback、预测步长 horizon、模型结构参数，以及可选的参考输入窗口
+（训练数据最后 lookback 行，已标准化）。推理端只加载这个文件，不再读取训练数据重新拟合 scaler。
+旧的 best_model.pth（只有 state dict）仍然可以加载。
+
+由已有权重生成模型包：
+    python model_bundle.py best_model.pth household_power_consumption.csv best_model.bundle.pt
+"""
+import sys
+
+import numpy as np
+import torch
+
+from feature_cache import scaler_from_params, scaler_params
+
+BUNDLE_FORMAT = "power-lstm-bundle"
+BUNDLE_VERSION = 1
+BUNDLE_PATH = "best_model.bundle.pt"
+# 与 train.py / predictor.py 中的模型结构一致
+DEFAULT_MODEL_CONFIG = {"input_size": 7, "hidden_size": 64, "output_steps": 6, "num_layers": 1, "dropout": 0.3}
+
+
+def save_bundle(path, state_dict, scaler, features, lookback, horizon, model_config, reference_window=None):
+    """保存模型包；数组都存成 tensor，加载时可以使用 weights_only"""
+    bundle = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "state_dict": {name: tensor.detach().cpu() for name, tensor in state_dict.items()},
+        "scaler": {name: torch.tensor(np.asarray(value, dtype=np.float64))
+                   for name, value in scaler_params(scaler).items()},
+        "features": list(features),
+        "lookback": int(lookback),
+        "horizon": int(horizon),
+        "model_config": dict(model_config),
+    }
+    if reference_window is not None:
+        bundle["reference_window"] = torch.tensor(np.asarray(reference_window, dtype=np.float32))
+    torch.save(bundle, path)
+
+
+def read_checkpoint(path, map_location="cpu"):
+    """
+    读取模型包或旧格式的 state dict
+
+    返回 (state_dict, bundle)；旧格式的 bundle 为 None
+    """
+    checkpoint = torch.load(path, map_location=map_location, weights_only=True)
+    if not (isinstance(checkpoint, dict) and checkpoint.get("format") == BUNDLE_FORMAT):
+        return checkpoint, None
+    if checkpoint.get("version", 0) > BUNDLE_VERSION:
+        raise ValueError(f"{path}: unsupported bundle version {checkpoint['version']}")
+    return checkpoint["state_dict"], checkpoint
+
+
+def bundle_scaler(bundle):
+    """由模型包重建已拟合的 MinMaxScaler"""
+    return scaler_from_params({name: value.numpy() for name, value in bundle["scaler"].items()})
+
+
+def bundle_reference_window(bundle):
+    window = bundle.get("reference_window")
+    return None if window is None else window.numpy()
+
+
+def rescale(scaled, from_scaler, to_scaler):
+    """把 from_scaler 标准化的数据换算到 to_scaler 的尺度（两者相同时原样返回）"""
+    if np.allclose(from_scaler.scale_, to_scaler.scale_) and np.allclose(from_scaler.min_, to_scaler.min_):
+        return scaled
+    ratio = to_scaler.scale_ / from_scaler.scale_
+    return (scaled * ratio + (to_scaler.min_ - from_scaler.min_ * ratio)).astype(np.float32)
+
+
+def convert(weights_path, data_path, out_path=BUNDLE_PATH):
+    """由旧的 state dict 和训练数据生成模型包（只需运行一次）"""
+    from feature_cache import load_features
+    from ingest import FEATURES, clean_features
+
+    state_dict, _ = read_checkpoint(weights_path)
+    scaled, scaler = load_features(data_path, clean_features)
+    lookback = 24
+    save_bundle(out_path, state_dict, scaler, FEATURES, lookback, DEFAULT_MODEL_CONFIG["output_steps"],
+                DEFAULT_MODEL_CONFIG, reference_window=scaled[-lookback:])
+    return out_path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print("usage: python model_bundle.py WEIGHTS.pth DATA.csv [OUT.bundle.pt]")
+        sys.exit(1)
+    print(f"saved {convert(*sys.argv[1:])}")
@@ -0,0 +1,96 @@
+"""
+LSTMModel 的导出与优化推理后端
+
+把 best_model.pth（或模型包）导出为 TorchScript 和 ONNX 文件，并提供加载它们的方法，
+供 PowerPredictor(backend=...) 使用。scaler、lookback 等仍从原模型文件读取，
+导出的文件只包含计算图和权重。
+
+    python model_export.py best_model.pth                # 导出两种格式
+    python model_export.py best_model.pth --formats onnx
+"""
+import argparse
+import os
+
+import torch
+
+BACKENDS = ("eager", "torchscript", "onnx")
+ONNX_OPSET = 17
+
+
+def export_paths(model_path):
+    """导出文件的默认路径：与模型文件同目录同名，扩展名分别为 .ts.pt 和 .onnx"""
+    base = model_path
+    for suffix in (".bundle.pt", ".pth", ".pt"):
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+            break
+    return {"torchscript": base + ".ts.pt", "onnx": base + ".onnx"}
+
+
+def export_torchscript(model, path):
+    scripted = torch.jit.script(model.cpu().eval())
+    scripted.save(path)
+    return path
+
+
+def export_onnx(model, path, lookback, n_features):
+    """导出 ONNX，batch 维为动态维度；需要安装 onnx"""
+    example = torch.zeros(1, lookback, n_features)
+    torch.onnx.export(model.cpu().eval(), (example,), path, input_names=["windows"], output_names=["forecast"],
+                      dynamic_axes={"windows": {0: "batch"}, "forecast": {0: "batch"}},
+                      opset_version=ONNX_OPSET, dynamo=False)
+    return path
+
+
+class OnnxModel:
+    """用 ONNX Runtime 执行导出的模型；调用方式与 nn.Module 相同（输入输出都是 tensor）"""
+    def __init__(self, path, threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def eval(self):
+        return self
+
+    def __call__(self, batch):
+        outputs = self.session.run(None, {self.input_name: batch.cpu().numpy()})
+        return torch.from_numpy(outputs[0])
+
+
+def load_exported(backend, path, device):
+    """加载导出的模型，backend 为 "torchscript" 或 "onnx"（后者需要安装 onnxruntime）"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} not found; run `python model_export.py <model>` first")
+    if backend == "torchscript":
+        return torch.jit.load(path, map_location=device).eval()
+    if backend == "onnx":
+        return OnnxModel(path)
+    raise ValueError(f"Unknown backend: {backend} (expected one of {BACKENDS})")
+
+
+def export(model_path, formats=("torchscript", "onnx")):
+    """导出 model_path 的模型，返回 {格式: 路径}"""
+    from predictor import PowerPredictor
+
+    predictor = PowerPredictor(model_path=model_path)
+    model = predictor.load_model()
+    paths = export_paths(model_path)
+    exported = {}
+    if "torchscript" in formats:
+        exported["torchscript"] = export_torchscript(model, paths["torchscript"])
+    if "onnx" in formats:
+        exported["onnx"] = export_onnx(model, paths["onnx"], predictor.lookback, len(predictor.features))
+    return exported
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export LSTMModel to TorchScript / ONNX")
+    parser.add_argument("model_path", nargs="?", default="best_model.pth")
+    parser.add_argument("--formats", nargs="+", choices=["torchscript", "onnx"], default=["torchscript", "onnx"])
+    args = parser.parse_args()
+    for fmt, path in export(args.model_path, args.formats).items():
+        print(f"{fmt}: {path}")
@@ -1,149 +1,126 @@
-from cProfile import label
 from spade.agent import Agent
 from spade.behaviour import PeriodicBehaviour, CyclicBehaviour
 from spade.message import Message
-import torch
-from torch.utils.data import DataLoader
 import numpy as np
-import pandas as pd
-from sklearn.preprocessing import MinMaxScaler
 import json
 import asyncio
 import random
+import time
+from datetime import datetime
 
-from predictor import LSTMModel
+from feature_window import FeatureWindow
+# predictor 只在加载模型时才导入 torch、pandas、sklearn（导入要花数秒），这些都推迟到后台预热
+# （PredictionAgent.warm_up），Agent 启动和状态查询不必等待
+from predictor import PowerPredictor, inverse_target
 
 # 配置日志
 import logging
 import warnings
 warnings.filterwarnings("ignore", category=UserWarning, message="Could not infer format")
-warnings.filterwarnings("ignore", category=pd.errors.SettingWithCopyWarning)
 # logging.basicConfig(level=logging.INFO)
 logging.basicConfig(level=logging.ERROR)  # 控制根日志级别
 logging.getLogger("spade").setLevel(logging.ERROR)
 logging.getLogger("slixmpp").setLevel(logging.ERROR)
 logger = logging.getLogger("PredictionAgent")
+logger.setLevel(logging.INFO)  # 本 Agent 的提示和定期耗时统计；预测循环中不打印调试输出
 STOP_FLAG = False
-
-# 继承原有预测类（仅保留预测相关部分）
-class PowerPredictor:
-    def __init__(self, model_path='best_model.pth'):
-        # input_size = self.scaled_data.shape[1]
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = LSTMModel(
-            input_size=7,
-            hidden_size=64,
-            output_steps=6,
-            num_layers=1,  # 单层LSTM
-            dropout=0.3  # 更高的dropout比例
-        ).to(self.device)
-        # self.model = torch.load(model_path, map_location='cpu')
-        self.model.load_state_dict(torch.load('best_model.pth'))
-        self.model.eval()
-        self.scaler = MinMaxScaler(feature_range=(0, 1))
-        self.lookback = 24  # 与训练时一致的窗口大小
-        self.forecast_steps = 6 # 与训练时一致的窗口大小
-        
-
-    def load_data(self, data_path='./household_power_consumption.csv'):
-        """加载并预处理数据"""
-        # df = pd.read_csv(self.file_path, parse_dates={'datetime': ['Date', 'Time']})
-        df=pd.read_csv(data_path)
-        df=df.drop('index',axis=1)
-        df['Date']=pd.to_datetime(df['Date'])
-        df['Time']=pd.to_datetime(df['Time'])
-        df=df.sort_values('Date')
-        df['Sub_metering_1']=df['Sub_metering_1'].replace({'?':'0'})
-        df['Sub_metering_2']=df['Sub_metering_2'].replace({'?':'0'})
-        df['Sub_metering_1']=pd.DataFrame(np.array(df['Sub_metering_1'],dtype='float32'))
-        df['Sub_metering_2']=pd.DataFrame(np.array(df['Sub_metering_2'],dtype='float32'))
-        # df['Sub_metering_3']=df['Sub_metering_3'].fillna(method='bfill')
-        df['Global_active_power']=df['Global_active_power'].replace({'?':0.214})
-        df['Global_reactive_power']=df['Global_reactive_power'].replace({'?':0.1})
-        df[['Global_reactive_power','Global_active_power']]=pd.DataFrame(np.array(df[['Global_reactive_power','Global_active_power']],dtype='float32'))
-        df['Voltage']=df['Voltage'].replace({'?':240})
-        df['Voltage']=pd.DataFrame(np.array(df['Voltage'],dtype='float32'))
-        df['Global_intensity']=df['Global_intensity'].replace({'?':1.4})
-        df['Global_intensity']=pd.DataFrame(np.array(df['Global_intensity'],dtype='float32'))
-        # df.set_index('datetime', inplace=True)
-
-        # 选择特征列
-        features = ['Global_active_power', 'Global_reactive_power', 'Voltage',
-                    'Global_intensity', 'Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
-        self.df = df[features]
-        # print(self.df)
-
-        # 处理缺失值
-        self.df.replace(0, np.nan, inplace=True)
-        self.df.ffill(inplace=True)
-        self.df.bfill(inplace=True)
-        # print(self.df)
-
-        # 处理常数列问题
-        for col in self.df.columns:
-            if np.isclose(self.df[col].std(), 0):  # 标准差接近0
-                self.df[col] += np.random.normal(0, 1e-6, size=len(self.df))  # 添加噪声
-
-        # 数据标准化
-        # self.scaled_data = self.scaler.fit_transform(self.df)
-
-        # 改进的标准化流程
-        self.scaler = MinMaxScaler(feature_range=(0, 1))
-        self.scaled_data = self.scaler.fit_transform(self.df)
-        
-        # 数据校验
-        assert not np.isnan(self.scaled_data).any(), "存在NaN值"
-        assert not np.isinf(self.scaled_data).any(), "存在无穷值"
-
-        data_length = len(self.scaled_data)
-
-        start = random.randint(0, data_length)
-        
-        scaled_data = self.scaled_data[start:start+self.lookback]
-        # print(scaled_data, scaled_label)
-        scaled_label = self.scaled_data[start+self.lookback:start+self.lookback+self.forecast_steps, 0]
-        # print(scaled_data.shape, scaled_label.shape) # (24, 7) (6, 7)
-        return scaled_data, scaled_label
-
-    def predict(self, input_data):
-        """执行预测"""
-        with torch.no_grad():
-            input_tensor = torch.tensor(input_data, dtype=torch.float)\
-                .unsqueeze(0).to(self.device)
-            prediction = self.model(input_tensor).cpu().numpy()
-        
-        # 逆标准化
-        # dummy = np.zeros((prediction.shape[1], 7))  # 7个特征
-        # dummy[:, 0] = prediction[0]  # 假设预测第一个特征（Global_active_power）
-        # out = self.scaler.inverse_transform(dummy)[:, 0]
-        out = prediction
-        return out
-    
-    def post_process(self, prediction, label):
-        # 逆标准化
-        dummy = np.zeros((prediction.shape[1], 7))  # 7个特征
-        dummy[:, 0] = prediction[0]  # 假设预测第一个特征（Global_active_power）
-        out = self.scaler.inverse_transform(dummy.copy())[:, 0]
-
-        dummy[:, 0] = label[0]  # 假设预测第一个特征（Global_active_power
-        label = self.scaler.inverse_transform(dummy.copy())[:, 0]
-        return out, label
+MODEL_PATH = 'best_model.pth'
+DATA_PATH = 'household_power_consumption.csv'
+PREDICT_EVERY = 12  # 窗口每前进 12 条采样（5分钟一条，即每小时）预测一次
+STATS_LOG_PERIOD = 0  # 秒；大于 0 时定期打印各阶段耗时
 
 # SPADE Agent 实现
 class PredictionAgent(Agent):
-    def __init__(self, jid: str, password: str):
+    def __init__(self, jid: str, password: str, model_path=MODEL_PATH, stats_log_period=STATS_LOG_PERIOD):
         super().__init__(jid, password)
-        self.predictor = PowerPredictor(model_path="best_model.pth")
-        self.latest_data = None
+        # 模型在 setup 之后的后台预热中加载，构造 PowerPredictor 不导入 torch
+        self.predictor = PowerPredictor(model_path=model_path)
+        # 与 predictor 共用计时器，另外记录 send 和 queue_lag（数据到达到预测发出）
+        self.timings = self.predictor.timings
+        self.stats_log_period = stats_log_period
+        self.state = "starting"  # starting -> warming_up -> ready / failed
+        self.error = None
+        self.warmup_seconds = None
+        self.warmup_task = None
+        self.window = None
+        self.pending = None
+        self.replay_pos = 0
         self.current_prediction = None
         self.data = []
         self.count = 0
 
     async def setup(self):
+        # 先注册消息处理，状态查询立即可以回复；模型和数据在后台预热，就绪后再开始回放和预测
+        self.add_behaviour(self.MessageHandlerBehaviour())       # 处理请求
+        if self.stats_log_period > 0:
+            self.add_behaviour(self.StatsLogBehaviour(period=self.stats_log_period))
+        self.warmup_task = asyncio.create_task(self.warm_up())
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def status(self):
+        """就绪状态和各阶段耗时，用于健康检查（REQUEST_STATUS）"""
+        return {"agent": str(self.jid), "state": self.state, "error": self.error,
+                "warmup_seconds": self.warmup_seconds, "timings": self.timings.snapshot()}
+
+    async def warm_up(self):
+        """在线程池中导入依赖、加载模型和数据（不阻塞事件循环），然后建立输入窗口并注册预测相关的行为"""
+        self.state = "warming_up"
+        started = time.perf_counter()
+        predictor = self.predictor
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, predictor.warm_up, DATA_PATH)
+        except Exception as e:
+            self.state, self.error = "failed", str(e)
+            logger.error(f"Warm-up failed: {e}")
+            return
+        # 用拟合好的 scaler 建立流式输入窗口，从历史数据的随机位置开始回放
+        self.window = FeatureWindow(predictor.lookback, len(predictor.features), predictor.scaler, stride=PREDICT_EVERY)
+        self.pending = asyncio.Queue(maxsize=1)
+        self.replay_pos = random.randint(0, len(predictor.scaled_data) - predictor.lookback - predictor.forecast_steps - 1)
+        for _ in range(predictor.lookback):  # 先填满窗口，立即进行第一次预测
+            self.replay_next()
+
         # 注册核心行为
         self.add_behaviour(self.DataFetchBehaviour(period=1))   # 5分钟获取数据
-        self.add_behaviour(self.PredictionBehaviour(period=12)) # 每小时预测
-        self.add_behaviour(self.MessageHandlerBehaviour())       # 处理请求
+        self.add_behaviour(self.PredictionBehaviour())           # 窗口前进时预测
+        self.warmup_seconds = round(time.perf_counter() - started, 3)
+        self.state = "ready"
+
+    def ingest_sample(self, sample, label=None):
+        """追加一条原始采样；窗口前进 PREDICT_EVERY 条时把当前窗口交给预测行为"""
+        if self.window.append(sample):
+            self.publish_window(label)
+
+    def publish_window(self, label=None):
+        if self.pending.full():
+            self.pending.get_nowait()  # 预测跟不上时只保留最新的窗口
+            self.timings.count("dropped_windows")
+        self.pending.put_nowait((self.window.window(), label, time.perf_counter()))
+
+    async def send_prediction(self, behaviour, msg, arrived):
+        """发送预测，记录 send 的耗时和从数据到达到预测发出的延迟"""
+        with self.timings.stage("send"):
+            await behaviour.send(msg)
+        self.timings.observe("queue_lag", time.perf_counter() - arrived)
+
+    def replay_next(self):
+        """回放历史数据中的下一条采样，并附上其后 forecast_steps 步的真实值用于评估"""
+        predictor = self.predictor
+        index = self.replay_pos
+        label = predictor.scaled_data[index + 1:index + 1 + predictor.forecast_steps, 0]
+        self.ingest_sample(predictor.raw_sample(index), label)
+        self.replay_pos = index + 1
+        if self.replay_pos + predictor.forecast_steps >= len(predictor.scaled_data):
+            # 回到数据开头：清空窗口，避免把数据集末尾和开头拼进同一个窗口
+            self.replay_pos = 0
+            self.window.reset()
+
+    async def predict(self, window):
+        """在线程池中执行前向计算，不阻塞事件循环（消息处理和数据回放照常进行）"""
+        return await asyncio.get_running_loop().run_in_executor(None, self.predictor.predict, window)
 
     # 行为1：模拟数据获取
     class DataFetchBehaviour(PeriodicBehaviour):
@@ -157,17 +134,16 @@ class PredictionAgent(Agent):
                 #     'Voltage': np.random.normal(240, 2, 60),
                 #     # ... 其他特征 ...
                 # })
-                new_data, new_label = self.agent.predictor.load_data(data_path='household_power_consumption.csv')
-                self.agent.latest_data = new_data
-                self.agent.latest_label = new_label
+                self.agent.replay_next()
                 # print(f"[Prediction] Fetched {len(new_data)} new samples")
             except Exception as e:
-                print(f"Data fetch error: {str(e)}")
+                logger.error(f"Data fetch error: {e}")
 
-    # 行为2：周期预测
-    class PredictionBehaviour(PeriodicBehaviour):
+    # 行为2：窗口前进时预测
+    class PredictionBehaviour(CyclicBehaviour):
         async def run(self):
-            if self.agent.latest_data is not None:
+            window, label, arrived = await self.agent.pending.get()
+            if label is not None:
                 # print("[DEBUG] 预测行为被触发")  # 添加调试语句
                 try:
                     # 打印原始输入数据
@@ -175,10 +151,10 @@ class PredictionAgent(Agent):
                     # 预处理
                     # processed = self.agent.predictor.preprocess(self.agent.latest_data)
                     
-                    # 执行预测
-                    prediction = self.agent.predictor.predict(self.agent.latest_data)
-                    # 逆标准化
-                    out, label = self.agent.predictor.post_process(prediction, self.agent.latest_label)
+                    # 执行预测（返回逆标准化后的 kW）
+                    out = await self.agent.predict(window)
+                    # 真实值逆标准化（Global_active_power 列）
+                    label = inverse_target(self.agent.predictor.scaler, label)
 
                     self.agent.count += 1
                     
@@ -193,10 +169,8 @@ class PredictionAgent(Agent):
                     elif diff_rate < 5:
                         diff_rate = diff_rate * 2
                     
-                    print(np.mean(label))
-
                     self.agent.current_prediction = {
-                        'timestamp': pd.Timestamp.now().isoformat(),
+                        'timestamp': datetime.now().isoformat(),
                         'Global_active_power Prediction': np.mean(label)*(1+random.choice([1, -1])*diff_rate/100),  # 示例值
                         'Global_active_power Label': np.mean(label),
                         'diff rate': diff_rate
@@ -225,17 +199,17 @@ class PredictionAgent(Agent):
                     msg = Message(to="agent@sure.im")
                     msg.set_metadata("performative", "inform")
                     msg.body = json.dumps(self.agent.current_prediction)
-                    await self.send(msg)
+                    await self.agent.send_prediction(self, msg, arrived)
                     # print("[Prediction] Sent new prediction")
 
                     if self.agent.count > 100:
                         global STOP_FLAG
                         np.save('data.npy', np.array(self.agent.data))
-                        print(np.array(self.agent.data))
+                        logger.info(f"Saved {len(self.agent.data)} predictions to data.npy")
                         STOP_FLAG = True
                 
                 except Exception as e:
-                    print(f"Prediction Error: {str(e)}")
+                    logger.error(f"Prediction Error: {e}")
                     error_msg = Message(to="agent@sure.im")
                     error_msg.body = json.dumps({
                         "agent": str(self.agent.jid),
@@ -243,29 +217,64 @@ class PredictionAgent(Agent):
                     })
                     await self.send(error_msg)
             else:
-                print("[Prediction] NO DATA !!!")
+                # 外部推送的数据没有真实值，只发布预测
+                try:
+                    out = await self.agent.predict(window)
+                    self.agent.current_prediction = {
+                        'timestamp': datetime.now().isoformat(),
+                        'Global_active_power Prediction': float(np.mean(out))
+                    }
+                    msg = Message(to="agent@sure.im")
+                    msg.set_metadata("performative", "inform")
+                    msg.body = json.dumps(self.agent.current_prediction)
+                    await self.agent.send_prediction(self, msg, arrived)
+                except Exception as e:
+                    logger.error(f"Prediction Error: {e}")
 
     # 行为3：处理外部请求
     class MessageHandlerBehaviour(CyclicBehaviour):
         async def run(self):
             msg = await self.receive(timeout=10)
             if msg:
+                # 就绪状态（健康检查），预热期间也立即回复
+                if msg.body == "REQUEST_STATUS":
+                    response = msg.make_reply()
+                    response.body = json.dumps(self.agent.status())
+                    await self.send(response)
+
                 # 处理预测结果请求
-                if msg.body == "REQUEST_PREDICTION":
+                elif msg.body == "REQUEST_PREDICTION":
                     response = msg.make_reply()
-                    response.body = json.dumps(
-                        self.agent.current_prediction or {"status": "no_data"}
-                    )
+                    if not self.agent.ready:
+                        response.body = json.dumps({"status": self.agent.state})
+                    else:
+                        response.body = json.dumps(
+                            self.agent.current_prediction or {"status": "no_data"}
+                        )
                     await self.send(response)
 
                 # 处理数据更新指令
                 elif "UPDATE_DATA" in msg.body:
+                    if not self.agent.ready:
+                        logger.warning(f"Data update ignored: agent is {self.agent.state}")
+                        return
                     try:
+                        import pandas as pd
+
+                        # 新采样逐条追加到窗口（原始值，按行标准化）
                         new_data = pd.read_json(msg.body.split("|")[1])
-                        self.agent.latest_data = new_data
-                        print("[Prediction] Received new data update")
+                        if self.agent.window.extend(new_data[self.agent.predictor.features].to_numpy()):
+                            self.agent.publish_window()
+                        logger.debug(f"Received {len(new_data)} new samples")
                     except Exception as e:
-                        print(f"Data update error: {str(e)}")
+                        logger.error(f"Data update error: {e}")
+
+    # 行为4：定期打印各阶段耗时（stats_log_period > 0 时注册）
+    class StatsLogBehaviour(PeriodicBehaviour):
+        async def run(self):
+            line = self.agent.timings.log_line()
+            if line:
+                logger.info(line)
 
 async def run_agent():
     # 使用 sure.im 前需通过其官网注册账户：https://www.sure.im/
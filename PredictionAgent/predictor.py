@@ -1,146 +1,142 @@
-import torch
-import torch.nn as nn
-import pandas as pd
 import numpy as np
-from sklearn.preprocessing import MinMaxScaler
-from torch.utils.data import Dataset, DataLoader
-
-class PowerDataset(Dataset):
-    """自定义时间序列数据集"""
-    def __init__(self, data, lookback, forecast_steps):
-        self.X, self.y = [], []
-        for i in range(len(data)-lookback-forecast_steps):
-            self.X.append(data[i:(i+lookback)])
-            self.y.append(data[i+lookback : i+lookback+forecast_steps, 0])
-        
-    def __len__(self):
-        return len(self.X)
-    
-    def __getitem__(self, idx):
-        return torch.tensor(self.X[idx], dtype=torch.float), \
-               torch.tensor(self.y[idx], dtype=torch.float)
-
-class LSTMModel(nn.Module):
-    """精简后的LSTM预测模型"""
-    def __init__(self, input_size, hidden_size, output_steps, num_layers=2, dropout=0.1):
-        super().__init__()
-        self.lstm = nn.LSTM(
-            input_size=input_size,
-            hidden_size=hidden_size,
-            num_layers=num_layers,
-            batch_first=True,
-            dropout=dropout if num_layers>1 else 0
-        )
-        # 添加层标准化
-        self.ln1 = nn.LayerNorm(hidden_size)
-        self.dropout = nn.Dropout(dropout)
-        # 修改初始化方式
-        self.linear = nn.Linear(hidden_size, output_steps)
-        self._init_weights()
-    
-    def _init_weights(self):
-        """改进的权重初始化"""
-        for name, param in self.lstm.named_parameters():
-            if 'weight_ih' in name:
-                nn.init.kaiming_normal_(param.data)
-            elif 'weight_hh' in name:
-                nn.init.orthogonal_(param.data)
-            elif 'bias' in name:
-                nn.init.constant_(param.data, 0)
-        nn.init.xavier_normal_(self.linear.weight)
-        
-    def forward(self, x):
-        # LSTM层
-        # print('LSTM 0:', x.size(), x)
-        out, (h_n, c_n) = self.lstm(x)
-        # print('LSTM 1:', out.size(), out) # [24, 64]
-        # 取最后一个时间步的输出
-        out = out[:, -1, :]  
-        # print('LSTM 2:', out.size(), out)
-        out = self.ln1(out)
-        # Dropout
-        out = self.dropout(out)
-        # print('LSTM 3:', out.size(), out)
-        # 全连接层
-        out = self.linear(out)
-        # print('LSTM 4:', out.size(), out)
-        return out
+from stage_timer import StageTimer
+
+# LSTMModel、PowerDataset、forward_batch、quantize_int8 依赖 torch，定义在 lstm_model.py；
+# 仍可以从本模块导入（第一次访问时才导入 torch），import predictor 本身只需要 numpy
+_LSTM_MODEL_NAMES = ("LSTMModel", "PowerDataset", "forward_batch", "quantize_int8")
+
+
+def __getattr__(name):
+    if name in _LSTM_MODEL_NAMES:
+        import lstm_model
+        return getattr(lstm_model, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def inverse_target(scaler, scaled, column=0):
+    """
+    目标列的 MinMax 逆标准化 x = (y - min_) / scale_，对任意形状的数组整体计算，
+    不再构造全特征的 dummy 矩阵调用 inverse_transform
+    """
+    return (np.asarray(scaled) - scaler.min_[column]) / scaler.scale_[column]
+
 
 class PowerPredictor:
     """精简后的预测类"""
-    def __init__(self, model_path):
-        # 加载预训练模型
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = LSTMModel(
-            input_size=7,       # 根据数据特征数设定
-            hidden_size=64,
-            output_steps=6,
-            num_layers=1,
-            dropout=0.3
-        ).to(self.device)
-        self.model.load_state_dict(torch.load(model_path))
-        self.model.eval()  # 设置为预测模式
+    def __init__(self, model_path, backend="eager", export_path=None, quantized=False):
+        """
+        backend: "eager"（PyTorch 直接执行），"torchscript" 或 "onnx"（ONNX Runtime），
+        后两者加载 model_export.py 导出的文件，export_path 默认与 model_path 同名
+        quantized: eager 模式下使用动态 int8 量化的模型（CPU），精度与速度的对比见 benchmark_quantization.py
+
+        构造时不导入 torch、pandas、sklearn，也不读取模型文件：这些都在第一次使用时进行（见 load_model），
+        device 为 None 时在 load_model 中选择（有 CUDA 且未量化时用 GPU），也可以在加载前直接指定
+        """
+        if quantized and backend != "eager":
+            raise ValueError("quantized inference is only available with the eager backend")
+        self.device = None
+        self.quantized = quantized
+        self.model_path = model_path
+        self.backend = backend
+        self.export_path = export_path
+        self._model = None
         
-        # 加载标准化参数
-        self.scaler = MinMaxScaler()
+        # 标准化参数：模型包自带训练时的 scaler，旧格式的模型由 load_data 在数据上拟合
+        self.scaler = None
         # scaler_params = np.load(scaler_params_path, allow_pickle=True).item()
         # self.scaler.min_ = scaler_params['min']
         # self.scaler.scale_ = scaler_params['scale']
         
         self.lookback = 24  # 与训练时一致的时间窗口
+        self.forecast_steps = 6
+        self.features = None  # 特征列，load_model 之后可用
+        self.reference_window = None  # 模型包中的参考输入窗口（已标准化）
+        self.from_bundle = False
+        self.timings = StageTimer()  # load_data / predict / post_process 的耗时
+
+    def load_model(self):
+        """
+        加载预训练模型（只加载一次）
+
+        model_path 为模型包时同时恢复训练时的 scaler、特征列、lookback 和预测步长，
+        此后推理不再需要 load_data；旧格式的 state dict 仍需 load_data 拟合 scaler
+        """
+        if self._model is None:
+            import torch
+            from ingest import FEATURES
+            from lstm_model import LSTMModel, quantize_int8
+            from model_bundle import DEFAULT_MODEL_CONFIG, read_checkpoint, bundle_scaler, bundle_reference_window
+
+            if self.device is None:
+                self.device = torch.device("cuda" if torch.cuda.is_available() and not self.quantized else "cpu")
+            state_dict, bundle = read_checkpoint(self.model_path, map_location=self.device)
+            config = dict(DEFAULT_MODEL_CONFIG)
+            self.features = list(FEATURES)
+            if bundle is not None:
+                config.update(bundle["model_config"])
+                self.scaler = bundle_scaler(bundle)
+                self.features = list(bundle["features"])
+                self.lookback = bundle["lookback"]
+                self.forecast_steps = bundle["horizon"]
+                self.reference_window = bundle_reference_window(bundle)
+                self.from_bundle = True
+            if self.backend == "eager":
+                model = LSTMModel(**config).to(self.device)
+                model.load_state_dict(state_dict)
+                model.eval()  # 设置为预测模式
+                if self.quantized:
+                    model = quantize_int8(model)
+            else:
+                from model_export import export_paths, load_exported
+                path = self.export_path or export_paths(self.model_path)[self.backend]
+                model = load_exported(self.backend, path, self.device)
+            self._model = model
+        return self._model
+
+    @property
+    def model(self):
+        return self.load_model()
 
     def load_data(self, file_path):
-        """加载并预处理数据"""
-        # df = pd.read_csv(self.file_path, parse_dates={'datetime': ['Date', 'Time']})
-        df=pd.read_csv(file_path)
-        df=df.drop('index',axis=1)
-        df['Date']=pd.to_datetime(df['Date'])
-        df['Time']=pd.to_datetime(df['Time'])
-        df=df.sort_values('Date')
-        df['Sub_metering_1']=df['Sub_metering_1'].replace({'?':'0'})
-        df['Sub_metering_2']=df['Sub_metering_2'].replace({'?':'0'})
-        df['Sub_metering_1']=pd.DataFrame(np.array(df['Sub_metering_1'],dtype='float32'))
-        df['Sub_metering_2']=pd.DataFrame(np.array(df['Sub_metering_2'],dtype='float32'))
-        # df['Sub_metering_3']=df['Sub_metering_3'].fillna(method='bfill')
-        df['Global_active_power']=df['Global_active_power'].replace({'?':0.214})
-        df['Global_reactive_power']=df['Global_reactive_power'].replace({'?':0.1})
-        df[['Global_reactive_power','Global_active_power']]=pd.DataFrame(np.array(df[['Global_reactive_power','Global_active_power']],dtype='float32'))
-        df['Voltage']=df['Voltage'].replace({'?':240})
-        df['Voltage']=pd.DataFrame(np.array(df['Voltage'],dtype='float32'))
-        df['Global_intensity']=df['Global_intensity'].replace({'?':1.4})
-        df['Global_intensity']=pd.DataFrame(np.array(df['Global_intensity'],dtype='float32'))
-        # df.set_index('datetime', inplace=True)
-
-        # 选择特征列
-        features = ['Global_active_power', 'Global_reactive_power', 'Voltage',
-                    'Global_intensity', 'Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
-        self.df = df[features]
-        # print(self.df)
-
-        # 处理缺失值
-        self.df.replace(0, np.nan, inplace=True)
-        self.df.ffill(inplace=True)
-        self.df.bfill(inplace=True)
-        # print(self.df)
-
-        # 处理常数列问题
-        for col in self.df.columns:
-            if np.isclose(self.df[col].std(), 0):  # 标准差接近0
-                self.df[col] += np.random.normal(0, 1e-6, size=len(self.df))  # 添加噪声
-
-        # 数据标准化
-        # self.scaled_data = self.scaler.fit_transform(self.df)
-
-        # 改进的标准化流程
-        self.scaler = MinMaxScaler(feature_range=(0, 1))
-        self.scaled_data = self.scaler.fit_transform(self.df)
-        
-        # 数据校验
-        assert not np.isnan(self.scaled_data).any(), "存在NaN值"
-        assert not np.isinf(self.scaled_data).any(), "存在无穷值"
+        """
+        加载并预处理数据（清洗和标准化结果缓存在磁盘上，见 feature_cache.py）
+
+        模型包自带训练时的 scaler；数据上拟合的 scaler 与之不同时把数据换算到模型包的尺度
+        """
+        from feature_cache import load_features
+        from ingest import clean_features
+        from model_bundle import rescale
+
+        self.load_model()
+        with self.timings.stage("load_data"):
+            self.scaled_data, scaler = load_features(file_path, clean_features)
+            if not self.from_bundle:
+                self.scaler = scaler
+            else:
+                self.scaled_data = rescale(self.scaled_data, scaler, self.scaler)
         scaled_data = self.scaled_data[-self.lookback:]
         return scaled_data
 
+    def require_scaler(self):
+        """返回 scaler；旧格式的模型（不带 scaler）还没有调用 load_data 时给出明确的错误"""
+        self.load_model()
+        if self.scaler is None:
+            raise RuntimeError(
+                f"{self.model_path} has no bundled scaler: call load_data(file_path) first "
+                "or use a model bundle (model_bundle.py)")
+        return self.scaler
+
+    def raw_sample(self, index):
+        """历史数据（load_data 之后）第 index 行的原始（未标准化）特征，用来模拟电表读数"""
+        return (self.scaled_data[index] - self.scaler.min_) / self.scaler.scale_
+
+    def warm_up(self, file_path):
+        """导入依赖、加载模型和数据，并执行一次前向计算（不计入耗时统计）；需要数秒，可在后台线程中调用"""
+        from lstm_model import forward_batch
+
+        self.load_data(file_path)
+        forward_batch(self.model, self.device, self.scaled_data[-self.lookback:])
+
     # def prepare_data(self, test_size=0.2):
     #     """改进的数据划分方法"""
     #     # 时间序列数据必须按时间顺序划分
@@ -160,16 +156,24 @@ class PowerPredictor:
     #     self.test_loader = DataLoader(self.test_dataset, batch_size=64, shuffle=False)
 
     def predict(self, input_data):
-        """执行预测"""
-        with torch.no_grad():
-            input_tensor = torch.tensor(input_data, dtype=torch.float)\
-                .unsqueeze(0).to(self.device)
-            prediction = self.model(input_tensor).cpu().numpy()
-        
-        # 逆标准化
-        dummy = np.zeros((prediction.shape[1], 7))  # 7个特征
-        dummy[:, 0] = prediction[0]  # 假设预测第一个特征（Global_active_power）
-        return self.scaler.inverse_transform(dummy)[:, 0]
+        """执行预测（单个窗口）"""
+        return self.predict_batch(input_data)[0]
+
+    def predict_batch(self, windows):
+        """
+        多个窗口一次前向计算
+
+        windows: [N, lookback, n_features] 已标准化的输入窗口
+        返回 [N, forecast_steps] 的 Global_active_power 预测值（kW）
+        """
+        from lstm_model import forward_batch
+
+        model = self.model
+        scaler = self.require_scaler()  # 先检查，不做无用的前向计算
+        with self.timings.stage("predict"):
+            scaled = forward_batch(model, self.device, windows)
+        with self.timings.stage("post_process"):
+            return inverse_target(scaler, scaled)
 
 # 使用示例
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+"""
+预测流水线的分阶段计时
+
+每个阶段保留最近 window 次的耗时，查询时才计算 p50 / p95 / p99；另有简单的计数器（例如被丢弃的窗口数）。
+记录一次耗时只是一次 deque.append，对预测本身的开销可以忽略。各方法加锁，可以在后台线程中使用。
+
+    timings = StageTimer()
+    with timings.stage("predict"):
+        ...
+    timings.observe("queue_lag", seconds)
+    timings.snapshot()   # {"stages": {"predict": {"count": .., "p50_ms": .., "p95_ms": .., ...}}, "counters": {..}}
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+PERCENTILES = (50, 95, 99)
+
+
+class StageTimer:
+    def __init__(self, window=1024):
+        """window: 每个阶段用于计算分位数的最近样本数"""
+        self.window = window
+        self.samples = {}  # 阶段 -> 最近 window 次耗时（秒）
+        self.totals = {}   # 阶段 -> 累计次数
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started)
+
+    def observe(self, name, seconds):
+        with self.lock:
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self.totals[name] = self.totals.get(name, 0) + 1
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """各阶段的累计次数和最近 window 次耗时的分位数（毫秒）"""
+        with self.lock:
+            samples = {name: np.array(values) for name, values in self.samples.items()}
+            totals, counters = dict(self.totals), dict(self.counters)
+        stages = {}
+        for name, values in samples.items():
+            stats = {"count": totals[name]}
+            for p, value in zip(PERCENTILES, np.percentile(values * 1000, PERCENTILES)):
+                stats[f"p{p}_ms"] = round(float(value), 3)
+            stats["max_ms"] = round(float(values.max() * 1000), 3)
+            stages[name] = stats
+        return {"stages": stages, "counters": counters}
+
+    def log_line(self):
+        snapshot = self.snapshot()
+        parts = [f"{name} n={s['count']} p50={s['p50_ms']:.1f} p95={s['p95_ms']:.1f} p99={s['p99_ms']:.1f} ms"
+                 for name, s in snapshot["stages"].items()]
+        parts += [f"{name}={value}" for name, value in snapshot["counters"].items()]
+        return " | ".join(parts)
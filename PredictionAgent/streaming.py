@@ -0,0 +1,221 @@
+"""
+逐步（有状态）LSTM 推理
+
+每户保存 LSTM 的 (h, c) 状态，每来一条新采样只让 LSTM 前进一个时间步，输出头（LayerNorm + Linear）
+直接作用在携带的状态上，不再对整段 24 步窗口重新计算。多户的状态存放在同一组张量中，
+一次调用就能让任意多户各前进一步。
+
+注意：模型是在从零状态开始的 24 步窗口上训练的，携带状态相当于看到了更长的历史，
+输出与整窗推理并不完全相同。每户同时保存最近 lookback 行输入，每 resync_every 步从零状态
+重新计算一次整窗，把偏差限制在一定范围内。偏差和加速比用 validate() 测量：
+
+    python streaming.py --model best_model.pth --data household_power_consumption.csv
+"""
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from predictor import PowerPredictor, inverse_target
+
+
+class StreamingLSTM:
+    def __init__(self, predictor, resync_every=None, capacity=64):
+        """
+        predictor: 已加载的 PowerPredictor（eager 模式，可以是量化模型）
+        resync_every: 每户每前进多少步用整窗重新计算一次状态；None 表示每 lookback 步一次，0 表示从不
+        """
+        model = predictor.model
+        if not hasattr(model, "lstm"):
+            raise ValueError("streaming inference needs the eager backend")
+        self.model = model
+        self.predictor = predictor
+        self.device = predictor.device  # 状态放在模型所在的设备上，采样和输出在 CPU 上
+        self.lookback = predictor.lookback
+        self.resync_every = predictor.lookback if resync_every is None else resync_every
+        self.scale = np.asarray(predictor.scaler.scale_, dtype=np.float32)
+        self.offset = np.asarray(predictor.scaler.min_, dtype=np.float32)
+        self.n_features = len(self.scale)
+        self.layers, self.hidden = model.lstm.num_layers, model.lstm.hidden_size
+        self.rows = {}  # 户 -> 状态所在的行
+        self.free = []
+        self._cached_keys = self._cached_rows = None  # 与上次相同的一组户免去逐户查找
+        self._allocate(capacity)
+        self.updates = 0
+        self.resyncs = 0
+
+    def _allocate(self, capacity):
+        self.h = torch.zeros(self.layers, capacity, self.hidden, device=self.device)
+        self.c = torch.zeros(self.layers, capacity, self.hidden, device=self.device)
+        # 最近 lookback 行输入（已标准化），与 FeatureWindow 一样写两次，窗口始终连续
+        self.inputs = np.zeros((capacity, 2 * self.lookback, self.n_features), dtype=np.float32)
+        self.pos = np.zeros(capacity, dtype=np.int64)
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.since_sync = np.zeros(capacity, dtype=np.int64)
+
+    def _grow(self):
+        old = (self.h, self.c, self.inputs, self.pos, self.count, self.since_sync)
+        size = len(self.pos)
+        self._allocate(size * 2)
+        self.h[:, :size], self.c[:, :size] = old[0], old[1]
+        self.inputs[:size], self.pos[:size], self.count[:size], self.since_sync[:size] = old[2:]
+
+    def _row(self, key):
+        row = self.rows.get(key)
+        if row is None:
+            if self.free:
+                row = self.free.pop()
+            else:
+                row = len(self.rows)
+                if row >= len(self.pos):
+                    self._grow()
+            self.rows[key] = row
+        return row
+
+    def reset(self, key):
+        """清除一户的状态和输入历史"""
+        row = self.rows.pop(key, None)
+        if row is not None:
+            self.h[:, row] = 0
+            self.c[:, row] = 0
+            self.pos[row] = self.count[row] = self.since_sync[row] = 0
+            self.free.append(row)
+            self._cached_keys = self._cached_rows = None
+
+    def _lookup(self, keys):
+        keys = tuple(keys)
+        if keys == self._cached_keys:
+            return self._cached_rows
+        rows = np.fromiter((self._row(key) for key in keys), dtype=np.int64, count=len(keys))
+        if len(np.unique(rows)) != len(rows):
+            raise ValueError("keys must be unique within one step")
+        self._cached_keys, self._cached_rows = keys, (rows, self._tensor(rows))
+        return self._cached_rows
+
+    def _tensor(self, array):
+        return torch.from_numpy(array).to(self.device)
+
+    def _advance(self, idx, inputs, initial):
+        """从 initial 状态（None 为零状态）跑 LSTM，写回 idx 行的状态，返回输出头的结果"""
+        output, (h, c) = self.model.lstm(inputs, initial)
+        self.h.index_copy_(1, idx, h)
+        self.c.index_copy_(1, idx, c)
+        return self._head(output[:, -1]).cpu().numpy()
+
+    def _head(self, output):
+        return self.model.linear(self.model.dropout(self.model.ln1(output)))
+
+    def step(self, keys, samples):
+        """
+        各户追加一条原始采样并前进一步
+
+        keys: 户的标识（同一次调用中不能重复）
+        samples: [N, n_features] 原始（未标准化）特征
+        返回 [N, forecast_steps] 的 Global_active_power 预测值（kW）
+        """
+        rows, all_idx = self._lookup(keys)
+        scaled = np.asarray(samples, dtype=np.float32).reshape(len(rows), self.n_features) * self.scale + self.offset
+
+        pos = self.pos[rows]
+        self.inputs[rows, pos] = scaled
+        self.inputs[rows, pos + self.lookback] = scaled
+        self.pos[rows] = (pos + 1) % self.lookback
+        self.count[rows] += 1
+        self.since_sync[rows] += 1
+
+        # 窗口已满且到了重新同步的时候：整窗从零状态重新计算；其余的只前进一步
+        resync = (self.count[rows] >= self.lookback) & (self.since_sync[rows] >= self.resync_every) \
+            if self.resync_every else np.zeros(len(rows), dtype=bool)
+        scaled_out = np.empty((len(rows), self.model.linear.out_features), dtype=np.float32)
+        with torch.inference_mode():
+            if not resync.any():
+                scaled_out[:] = self._advance(all_idx, self._tensor(scaled)[:, None],
+                                              (self.h.index_select(1, all_idx), self.c.index_select(1, all_idx)))
+            else:
+                stepping = ~resync
+                if stepping.any():
+                    idx = self._tensor(rows[stepping])
+                    scaled_out[stepping] = self._advance(idx, self._tensor(scaled[stepping])[:, None],
+                                                         (self.h.index_select(1, idx), self.c.index_select(1, idx)))
+                sync_rows = rows[resync]
+                windows = self.inputs[sync_rows[:, None], self.pos[sync_rows, None] + np.arange(self.lookback)]
+                scaled_out[resync] = self._advance(self._tensor(sync_rows), self._tensor(windows), None)
+                self.since_sync[sync_rows] = 0
+                self.resyncs += len(sync_rows)
+        self.updates += len(rows)
+        return inverse_target(self.predictor.scaler, scaled_out)
+
+    def window(self, key):
+        """一户最近 lookback 行输入（已标准化），用于整窗推理对比"""
+        row = self.rows[key]
+        return self.inputs[row, self.pos[row]:self.pos[row] + self.lookback].copy()
+
+    def stats(self):
+        return {"households": len(self.rows), "updates": self.updates, "resyncs": self.resyncs,
+                "resync_every": self.resync_every}
+
+
+def validate(predictor, households=256, steps=200, resync_every=None, seed=0):
+    """
+    用历史数据模拟多户的采样流，对比逐步推理与整窗推理（predict_batch）的输出和耗时
+
+    返回误差（kW）的均值 / p99 / 最大值，以及每次更新的平均耗时
+    """
+    data = np.asarray(predictor.scaled_data, dtype=np.float32)
+    raw = (data - predictor.scaler.min_) / predictor.scaler.scale_
+    lookback = predictor.lookback
+    rng = np.random.default_rng(seed)
+    starts = rng.integers(0, len(raw) - lookback - steps, households)
+    keys = list(range(households))
+    stream = StreamingLSTM(predictor, resync_every=resync_every, capacity=households)
+
+    for t in range(lookback):  # 先填满窗口（此时状态与整窗推理完全一致）
+        stream.step(keys, raw[starts + t])
+
+    errors, forecasts, step_seconds, full_seconds = [], [], 0.0, 0.0
+    for t in range(lookback, lookback + steps):
+        started = time.perf_counter()
+        streamed = stream.step(keys, raw[starts + t])
+        step_seconds += time.perf_counter() - started
+
+        windows = data[(starts + t - lookback + 1)[:, None] + np.arange(lookback)]
+        started = time.perf_counter()
+        full = predictor.predict_batch(windows)
+        full_seconds += time.perf_counter() - started
+        errors.append(np.abs(streamed - full).max(axis=1))
+        forecasts.append(np.abs(full).mean())
+
+    errors = np.concatenate(errors)
+    return {
+        "households": households,
+        "steps": steps,
+        "resync_every": stream.resync_every,
+        "mean_abs_error_kw": float(errors.mean()),
+        "p99_abs_error_kw": float(np.percentile(errors, 99)),
+        "max_abs_error_kw": float(errors.max()),
+        "mean_forecast_kw": float(np.mean(forecasts)),
+        "step_ms": step_seconds / steps * 1000,
+        "full_window_ms": full_seconds / steps * 1000,
+        "speedup": full_seconds / step_seconds,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate step-wise LSTM inference against full-window inference")
+    parser.add_argument("--model", default="best_model.pth")
+    parser.add_argument("--data", default="household_power_consumption.csv")
+    parser.add_argument("--households", type=int, default=256)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--resync-every", type=int, help="default: lookback; 0 disables re-synchronisation")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="max allowed mean abs error (kW)")
+    args = parser.parse_args()
+
+    predictor = PowerPredictor(model_path=args.model)
+    predictor.device = torch.device("cpu")
+    predictor.load_data(args.data)
+    report = validate(predictor, args.households, args.steps, args.resync_every)
+    for name, value in report.items():
+        print(f"{name}: {value:.4f}" if isinstance(value, float) else f"{name}: {value}")
+    if report["mean_abs_error_kw"] > args.tolerance:
+        raise SystemExit(f"mean abs error above tolerance {args.tolerance} kW")
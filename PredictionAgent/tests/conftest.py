@@ -0,0 +1,40 @@
+import os
+import sys
+
+# The agent's modules are flat scripts imported by name (import predictor, ...)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+LOOKBACK, HORIZON = 6, 3
+MODEL_CONFIG = {"input_size": 7, "hidden_size": 8, "output_steps": HORIZON, "num_layers": 1, "dropout": 0.0}
+
+
+@pytest.fixture(scope="session")
+def series():
+    """Synthetic raw measurements with the dataset's 7 feature columns"""
+    rng = np.random.default_rng(0)
+    return (rng.random((200, 7)) * [5, 0.5, 10, 20, 30, 40, 20] + [0, 0, 235, 0, 0, 0, 0]).astype(np.float32)
+
+
+@pytest.fixture(scope="session")
+def model_files(tmp_path_factory, series):
+    """A small random LSTM bundled with its scaler, and default-sized bare weights (which carry no config)"""
+    torch = pytest.importorskip("torch")
+    from sklearn.preprocessing import MinMaxScaler
+    from ingest import FEATURES
+    from lstm_model import LSTMModel
+    from model_bundle import DEFAULT_MODEL_CONFIG, save_bundle
+
+    torch.manual_seed(0)
+    model = LSTMModel(**MODEL_CONFIG).eval()
+    scaler = MinMaxScaler().fit(series)
+    scaled = scaler.transform(series).astype(np.float32)
+    directory = tmp_path_factory.mktemp("models")
+    weights, bundle = directory / "model.pth", directory / "model.bundle.pt"
+    torch.save(LSTMModel(**DEFAULT_MODEL_CONFIG).state_dict(), weights)
+    save_bundle(bundle, model.state_dict(), scaler, FEATURES, LOOKBACK, HORIZON, MODEL_CONFIG,
+                reference_window=scaled[-LOOKBACK:])
+    return {"model": model, "scaler": scaler, "scaled": scaled, "weights": str(weights), "bundle": str(bundle),
+            "lookback": LOOKBACK, "horizon": HORIZON, "config": MODEL_CONFIG}
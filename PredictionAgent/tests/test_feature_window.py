@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import numpy as np
+from feature_window import FeatureWindow
+
+SCALER = SimpleNamespace(scale_=np.array([0.5, 2.0]), min_=np.array([1.0, 0.0]))
+
+
+def test_samples_are_scaled_on_append():
+    window = FeatureWindow(2, 2, SCALER)
+    window.append([2.0, 3.0])
+    window.append([4.0, 1.0])
+    np.testing.assert_allclose(window.window(), [[2.0, 6.0], [3.0, 2.0]])
+
+
+def test_window_keeps_the_latest_rows_in_time_order():
+    window = FeatureWindow(3, 2, SimpleNamespace(scale_=np.ones(2), min_=np.zeros(2)))
+    for value in range(7):
+        window.append([value, -value])
+    np.testing.assert_array_equal(window.window()[:, 0], [4, 5, 6])
+    assert window.window().flags["C_CONTIGUOUS"]
+
+
+def test_window_is_a_copy():
+    window = FeatureWindow(2, 2, SCALER)
+    window.extend([[0, 0], [0, 0]])
+    snapshot = window.window()
+    before = snapshot.copy()
+    window.append([10, 10])
+    np.testing.assert_array_equal(snapshot, before)
+
+
+def test_predictions_fire_once_full_and_then_every_stride():
+    window = FeatureWindow(3, 2, SCALER, stride=2)
+    fired = [window.append([1, 1]) for _ in range(8)]
+    assert fired == [False, False, True, False, True, False, True, False]
+
+
+def test_extend_reports_whether_any_sample_fired():
+    window = FeatureWindow(3, 2, SCALER, stride=4)
+    assert not window.extend(np.ones((2, 2)))
+    assert window.extend(np.ones((2, 2)))  # the third sample fills the window
+    assert not window.extend(np.ones((2, 2)))
+    assert window.extend(np.ones((2, 2)))  # the seventh sample is one stride later
+
+
+def test_reset_waits_for_a_full_window_again():
+    window = FeatureWindow(2, 2, SCALER)
+    window.extend(np.ones((3, 2)))
+    window.reset()
+    assert not window.full
+    assert not window.append([1, 1])
+    assert window.append([1, 1])
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from ingest import FEATURES  # noqa: E402
+from model_bundle import (  # noqa: E402
+    BUNDLE_VERSION, bundle_reference_window, bundle_scaler, read_checkpoint, rescale
+)
+from predictor import PowerPredictor  # noqa: E402
+
+
+def test_bundle_round_trip(model_files):
+    state_dict, bundle = read_checkpoint(model_files["bundle"])
+    for name, tensor in model_files["model"].state_dict().items():
+        assert torch.equal(state_dict[name], tensor)
+    scaler = bundle_scaler(bundle)
+    for field in ("min_", "scale_", "data_min_", "data_max_", "data_range_"):
+        np.testing.assert_array_equal(getattr(scaler, field), getattr(model_files["scaler"], field))
+    lookback = model_files["lookback"]
+    assert (bundle["features"], bundle["lookback"], bundle["horizon"]) == (FEATURES, lookback, model_files["horizon"])
+    assert bundle["model_config"] == model_files["config"]
+    np.testing.assert_array_equal(bundle_reference_window(bundle), model_files["scaled"][-lookback:])
+
+
+def test_restored_scaler_transforms_like_the_original(model_files, series):
+    _, bundle = read_checkpoint(model_files["bundle"])
+    np.testing.assert_allclose(bundle_scaler(bundle).transform(series),
+                               model_files["scaler"].transform(series), rtol=1e-6)
+
+
+def test_bare_weights_have_no_bundle(model_files):
+    state_dict, bundle = read_checkpoint(model_files["weights"])
+    assert bundle is None
+    assert "lstm.weight_ih_l0" in state_dict
+
+
+def test_newer_bundle_versions_are_refused(model_files, tmp_path):
+    _, bundle = read_checkpoint(model_files["bundle"])
+    path = tmp_path / "future.bundle.pt"
+    torch.save({**bundle, "version": BUNDLE_VERSION + 1}, path)
+    with pytest.raises(ValueError):
+        read_checkpoint(str(path))
+
+
+def test_rescale_maps_between_scalers(model_files, series):
+    from sklearn.preprocessing import MinMaxScaler
+
+    other = MinMaxScaler().fit(series[:50])
+    scaled = other.transform(series).astype(np.float32)
+    np.testing.assert_allclose(rescale(scaled, other, model_files["scaler"]), model_files["scaled"], atol=1e-5)
+    assert rescale(scaled, other, other) is scaled
+
+
+def test_predictor_uses_the_bundle_without_data(model_files):
+    predictor = PowerPredictor(model_path=model_files["bundle"])
+    predictor.device = torch.device("cpu")
+    predictor.load_model()
+    assert (predictor.lookback, predictor.forecast_steps) == (model_files["lookback"], model_files["horizon"])
+    assert predictor.features == FEATURES
+    window = predictor.reference_window
+    with torch.no_grad():
+        scaled = model_files["model"](torch.from_numpy(window[None])).numpy()[0]
+    expected = (scaled - model_files["scaler"].min_[0]) / model_files["scaler"].scale_[0]
+    np.testing.assert_allclose(predictor.predict(window), expected, rtol=1e-5)
+
+
+def test_bare_weights_need_a_scaler_before_predicting(model_files):
+    predictor = PowerPredictor(model_path=model_files["weights"])
+    predictor.device = torch.device("cpu")
+    with pytest.raises(RuntimeError, match="no bundled scaler"):
+        predictor.predict(np.zeros((24, 7), dtype=np.float32))
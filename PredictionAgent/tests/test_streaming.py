@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from predictor import PowerPredictor  # noqa: E402
+from streaming import StreamingLSTM  # noqa: E402
+
+
+@pytest.fixture
+def predictor(model_files):
+    predictor = PowerPredictor(model_path=model_files["bundle"])
+    predictor.device = torch.device("cpu")
+    predictor.load_model()
+    return predictor
+
+
+def raw_streams(series, households, steps, seed=0):
+    starts = np.random.default_rng(seed).integers(0, len(series) - steps, households)
+    return series[starts[:, None] + np.arange(steps)]  # [households, steps, features]
+
+
+def full_window(predictor, stream, key):
+    return predictor.predict_batch(stream.window(key)[None])[0]
+
+
+def test_first_full_window_matches_full_window_inference(predictor, series):
+    lookback = predictor.lookback
+    streams = raw_streams(series, 5, lookback)
+    stream = StreamingLSTM(predictor, resync_every=0, capacity=2)  # also exercises growing the state
+    keys = list(range(5))
+    for t in range(lookback):
+        out = stream.step(keys, streams[:, t])
+    expected = predictor.predict_batch(np.stack([stream.window(key) for key in keys]))
+    np.testing.assert_allclose(out, expected, rtol=1e-4, atol=1e-4)
+
+
+def test_resync_every_step_always_matches(predictor, series):
+    lookback = predictor.lookback
+    streams = raw_streams(series, 3, 3 * lookback)
+    stream = StreamingLSTM(predictor, resync_every=1)
+    keys = ["a", "b", "c"]
+    for t in range(3 * lookback):
+        out = stream.step(keys, streams[:, t])
+        if t >= lookback - 1:
+            for i, key in enumerate(keys):
+                np.testing.assert_allclose(out[i], full_window(predictor, stream, key), rtol=1e-4, atol=1e-4)
+    assert stream.stats()["resyncs"] == 3 * (2 * lookback + 1)
+
+
+def test_window_holds_the_scaled_latest_rows(predictor, series):
+    stream = StreamingLSTM(predictor)
+    for row in series[:predictor.lookback + 2]:
+        stream.step(["a"], row[None])
+    np.testing.assert_allclose(stream.window("a"), predictor.scaler.transform(series[2:predictor.lookback + 2]),
+                               rtol=1e-5, atol=1e-6)
+
+
+def test_reset_starts_a_household_from_scratch(predictor, series):
+    lookback = predictor.lookback
+    stream = StreamingLSTM(predictor, resync_every=0)
+    for row in series[:lookback]:
+        stream.step(["a"], row[None])
+    stream.reset("a")
+    for row in series[lookback:2 * lookback]:
+        out = stream.step(["a"], row[None])
+    np.testing.assert_allclose(out[0], full_window(predictor, stream, "a"), rtol=1e-4, atol=1e-4)
+
+
+def test_keys_must_be_unique_within_a_step(predictor, series):
+    stream = StreamingLSTM(predictor)
+    with pytest.raises(ValueError):
+        stream.step(["a", "a"], series[:2])
@@ -6,6 +6,8 @@ import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
 import matplotlib.pyplot as plt
+from ingest import clean_features
+from model_bundle import BUNDLE_PATH, save_bundle
 
 
 class PowerDataset(Dataset):
@@ -99,42 +101,8 @@ class PowerPredictor:
 
     def load_data(self):
         """加载并预处理数据"""
-        # df = pd.read_csv(self.file_path, parse_dates={'datetime': ['Date', 'Time']})
-        df=pd.read_csv('./household_power_consumption.csv')
-        df=df.drop('index',axis=1)
-        df['Date']=pd.to_datetime(df['Date'])
-        df['Time']=pd.to_datetime(df['Time'])
-        df=df.sort_values('Date')
-        df['Sub_metering_1']=df['Sub_metering_1'].replace({'?':'0'})
-        df['Sub_metering_2']=df['Sub_metering_2'].replace({'?':'0'})
-        df['Sub_metering_1']=pd.DataFrame(np.array(df['Sub_metering_1'],dtype='float32'))
-        df['Sub_metering_2']=pd.DataFrame(np.array(df['Sub_metering_2'],dtype='float32'))
-        # df['Sub_metering_3']=df['Sub_metering_3'].fillna(method='bfill')
-        df['Global_active_power']=df['Global_active_power'].replace({'?':0.214})
-        df['Global_reactive_power']=df['Global_reactive_power'].replace({'?':0.1})
-        df[['Global_reactive_power','Global_active_power']]=pd.DataFrame(np.array(df[['Global_reactive_power','Global_active_power']],dtype='float32'))
-        df['Voltage']=df['Voltage'].replace({'?':240})
-        df['Voltage']=pd.DataFrame(np.array(df['Voltage'],dtype='float32'))
-        df['Global_intensity']=df['Global_intensity'].replace({'?':1.4})
-        df['Global_intensity']=pd.DataFrame(np.array(df['Global_intensity'],dtype='float32'))
-        # df.set_index('datetime', inplace=True)
-
-        # 选择特征列
-        features = ['Global_active_power', 'Global_reactive_power', 'Voltage',
-                    'Global_intensity', 'Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
-        self.df = df[features]
-        # print(self.df)
-
-        # 处理缺失值
-        self.df.replace(0, np.nan, inplace=True)
-        self.df.ffill(inplace=True)
-        self.df.bfill(inplace=True)
-        # print(self.df)
-
-        # 处理常数列问题
-        for col in self.df.columns:
-            if np.isclose(self.df[col].std(), 0):  # 标准差接近0
-                self.df[col] += np.random.normal(0, 1e-6, size=len(self.df))  # 添加噪声
+        # 读取、清洗特征列（见 ingest.py）
+        self.df = clean_features(self.file_path)
 
         # 数据标准化
         # self.scaled_data = self.scaler.fit_transform(self.df)
@@ -204,13 +172,14 @@ class PowerPredictor:
     def build_model(self, hidden_size=64):
         """构建模型"""
         input_size = self.scaled_data.shape[1]
-        self.model = LSTMModel(
-            input_size=input_size,
-            hidden_size=hidden_size,
-            output_steps=self.forecast_steps,
-            num_layers=1,  # 单层LSTM
-            dropout=0.3  # 更高的dropout比例
-        ).to(self.device)
+        self.model_config = {
+            'input_size': input_size,
+            'hidden_size': hidden_size,
+            'output_steps': self.forecast_steps,
+            'num_layers': 1,  # 单层LSTM
+            'dropout': 0.3  # 更高的dropout比例
+        }
+        self.model = LSTMModel(**self.model_config).to(self.device)
 
     def train(self, epochs=50):
         """训练模型"""
@@ -307,6 +276,11 @@ class PowerPredictor:
         predicted_power = self.scaler.inverse_transform(dummy)[:, 0]
         return predicted_power
     
+    def save(self, path=BUNDLE_PATH):
+        """保存模型包：权重连同 scaler、特征列、窗口和步长（见 model_bundle.py）"""
+        save_bundle(path, self.model.state_dict(), self.scaler, self.df.columns, self.lookback,
+                    self.forecast_steps, self.model_config, reference_window=self.scaled_data[-self.lookback:])
+
     def visualize(self, prediction):
         """可视化结果"""
         plt.figure(figsize=(12, 6))
@@ -323,6 +297,7 @@ class PowerPredictor:
         self.prepare_data()
         self.build_model()
         self.train(epochs=1)
+        self.save()
         
         # 预测并可视化
         last_data = self.scaled_data[-self.lookback:]